@@ -0,0 +1,135 @@
+"""AhoCorasick class to search many literal patterns at once."""
+
+from collections import deque
+from collections.abc import Iterable
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton of literal patterns.
+
+    The automaton is built once and scans each text a single time,
+    no matter how many patterns it has. Patterns are literals, so
+    regex metacharacters need no escaping.
+
+    Examples
+    --------
+    >>> automaton = AhoCorasick(['he', 'she', 'his', 'a+b'])
+    >>> automaton.search('ushers')
+    'she'
+    >>> automaton.contains('1 a+b')
+    True
+    >>> automaton.findall('ushers')
+    ['she', 'he']
+
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        """Build the automaton.
+
+        Parameters
+        ----------
+        patterns : Iterable[str]
+            Literal patterns.
+
+        """
+        self.patterns = tuple(dict.fromkeys(patterns))
+        self._matches_empty = '' in self.patterns
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail = [0]
+        # Patterns ending at each state, longest first
+        self._output: list[tuple[int, ...]] = [()]
+
+        for i, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = next_state
+            self._output[state] = (i,)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fail
+                self._output[next_state] += self._output[fail]
+
+    def search(self, text: str) -> str | None:
+        """Return the first pattern found in a text.
+
+        Parameters
+        ----------
+        text : str
+            Text to scan.
+
+        Returns
+        -------
+        str | None
+            The pattern that ends first in ``text`` (the longest one if
+            several end at the same position), or None if none is found.
+
+        """
+        if self._matches_empty:
+            return ''
+
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                return self.patterns[output[state][0]]
+        return None
+
+    def contains(self, text: str) -> bool:
+        """Check if a text contains any pattern.
+
+        Parameters
+        ----------
+        text : str
+            Text to scan.
+
+        Returns
+        -------
+        bool
+            True if any pattern is found, False otherwise.
+
+        """
+        return self.search(text) is not None
+
+    def findall(self, text: str) -> list[str]:
+        """Return all the occurrences of the patterns in a text.
+
+        Parameters
+        ----------
+        text : str
+            Text to scan.
+
+        Returns
+        -------
+        list[str]
+            Found patterns, in the order they end in ``text``.
+
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        found = []
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            found.extend(self.patterns[i] for i in output[state])
+        return found
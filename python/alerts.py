@@ -0,0 +1,395 @@
+"""Deduplication, rate limiting and digests of alert mails."""
+
+import dataclasses
+import hashlib
+import html
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+
+from .logger import logger
+from .mail import Mail
+from .metrics import REGISTRY
+
+_alerts = REGISTRY.counter(
+    'alerts_total',
+    'Alerts handled by AlertThrottle, by status.',
+    ['status'],
+)
+
+_DIGITS_RE = re.compile(r'\d+')
+
+
+def fingerprint(subject: str, message: str) -> str:
+    """Fingerprint of an alert.
+
+    Digits are ignored, so alerts that differ only in ids, counts
+    or timestamps share the fingerprint.
+
+    Parameters
+    ----------
+    subject : str
+        Subject.
+    message : str
+        Message.
+
+    Returns
+    -------
+    str
+        Hexadecimal digest.
+
+    """
+    text = _DIGITS_RE.sub('#', f'{subject}\0{message}')
+    return hashlib.sha1(text.encode(), usedforsecurity=False).hexdigest()
+
+
+class TokenBucket:
+    """Token bucket rate limiter.
+
+    Holds up to ``capacity`` tokens, refilled at ``rate`` tokens
+    per second. Each allowed event takes a token.
+    """
+
+    __slots__ = ('capacity', 'rate', 'tokens', 'updated_at')
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        now: float | None = None,
+    ) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.time() if now is None else now
+
+    def refill(self, now: float | None = None) -> None:
+        """Add the tokens accrued since the last update.
+
+        Parameters
+        ----------
+        now : float | None, optional
+            Current time, by default ``time.time()``.
+
+        """
+        now = time.time() if now is None else now
+        elapsed = max(now - self.updated_at, 0)
+        self.tokens = min(self.tokens + elapsed * self.rate, self.capacity)
+        self.updated_at = now
+
+    def take(self, now: float | None = None) -> bool:
+        """Take a token if there is one.
+
+        Parameters
+        ----------
+        now : float | None, optional
+            Current time, by default ``time.time()``.
+
+        Returns
+        -------
+        bool
+            Whether the event is allowed.
+
+        """
+        self.refill(now)
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+@dataclasses.dataclass
+class SuppressedAlert:
+    """Alerts with the same fingerprint suppressed since the last digest."""
+
+    subject: str
+    message: str
+    count: int
+    first_seen: float
+    last_seen: float
+
+
+class AlertThrottle:
+    """Deduplicates and rate limits the alerts sent through a ``Mail``.
+
+    Every alert is fingerprinted (see ``fingerprint``) and allowed only
+    if both its own token bucket and the global one have a token, so
+    the same error is mailed at most ``burst`` times in a row and then
+    once every ``1 / rate`` seconds. Suppressed alerts are counted and
+    mailed every ``digest_interval`` seconds in a single digest with
+    their first and last occurrence.
+
+    At most ``max_fingerprints`` fingerprints are tracked, the least
+    recently seen are forgotten first. If ``path`` is given, the state
+    is saved there on ``close`` and after every digest, and loaded
+    on creation, so a restart does not reset the limits.
+
+    Examples
+    --------
+    >>> throttle = AlertThrottle(Mail(outbox=True), rate=1 / 600, burst=3)
+    >>> for _ in range(1000):
+    ...     throttle.send('Error en la carga', 'Archivo no encontrado')
+    >>> throttle.close()  # Mails the digest of the 997 suppressed
+
+    """
+
+    def __init__(
+        self,
+        mail: Mail,
+        *,
+        rate: float = 1 / 300,
+        burst: int = 3,
+        global_rate: float = 1.0,
+        global_burst: int = 20,
+        digest_interval: float = 900.0,
+        max_fingerprints: int = 10_000,
+        path: str | None = None,
+        key: Callable[[str, str], str] = fingerprint,
+    ) -> None:
+        """Create the throttle and start the digest thread.
+
+        Parameters
+        ----------
+        mail : Mail
+            Mail sender.
+        rate : float, optional
+            Alerts per second allowed for each fingerprint,
+            by default 1 / 300 (one every 5 minutes).
+        burst : int, optional
+            Alerts of each fingerprint allowed in a row, by default 3.
+        global_rate : float, optional
+            Alerts per second allowed overall, by default 1.
+        global_burst : int, optional
+            Alerts allowed in a row overall, by default 20.
+        digest_interval : float, optional
+            Seconds between digests, by default 900.
+        max_fingerprints : int, optional
+            Maximum number of tracked fingerprints, by default 10 000.
+        path : str | None, optional
+            JSON file to persist the state, by default None.
+        key : Callable[[str, str], str], optional
+            Function of the subject and message returning the
+            fingerprint, by default ``fingerprint``.
+
+        """
+        self.mail = mail
+        self.rate = rate
+        self.burst = burst
+        self.digest_interval = digest_interval
+        self.max_fingerprints = max_fingerprints
+        self.path = path
+        self.key = key
+        self._global = TokenBucket(global_rate, global_burst)
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+        self._suppressed: dict[str, SuppressedAlert] = {}
+        # Suppressed alerts whose fingerprint was forgotten
+        self._forgotten = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        if path and Path(path).exists():
+            self._load(path)
+        self._worker = threading.Thread(
+            target=self._run,
+            name='alert-digest',
+            daemon=True,
+        )
+        self._worker.start()
+
+    def send(self, subject: str, message: str) -> bool:
+        """Send an alert unless it is rate limited.
+
+        Parameters
+        ----------
+        subject : str
+            Subject.
+        message : str
+            Message.
+
+        Returns
+        -------
+        bool
+            Whether the alert was sent, False if it was suppressed.
+
+        """
+        key = self.key(subject, message)
+        now = time.time()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(
+                    self.rate,
+                    self.burst,
+                    now,
+                )
+                self._evict()
+            else:
+                self._buckets.move_to_end(key)
+            # The global bucket is only charged for allowed fingerprints
+            bucket.refill(now)
+            allowed = bucket.tokens >= 1 and self._global.take(now)
+            if allowed:
+                bucket.tokens -= 1
+            else:
+                suppressed = self._suppressed.get(key)
+                if suppressed is None:
+                    self._suppressed[key] = SuppressedAlert(
+                        subject,
+                        message,
+                        1,
+                        now,
+                        now,
+                    )
+                else:
+                    suppressed.count += 1
+                    suppressed.last_seen = now
+
+        if not allowed:
+            _alerts.inc(1, ('suppressed',))
+            return False
+
+        _alerts.inc(1, ('sent',))
+        self.mail.send(subject, message)
+        return True
+
+    def suppressed(self) -> list[SuppressedAlert]:
+        """Return the alerts suppressed since the last digest."""
+        with self._lock:
+            return [
+                dataclasses.replace(alert)
+                for alert in self._suppressed.values()
+            ]
+
+    def send_digest(self) -> int:
+        """Mail the digest of the suppressed alerts, if any.
+
+        Returns
+        -------
+        int
+            Number of suppressed alerts in the digest.
+
+        """
+        with self._lock:
+            alerts = sorted(self._suppressed.values(), key=lambda a: -a.count)
+            forgotten = self._forgotten
+            self._suppressed = {}
+            self._forgotten = 0
+
+        total = sum(alert.count for alert in alerts) + forgotten
+        if total:
+            self.mail.send(
+                f'Resumen de alertas: {total} suprimidas',
+                _digest_html(alerts, forgotten),
+            )
+            _alerts.inc(1, ('digest',))
+        return total
+
+    def save(self, path: str | None = None) -> None:
+        """Save the state as JSON.
+
+        Parameters
+        ----------
+        path : str | None, optional
+            File path, by default ``path``.
+
+        """
+        path = path or self.path
+        if not path:
+            return
+
+        with self._lock:
+            state = {
+                'global': _bucket_state(self._global),
+                'buckets': {
+                    key: _bucket_state(bucket)
+                    for key, bucket in self._buckets.items()
+                },
+                'suppressed': {
+                    key: dataclasses.asdict(alert)
+                    for key, alert in self._suppressed.items()
+                },
+                'forgotten': self._forgotten,
+            }
+        tmp_path = Path(f'{path}.{os.getpid()}.tmp')
+        with tmp_path.open('w') as f:
+            json.dump(state, f)
+        tmp_path.replace(path)
+
+    def close(self) -> None:
+        """Stop the digest thread, mail the last digest, save the state."""
+        self._stop.set()
+        if self._worker.is_alive():
+            self._worker.join()
+        self.send_digest()
+        self.save()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.digest_interval):
+            try:
+                self.send_digest()
+                self.save()
+            except Exception:
+                # Keep the thread alive, the next digest is retried
+                logger.exception('No se pudo enviar el resumen')
+
+    def _evict(self) -> None:
+        while len(self._buckets) > self.max_fingerprints:
+            key, _ = self._buckets.popitem(last=False)
+            alert = self._suppressed.pop(key, None)
+            if alert:
+                self._forgotten += alert.count
+
+    def _load(self, path: str) -> None:
+        try:
+            with open(path) as f:
+                state = json.load(f)
+            tokens, self._global.updated_at = state['global']
+            # The capacities may have been lowered since the state was saved
+            self._global.tokens = min(tokens, self._global.capacity)
+            for key, (tokens, updated_at) in state['buckets'].items():
+                bucket = TokenBucket(self.rate, self.burst, updated_at)
+                bucket.tokens = min(tokens, self.burst)
+                self._buckets[key] = bucket
+            self._suppressed = {
+                key: SuppressedAlert(**alert)
+                for key, alert in state['suppressed'].items()
+            }
+            self._forgotten = state['forgotten']
+            self._evict()
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(
+                f'No se pudo cargar el estado de las alertas {path!r}: {e}',
+            )
+
+
+def _bucket_state(bucket: TokenBucket) -> tuple[float, float]:
+    return bucket.tokens, bucket.updated_at
+
+
+def _digest_html(alerts: list[SuppressedAlert], forgotten: int) -> str:
+    def fmt(timestamp: float) -> str:
+        return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))
+
+    rows = ''.join(
+        '<tr>'
+        f'<td>{alert.count}</td>'
+        f'<td>{fmt(alert.first_seen)}</td>'
+        f'<td>{fmt(alert.last_seen)}</td>'
+        f'<td>{html.escape(alert.subject)}</td>'
+        f'<td>{html.escape(alert.message[:500])}</td>'
+        '</tr>'
+        for alert in alerts
+    )
+    text = (
+        '<table>'
+        '<tr><th>Cantidad</th><th>Primera vez</th><th>Última vez</th>'
+        '<th>Asunto</th><th>Mensaje</th></tr>'
+        f'{rows}</table>'
+    )
+    if forgotten:
+        text += f'<p>Otras {forgotten} alertas suprimidas.</p>'
+    return text
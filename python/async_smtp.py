@@ -0,0 +1,439 @@
+"""asyncio SMTP client and connection pool."""
+
+import asyncio
+import base64
+import re
+import smtplib
+import ssl
+import time
+from collections.abc import Sequence
+
+from .metrics import REGISTRY
+
+_connections = REGISTRY.counter(
+    'async_smtp_connections_total',
+    'asyncio SMTP connections handled by the pools, by event.',
+    ['event'],
+)
+
+_EOL_RE = re.compile(r'\r\n|\r|\n')
+
+_SERVICE_READY = 220
+_OK = 250
+
+
+class AsyncSMTPConnection:
+    """SMTP session over asyncio streams.
+
+    Supports STARTTLS, AUTH PLAIN and LOGIN, and PIPELINING when the
+    server advertises them. Errors are raised as the ``smtplib``
+    exceptions.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str | None = None,
+        password: str | None = None,
+        *,
+        starttls: bool = False,
+        ssl_context: ssl.SSLContext | None = None,
+    ) -> None:
+        """Create the connection. It is opened by ``connect``.
+
+        Parameters
+        ----------
+        host : str
+            SMTP host.
+        port : int
+            SMTP port.
+        username : str | None, optional
+            Username, by default None (no authentication).
+        password : str | None, optional
+            Password, by default None (no authentication).
+        starttls : bool, optional
+            Whether to upgrade to TLS if the server supports it,
+            by default False, like ``SMTPPool``.
+        ssl_context : ssl.SSLContext | None, optional
+            TLS context, by default ``ssl.create_default_context()``.
+
+        """
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.ssl_context = ssl_context
+        self.extensions: dict[str, str] = {}
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+
+    async def connect(self) -> None:
+        """Open the session: greeting, EHLO, STARTTLS and AUTH."""
+        self._reader, self._writer = await asyncio.open_connection(
+            self.host,
+            self.port,
+        )
+        code, text = await self._read_response()
+        if code != _SERVICE_READY:
+            raise smtplib.SMTPConnectError(code, text)
+        await self._ehlo()
+
+        if self.starttls and 'starttls' in self.extensions:
+            await self._expect('STARTTLS', _SERVICE_READY)
+            await self._writer.start_tls(
+                self.ssl_context or ssl.create_default_context(),
+                server_hostname=self.host,
+            )
+            await self._ehlo()
+
+        if self.username and self.password:
+            await self._login()
+
+    async def sendmail(
+        self,
+        sender: str,
+        to: str | Sequence[str],
+        msg: str,
+    ) -> dict[str, tuple[int, str]]:
+        """Send a message in a single transaction.
+
+        Parameters
+        ----------
+        sender : str
+            Sender address.
+        to : str | Sequence[str]
+            Recipient address or addresses.
+        msg : str
+            Message.
+
+        Returns
+        -------
+        dict[str, tuple[int, str]]
+            Refused recipients, see ``smtplib.SMTP.sendmail``.
+
+        Raises
+        ------
+        smtplib.SMTPRecipientsRefused
+            If all the recipients were refused.
+
+        """
+        recipients = [to] if isinstance(to, str) else list(to)
+        commands = [f'MAIL FROM:<{sender}>'] + [
+            f'RCPT TO:<{address}>' for address in recipients
+        ]
+        if 'pipelining' in self.extensions:
+            # Send the envelope in one write and read the replies after
+            self._write(''.join(f'{c}\r\n' for c in commands))
+            replies = [await self._read_response() for _ in commands]
+        else:
+            replies = [await self._command(c) for c in commands]
+
+        code, text = replies[0]
+        if code != _OK:
+            await self._reset()
+            raise smtplib.SMTPSenderRefused(code, text.encode(), sender)
+
+        refused = {
+            address: reply
+            for address, reply in zip(recipients, replies[1:], strict=True)
+            if reply[0] not in (250, 251)
+        }
+        if len(refused) == len(recipients):
+            await self._reset()
+            raise smtplib.SMTPRecipientsRefused(refused)
+
+        await self._expect('DATA', 354, smtplib.SMTPDataError)
+        data = _EOL_RE.sub('\r\n', msg)
+        if not data.endswith('\r\n'):
+            data += '\r\n'
+        # Dot-stuffing, RFC 5321 section 4.5.2
+        data = re.sub(r'(?m)^\.', '..', data)
+        self._write(f'{data}.\r\n')
+        code, text = await self._read_response()
+        if code != _OK:
+            raise smtplib.SMTPDataError(code, text.encode())
+        return refused
+
+    @property
+    def is_connected(self) -> bool:
+        """Whether the connection is open."""
+        return self._writer is not None
+
+    async def noop(self) -> bool:
+        """Check the connection is alive."""
+        try:
+            code, _ = await self._command('NOOP')
+        except (smtplib.SMTPException, OSError):
+            return False
+        return code == _OK
+
+    async def quit(self) -> None:
+        """Close the session politely."""
+        try:
+            await self._command('QUIT')
+        except (smtplib.SMTPException, OSError):
+            pass
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Close the connection."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self._reader = None
+
+    async def _ehlo(self) -> None:
+        code, text = await self._command('EHLO localhost')
+        if code != _OK:
+            raise smtplib.SMTPHeloError(code, text.encode())
+        self.extensions = {}
+        for line in text.splitlines()[1:]:
+            name, _, params = line.partition(' ')
+            self.extensions[name.lower()] = params
+
+    async def _login(self) -> None:
+        # Like smtplib.SMTP.login
+        if 'auth' not in self.extensions:
+            msg = 'SMTP AUTH extension not supported by server.'
+            raise smtplib.SMTPNotSupportedError(msg)
+
+        methods = self.extensions['auth'].upper().split()
+        if 'PLAIN' in methods:
+            token = f'\0{self.username}\0{self.password}'
+            await self._expect(
+                f'AUTH PLAIN {_b64(token)}',
+                235,
+                smtplib.SMTPAuthenticationError,
+            )
+        elif 'LOGIN' in methods:
+            await self._expect(
+                f'AUTH LOGIN {_b64(self.username)}',
+                334,
+                smtplib.SMTPAuthenticationError,
+            )
+            await self._expect(
+                _b64(self.password),
+                235,
+                smtplib.SMTPAuthenticationError,
+            )
+        else:
+            msg = 'No suitable authentication method found.'
+            raise smtplib.SMTPNotSupportedError(msg)
+
+    async def _reset(self) -> None:
+        try:
+            await self._command('RSET')
+        except (smtplib.SMTPException, OSError):
+            self.close()
+
+    async def _expect(
+        self,
+        line: str,
+        expected: int,
+        error: type[smtplib.SMTPResponseException] = (
+            smtplib.SMTPResponseException
+        ),
+    ) -> str:
+        code, text = await self._command(line)
+        if code != expected:
+            raise error(code, text.encode())
+        return text
+
+    async def _command(self, line: str) -> tuple[int, str]:
+        self._write(f'{line}\r\n')
+        return await self._read_response()
+
+    def _write(self, data: str) -> None:
+        if self._writer is None:
+            msg = 'please run connect() first'
+            raise smtplib.SMTPServerDisconnected(msg)
+        self._writer.write(data.encode('ascii'))
+
+    async def _read_response(self) -> tuple[int, str]:
+        if self._reader is None:
+            msg = 'please run connect() first'
+            raise smtplib.SMTPServerDisconnected(msg)
+        if self._writer is not None:
+            await self._writer.drain()
+
+        lines = []
+        while True:
+            line = await self._reader.readline()
+            if not line:
+                self.close()
+                msg = 'Connection unexpectedly closed'
+                raise smtplib.SMTPServerDisconnected(msg)
+            line = line.decode('utf-8', 'replace').rstrip('\r\n')
+            lines.append(line[4:])
+            if line[3:4] != '-':
+                break
+        try:
+            code = int(line[:3])
+        except ValueError:
+            code = -1
+        return code, '\n'.join(lines)
+
+
+class AsyncSMTPPool:
+    """Pool of persistent ``AsyncSMTPConnection`` for one event loop.
+
+    See ``SMTPPool``. Idle connections are checked and expired when
+    they are borrowed, instead of by a background task.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str | None = None,
+        password: str | None = None,
+        *,
+        size: int = 4,
+        idle_timeout: float = 60.0,
+        health_check_interval: float = 10.0,
+        starttls: bool = False,
+        ssl_context: ssl.SSLContext | None = None,
+    ) -> None:
+        """Create the pool. Connections are opened on demand.
+
+        Parameters
+        ----------
+        host : str
+            SMTP host.
+        port : int
+            SMTP port.
+        username : str | None, optional
+            Username, by default None (no authentication).
+        password : str | None, optional
+            Password, by default None (no authentication).
+        size : int, optional
+            Maximum number of concurrent sessions, by default 4.
+        idle_timeout : float, optional
+            Seconds after which an unused connection is closed,
+            by default 60.
+        health_check_interval : float, optional
+            Seconds after which an unused connection is checked
+            with ``NOOP`` before reuse, by default 10.
+        starttls : bool, optional
+            Whether to upgrade to TLS if the server supports it,
+            by default False, like ``SMTPPool``.
+        ssl_context : ssl.SSLContext | None, optional
+            TLS context, by default ``ssl.create_default_context()``.
+
+        """
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.starttls = starttls
+        self.ssl_context = ssl_context
+        # (connection, released at)
+        self._idle: list[tuple[AsyncSMTPConnection, float]] = []
+        self._slots = asyncio.Semaphore(size)
+
+    async def sendmail(
+        self,
+        sender: str,
+        to: str | Sequence[str],
+        msg: str,
+    ) -> dict[str, tuple[int, str]]:
+        """Send a message, reconnecting once if the connection dropped.
+
+        Waits for a free session if ``size`` are in use. If the task is
+        cancelled or fails mid-transaction, the connection is closed.
+
+        Parameters
+        ----------
+        sender : str
+            Sender address.
+        to : str | Sequence[str]
+            Recipient address or addresses.
+        msg : str
+            Message.
+
+        Returns
+        -------
+        dict[str, tuple[int, str]]
+            Refused recipients, see ``smtplib.SMTP.sendmail``.
+
+        """
+        async with self._slots:
+            try:
+                return await self._sendmail(sender, to, msg)
+            except smtplib.SMTPServerDisconnected:
+                _connections.inc(1, ('reconnected',))
+                return await self._sendmail(sender, to, msg)
+
+    async def close(self) -> None:
+        """Close the idle connections."""
+        idle, self._idle = self._idle, []
+        await asyncio.gather(*(conn.quit() for conn, _ in idle))
+
+    async def _sendmail(
+        self,
+        sender: str,
+        to: str | Sequence[str],
+        msg: str,
+    ) -> dict[str, tuple[int, str]]:
+        conn = await self._acquire()
+        try:
+            refused = await conn.sendmail(sender, to, msg)
+        except (smtplib.SMTPSenderRefused, smtplib.SMTPRecipientsRefused):
+            # The session was reset and can be reused, if RSET succeeded
+            if conn.is_connected:
+                self._idle.append((conn, time.monotonic()))
+            raise
+        except BaseException:
+            conn.close()
+            raise
+        self._idle.append((conn, time.monotonic()))
+        return refused
+
+    async def _acquire(self) -> AsyncSMTPConnection:
+        while self._idle:
+            # LIFO, so the least recently used connections expire
+            conn, released_at = self._idle.pop()
+            idle = time.monotonic() - released_at
+            if idle >= self.idle_timeout:
+                _connections.inc(1, ('expired',))
+                await conn.quit()
+                continue
+            try:
+                healthy = idle < self.health_check_interval or (
+                    await conn.noop()
+                )
+            except BaseException:
+                # Cancelled while checking, the connection is not returned
+                conn.close()
+                raise
+            if healthy:
+                _connections.inc(1, ('reused',))
+                return conn
+            _connections.inc(1, ('unhealthy',))
+            conn.close()
+
+        conn = AsyncSMTPConnection(
+            self.host,
+            self.port,
+            self.username,
+            self.password,
+            starttls=self.starttls,
+            ssl_context=self.ssl_context,
+        )
+        try:
+            await conn.connect()
+        except BaseException:
+            conn.close()
+            raise
+        _connections.inc(1, ('opened',))
+        return conn
+
+
+def _b64(text: str) -> str:
+    return base64.b64encode(text.encode()).decode('ascii')
@@ -0,0 +1,398 @@
+"""Benchmarks of the utils hot paths with regression baselines.
+
+Run with:
+    python -m python.benchmarks --save baseline.json
+    python -m python.benchmarks --compare baseline.json --threshold 0.2
+"""
+
+import argparse
+import dataclasses
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+from pandas import DataFrame, Series
+
+from . import utils
+
+SIZES = {
+    'quick': (10_000,),
+    'full': (10_000, 100_000, 1_000_000, 10_000_000),
+}
+
+ACCENTED_WORDS = (
+    'Bogotá',
+    'Medellín',
+    'Cúcuta',
+    'Ibagué',
+    'Popayán',
+    'Montería',
+    'Peñol',
+    'Nariño',
+    'Córdoba',
+    'Atlántico',
+    'Boyacá',
+    'Quindío',
+)
+
+
+@dataclasses.dataclass
+class BenchmarkResult:
+    """Result of a benchmark for a given size."""
+
+    name: str
+    size: int
+    seconds: float
+    throughput: float
+    peak_mb: float
+
+    @property
+    def key(self) -> str:
+        return f'{self.name}[{self.size}]'
+
+
+def accented_strings(n: int, seed: int = 0) -> Series:
+    """Generate ``n`` unique-ish strings with accents and symbols."""
+    rng = random.Random(seed)
+    return Series(
+        [
+            f'{rng.choice(ACCENTED_WORDS)} {rng.choice(ACCENTED_WORDS)}'
+            f' #{rng.randrange(n)}!'
+            for _ in range(n)
+        ],
+        dtype=object,
+    )
+
+
+def categorical_strings(
+    n: int,
+    cardinality: int = 50,
+    seed: int = 0,
+) -> Series:
+    """Generate ``n`` strings drawn from ``cardinality`` values."""
+    rng = np.random.default_rng(seed)
+    words = ACCENTED_WORDS
+    values = np.array(
+        [f'{words[i % len(words)]} {i}' for i in range(cardinality)],
+        dtype=object,
+    )
+    return Series(values[rng.integers(0, cardinality, n)], dtype=object)
+
+
+def string_frame(rows: int, columns: int = 4, seed: int = 0) -> DataFrame:
+    """Generate a DataFrame of repetitive accented strings."""
+    return DataFrame(
+        {
+            f' Columna {i} ': categorical_strings(rows, 50 * (i + 1), seed + i)
+            for i in range(columns)
+        },
+    )
+
+
+def binary_file(size: int, seed: int = 0) -> str:
+    """Create a temporary file of ``size`` random bytes.
+
+    The caller must remove it.
+    """
+    rng = np.random.default_rng(seed)
+    fd, path = tempfile.mkstemp(prefix='benchmark_')
+    with os.fdopen(fd, 'wb') as f:
+        chunk = 8 * 1024 * 1024
+        for start in range(0, size, chunk):
+            f.write(rng.bytes(min(chunk, size - start)))
+    return path
+
+
+# Function to measure and cleanup function
+Setup = tuple[Callable[[], object], Callable[[], None]]
+
+
+@dataclasses.dataclass
+class _Benchmark:
+    name: str
+    setup: Callable[[int], Setup]
+    max_size: int
+
+
+_benchmarks: list[_Benchmark] = []
+
+
+def benchmark(
+    name: str,
+    max_size: int = 10_000_000,
+) -> Callable[[Callable], Callable]:
+    """Register a benchmark.
+
+    The decorated function receives the size and returns the function
+    to measure and a cleanup function.
+
+    Parameters
+    ----------
+    name : str
+        Benchmark name.
+    max_size : int, optional
+        Largest size to run the benchmark with, by default 10 000 000.
+
+    """
+
+    def decorator(func: Callable) -> Callable:
+        _benchmarks.append(_Benchmark(name, func, max_size))
+        return func
+
+    return decorator
+
+
+def _no_cleanup() -> None:
+    pass
+
+
+@benchmark('normalize_string', max_size=1_000_000)
+def _bench_normalize_string(size: int) -> Setup:
+    values = accented_strings(size).tolist()
+
+    def run() -> None:
+        utils.normalize_cache_clear()
+        for value in values:
+            utils.normalize_string(value)
+
+    return run, _no_cleanup
+
+
+@benchmark('normalize_series')
+def _bench_normalize_series(size: int) -> Setup:
+    series = accented_strings(size)
+    return lambda: utils.normalize_series(series), _no_cleanup
+
+
+@benchmark('normalize_series_unique')
+def _bench_normalize_series_unique(size: int) -> Setup:
+    series = categorical_strings(size)
+    return lambda: utils.normalize_series(series, unique=True), _no_cleanup
+
+
+@benchmark('normalize_dataframe')
+def _bench_normalize_dataframe(size: int) -> Setup:
+    df = string_frame(size)
+    return lambda: utils.normalize_dataframe(df.copy()), _no_cleanup
+
+
+@benchmark('series_contains')
+def _bench_series_contains(size: int) -> Setup:
+    series = utils.normalize_series(categorical_strings(size, 1000))
+    values = [f'{word} 1' for word in ACCENTED_WORDS]
+    return lambda: utils.series_contains(series, values), _no_cleanup
+
+
+@benchmark('series_isin')
+def _bench_series_isin(size: int) -> Setup:
+    series = utils.normalize_series(categorical_strings(size, 1000))
+    values = [f'{word} {i}' for i, word in enumerate(ACCENTED_WORDS)]
+    return lambda: utils.series_isin(series, values), _no_cleanup
+
+
+@benchmark('extract_digits')
+def _bench_extract_digits(size: int) -> Setup:
+    series = accented_strings(size)
+    return lambda: utils.extract_digits(series), _no_cleanup
+
+
+@benchmark('sha256sum', max_size=1_000_000)
+def _bench_sha256sum(size: int) -> Setup:
+    # Size in KiB, so 10k is a 10 MiB file
+    path = binary_file(size * 1024)
+    return lambda: utils.sha256sum(path), lambda: Path(path).unlink()
+
+
+@benchmark('md5sum', max_size=1_000_000)
+def _bench_md5sum(size: int) -> Setup:
+    path = binary_file(size * 1024)
+    return lambda: utils.md5sum(path), lambda: Path(path).unlink()
+
+
+@benchmark('enforced_dataclass', max_size=1_000_000)
+def _bench_enforced_dataclass(size: int) -> Setup:
+    @dataclasses.dataclass
+    class Settings(utils.EnforcedDataclassMixin):
+        DEBUG: bool
+        PORT: int
+        HOSTS: list
+        TIMEOUT: float
+
+    def run() -> None:
+        for _ in range(size):
+            Settings(DEBUG='yes', PORT='8000', HOSTS='a, b', TIMEOUT='1.5')
+
+    return run, _no_cleanup
+
+
+def run_benchmarks(
+    sizes: tuple[int, ...] = SIZES['quick'],
+    names: list[str] | None = None,
+    repeat: int = 3,
+) -> list[BenchmarkResult]:
+    """Run the registered benchmarks.
+
+    Each benchmark is timed ``repeat`` times and the fastest run is kept.
+    The peak memory is measured with ``tracemalloc`` in an extra run,
+    so it does not slow down the timed runs.
+
+    Parameters
+    ----------
+    sizes : tuple[int, ...], optional
+        Sizes to run, by default ``SIZES['quick']``.
+    names : list[str] | None, optional
+        Benchmarks to run, by default None (all).
+    repeat : int, optional
+        Number of timed runs, by default 3.
+
+    Returns
+    -------
+    list[BenchmarkResult]
+        Results.
+
+    """
+    results = []
+    for bench in _benchmarks:
+        if names and bench.name not in names:
+            continue
+        for size in sizes:
+            if size > bench.max_size:
+                continue
+            try:
+                run, cleanup = bench.setup(size)
+            except ImportError as e:
+                # Optional dependency not installed
+                print(f'{bench.name}[{size}]: omitido ({e})', file=sys.stderr)
+                continue
+            try:
+                seconds = min(_timed(run) for _ in range(repeat))
+                peak_mb = _peak_memory(run)
+            finally:
+                cleanup()
+            result = BenchmarkResult(
+                bench.name,
+                size,
+                seconds,
+                size / seconds,
+                peak_mb,
+            )
+            print(
+                f'{result.key}: {seconds * 1000:.1f} ms,'
+                f' {result.throughput:,.0f} elementos/s,'
+                f' pico {peak_mb:.1f} MB',
+                file=sys.stderr,
+            )
+            results.append(result)
+    return results
+
+
+def save_baseline(results: list[BenchmarkResult], filepath: str) -> None:
+    """Save the results as a JSON baseline.
+
+    Parameters
+    ----------
+    results : list[BenchmarkResult]
+        Results to save.
+    filepath : str
+        JSON file path.
+
+    """
+    data = {result.key: dataclasses.asdict(result) for result in results}
+    with open(filepath, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def compare_baseline(
+    results: list[BenchmarkResult],
+    filepath: str,
+    threshold: float = 0.2,
+) -> list[str]:
+    """Compare results with a JSON baseline.
+
+    Parameters
+    ----------
+    results : list[BenchmarkResult]
+        Current results.
+    filepath : str
+        JSON baseline path.
+    threshold : float, optional
+        Allowed relative loss of throughput or gain of peak memory,
+        by default 0.2 (20 %).
+
+    Returns
+    -------
+    list[str]
+        Description of each regression.
+
+    """
+    with open(filepath) as f:
+        baseline = json.load(f)
+
+    regressions = []
+    for result in results:
+        base = baseline.get(result.key)
+        if not base:
+            continue
+        if result.throughput < base['throughput'] * (1 - threshold):
+            regressions.append(
+                f'{result.key}: rendimiento {result.throughput:,.0f}'
+                f' < {base["throughput"]:,.0f} elementos/s',
+            )
+        # Ignore tiny allocations, which are mostly noise
+        if result.peak_mb > max(base['peak_mb'], 1) * (1 + threshold):
+            regressions.append(
+                f'{result.key}: pico de memoria {result.peak_mb:.1f}'
+                f' > {base["peak_mb"]:.1f} MB',
+            )
+    return regressions
+
+
+def _timed(run: Callable[[], object]) -> float:
+    gc.collect()
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+def _peak_memory(run: Callable[[], object]) -> float:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', choices=SIZES, default='quick')
+    parser.add_argument('--only', nargs='*', help='benchmarks to run')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--save', help='save the results as a baseline')
+    parser.add_argument('--compare', help='baseline to compare with')
+    parser.add_argument('--threshold', type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(SIZES[args.sizes], args.only, args.repeat)
+    if args.save:
+        save_baseline(results, args.save)
+    if args.compare:
+        regressions = compare_baseline(results, args.compare, args.threshold)
+        for regression in regressions:
+            print(f'REGRESIÓN {regression}', file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
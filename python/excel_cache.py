@@ -0,0 +1,242 @@
+"""Read-through Parquet cache for Excel and CSV files.
+
+Install pyarrow with:
+    pip install pyarrow
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from pathlib import Path
+
+import pandas as pd
+from loguru import logger
+from pandas import DataFrame
+
+from .ingestion import sheet_label
+from .utils import excel_reading_exc_middleware, file_digests, usecols
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+CACHE_DIR = '.cache/frames'
+DIGEST_CACHE_SIZE = 1024
+
+# Absolute path -> (stat fingerprint, SHA256 checksum), least recently
+# used first
+_digests: OrderedDict[str, tuple[tuple[int, int, int], str]] = OrderedDict()
+_digests_lock = threading.Lock()
+
+
+def read_excel_cached(
+    filepath: str,
+    sheet_name: str | int = 0,
+    columns: Sequence[str] | None = None,
+    cache_dir: str = CACHE_DIR,
+    **read_kwargs,
+) -> DataFrame:
+    """Read an Excel sheet through a Parquet cache.
+
+    There is a cache entry for each file path, sheet, selection of
+    columns and ``read_kwargs``, tagged with the SHA256 checksum of the
+    file, so unchanged files are loaded from the cache instead of being
+    parsed again. When the file changes, its previous entry is replaced.
+
+    Parameters
+    ----------
+    filepath : str
+        Excel file path.
+    sheet_name : str | int, optional
+        Sheet name or position, by default 0. Reading several sheets
+        at once is not supported, see ``preflight.list_sheets``.
+    columns : Sequence[str] | None, optional
+        Columns to read, by default None (all columns).
+        Passed to ``pandas.read_excel`` through ``usecols``.
+    cache_dir : str, optional
+        Cache directory, by default ``CACHE_DIR``.
+    **read_kwargs
+        Extra arguments for ``pandas.read_excel``.
+
+    Returns
+    -------
+    DataFrame
+        Sheet data.
+
+    Raises
+    ------
+    ExternalReadingError
+        If the sheet or a column is not found.
+    TypeError
+        If ``sheet_name`` is not a single sheet.
+    ImportError
+        If pyarrow is not installed.
+
+    Examples
+    --------
+    >>> df = read_excel_cached('sales.xlsx', 'Ventas', ['City', 'Total'])
+
+    """
+    if not isinstance(sheet_name, str | int):
+        msg = (
+            f'sheet_name must be a sheet name or position, got {sheet_name!r}'
+        )
+        raise TypeError(msg)
+
+    return _read_cached(
+        pd.read_excel,
+        filepath,
+        columns,
+        cache_dir,
+        sheet_name=sheet_name,
+        **read_kwargs,
+    )
+
+
+def read_csv_cached(
+    filepath: str,
+    columns: Sequence[str] | None = None,
+    cache_dir: str = CACHE_DIR,
+    **read_kwargs,
+) -> DataFrame:
+    """Read a CSV file through a Parquet cache.
+
+    See ``read_excel_cached``.
+
+    Parameters
+    ----------
+    filepath : str
+        CSV file path.
+    columns : Sequence[str] | None, optional
+        Columns to read, by default None (all columns).
+    cache_dir : str, optional
+        Cache directory, by default ``CACHE_DIR``.
+    **read_kwargs
+        Extra arguments for ``pandas.read_csv``.
+
+    Returns
+    -------
+    DataFrame
+        File data.
+
+    Raises
+    ------
+    ExternalReadingError
+        If a column is not found.
+    ImportError
+        If pyarrow is not installed.
+
+    """
+    return _read_cached(
+        pd.read_csv,
+        filepath,
+        columns,
+        cache_dir,
+        **read_kwargs,
+    )
+
+
+def _read_cached(
+    reader: Callable[..., DataFrame],
+    filepath: str,
+    columns: Sequence[str] | None,
+    cache_dir: str,
+    **read_kwargs,
+) -> DataFrame:
+    if pa is None:
+        msg = 'The Parquet cache requires pyarrow: pip install pyarrow'
+        raise ImportError(msg)
+
+    path = Path(filepath).resolve()
+    options = json.dumps(
+        {
+            'reader': reader.__name__,
+            'columns': list(columns) if columns else None,
+            **read_kwargs,
+        },
+        sort_keys=True,
+        default=repr,
+    )
+    entry = hashlib.sha256(f'{path}:{options}'.encode()).hexdigest()
+    cache_path = Path(cache_dir) / f'{entry}-{_sha256(path)}.parquet'
+    if cache_path.exists():
+        return pd.read_parquet(cache_path)
+
+    sheet_name = sheet_label(read_kwargs.get('sheet_name', 0))
+    try:
+        df = reader(
+            filepath,
+            usecols=usecols(columns) if columns else None,
+            **read_kwargs,
+        )
+    except Exception as e:
+        exc = excel_reading_exc_middleware(e, path.name, sheet_name)
+        if exc is e:
+            raise
+        raise exc from e
+
+    if columns:
+        # The usecols callable skips the columns that are not found
+        found = {str(col).strip() for col in df.columns}
+        missing = [col for col in columns if col not in found]
+        if missing:
+            raise excel_reading_exc_middleware(
+                KeyError(missing[0]),
+                path.name,
+                sheet_name,
+            )
+
+    _store(df, cache_path, entry, path.name)
+    return df
+
+
+def _store(
+    df: DataFrame,
+    cache_path: Path,
+    entry: str,
+    filename: str,
+) -> None:
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(f'{cache_path.name}.{os.getpid()}.tmp')
+    try:
+        df.to_parquet(tmp_path)
+        tmp_path.replace(cache_path)
+    except (TypeError, ValueError, pa.ArrowException) as e:
+        # Mixed-type object columns cannot be stored in Parquet
+        logger.warning(
+            'No se pudo guardar en caché el archivo {!r}: {}',
+            filename,
+            e,
+        )
+        tmp_path.unlink(missing_ok=True)
+        return
+
+    # Entries of previous versions of the file
+    for old_path in cache_path.parent.glob(f'{entry}-*.parquet'):
+        if old_path != cache_path:
+            old_path.unlink(missing_ok=True)
+
+
+def _sha256(path: Path) -> str:
+    # The stat fingerprint tells if the file changed and must be rehashed
+    st = path.stat()
+    fingerprint = (st.st_size, st.st_mtime_ns, st.st_ino)
+    key = str(path)
+    with _digests_lock:
+        cached = _digests.get(key)
+        if cached is not None and cached[0] == fingerprint:
+            _digests.move_to_end(key)
+            return cached[1]
+
+    # Hashed without the lock, so other files are not kept waiting
+    digest = file_digests(key)['sha256']
+    with _digests_lock:
+        _digests[key] = (fingerprint, digest)
+        _digests.move_to_end(key)
+        while len(_digests) > DIGEST_CACHE_SIZE:
+            _digests.popitem(last=False)
+    return digest
@@ -0,0 +1,406 @@
+"""Streaming ingestion of large CSV and Excel files.
+
+Parquet output requires pyarrow and Excel input requires openpyxl:
+    pip install pyarrow openpyxl
+"""
+
+from collections.abc import Callable, Iterator, Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pandas as pd
+from pandas import DataFrame, Series
+
+from .utils import (
+    ExternalReadingError,
+    excel_reading_exc_middleware,
+    normalize_dataframe,
+    strip_columns,
+    usecols,
+)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+try:
+    from openpyxl import load_workbook
+except ImportError:
+    load_workbook = None
+
+if TYPE_CHECKING:
+    from openpyxl.workbook import Workbook
+    from openpyxl.worksheet._read_only import ReadOnlyWorksheet
+
+Predicate = Callable[[DataFrame], Series]
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xlsm')
+
+
+def read_chunks(
+    filepath: str,
+    columns: Sequence[str] | None = None,
+    *,
+    chunksize: int = 100_000,
+    normalize: bool = False,
+    filters: Sequence[Predicate] = (),
+    sheet_name: str | int = 0,
+    **read_kwargs,
+) -> Iterator[DataFrame]:
+    """Read a CSV or Excel file in chunks of at most ``chunksize`` rows.
+
+    Each chunk gets its column names stripped, is normalized with
+    ``normalize_dataframe`` if ``normalize`` is True, and is filtered
+    with ``filters``, so memory stays bounded by the chunk size.
+
+    Parameters
+    ----------
+    filepath : str
+        CSV or Excel (.xlsx, .xlsm) file path.
+    columns : Sequence[str] | None, optional
+        Columns to read, by default None (all columns).
+    chunksize : int, optional
+        Maximum number of rows per chunk, by default 100 000.
+    normalize : bool, optional
+        Normalize column names and values, by default False.
+    filters : Sequence[Predicate], optional
+        Functions that receive a chunk and return a boolean Series,
+        usually built with the ``series_*`` helpers. Only the rows
+        for which all of them are True are kept. By default ().
+    sheet_name : str | int, optional
+        Excel sheet name or position, by default 0.
+    **read_kwargs
+        Extra arguments for ``pandas.read_csv``. Excel files only
+        accept ``dtype=str``.
+
+    Yields
+    ------
+    DataFrame
+        Processed chunk. Empty chunks are skipped.
+
+    Raises
+    ------
+    ExternalReadingError
+        If an Excel sheet or a column is not found.
+    TypeError
+        If ``read_kwargs`` has arguments not supported for Excel files.
+
+    Examples
+    --------
+    >>> chunks = read_chunks(
+    ...     'sales.csv',
+    ...     columns=['City', 'Total'],
+    ...     normalize=True,
+    ...     filters=[lambda df: series_isin(df['CITY'], ['Bogotá', 'Cali'])],
+    ... )
+    >>> for chunk in chunks:
+    ...     print(len(chunk))
+
+    """
+    for df in _read_chunks(
+        filepath,
+        columns,
+        chunksize=chunksize,
+        normalize=normalize,
+        filters=filters,
+        sheet_name=sheet_name,
+        **read_kwargs,
+    ):
+        if not df.empty:
+            yield df
+
+
+def ingest(
+    filepath: str,
+    output: str,
+    columns: Sequence[str] | None = None,
+    *,
+    chunksize: int = 100_000,
+    normalize: bool = False,
+    filters: Sequence[Predicate] = (),
+    sheet_name: str | int = 0,
+    **read_kwargs,
+) -> int:
+    """Write a CSV or Excel file to Parquet or CSV chunk by chunk.
+
+    The output is written incrementally, so memory stays bounded by the
+    chunk size.
+
+    See ``read_chunks`` for the processing of each chunk. Values are
+    read and written as text, so the Parquet schema does not depend on
+    the types pandas would infer for each chunk. The output is created,
+    with its header, even if no row passes the filters.
+
+    Parameters
+    ----------
+    filepath : str
+        CSV or Excel (.xlsx, .xlsm) file path.
+    output : str
+        Output file path. Written as Parquet if it ends with
+        ``.parquet``, as CSV otherwise. Overwritten if it exists.
+    columns : Sequence[str] | None, optional
+        Columns to read, by default None (all columns).
+    chunksize : int, optional
+        Maximum number of rows per chunk, by default 100 000.
+    normalize : bool, optional
+        Normalize column names and values, by default False.
+    filters : Sequence[Predicate], optional
+        Row filters, by default (). See ``read_chunks``.
+    sheet_name : str | int, optional
+        Excel sheet name or position, by default 0.
+    **read_kwargs
+        Extra arguments for ``pandas.read_csv``, except ``dtype``.
+
+    Returns
+    -------
+    int
+        Number of rows written.
+
+    Raises
+    ------
+    TypeError
+        If ``dtype`` is given.
+
+    Examples
+    --------
+    >>> ingest('sales.xlsx', 'sales.parquet', columns=['City', 'Total'])
+    1250000
+
+    """
+    if 'dtype' in read_kwargs:
+        msg = 'ingest reads every column as text, dtype is not supported'
+        raise TypeError(msg)
+
+    chunks = _read_chunks(
+        filepath,
+        columns,
+        chunksize=chunksize,
+        normalize=normalize,
+        filters=filters,
+        sheet_name=sheet_name,
+        dtype=str,
+        **read_kwargs,
+    )
+    if output.lower().endswith('.parquet'):
+        return _write_parquet(chunks, output)
+
+    rows = 0
+    with open(output, 'w', newline='', encoding='utf-8') as f:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(f, header=not i, index=False)
+            rows += len(chunk)
+    return rows
+
+
+def get_worksheet(
+    wb: 'Workbook',
+    sheet_name: str | int,
+    filename: str,
+) -> 'ReadOnlyWorksheet':
+    """Return a sheet of a read-only workbook by name or position.
+
+    Parameters
+    ----------
+    wb : Workbook
+        Workbook loaded with ``openpyxl.load_workbook``.
+    sheet_name : str | int
+        Sheet name or position.
+    filename : str
+        File name for the error message.
+
+    Returns
+    -------
+    ReadOnlyWorksheet
+        Sheet.
+
+    Raises
+    ------
+    ExternalReadingError
+        If the sheet is not found.
+
+    """
+    try:
+        if isinstance(sheet_name, int):
+            return wb.worksheets[sheet_name]
+        return wb[sheet_name]
+    except (IndexError, KeyError) as e:
+        exc = ValueError(f'Worksheet named {sheet_name!r} not found')
+        raise excel_reading_exc_middleware(
+            exc,
+            filename,
+            sheet_label(sheet_name),
+        ) from e
+
+
+def sheet_label(sheet_name: str | int) -> str:
+    """Return the sheet name shown by ``excel_reading_exc_middleware``.
+
+    Parameters
+    ----------
+    sheet_name : str | int
+        Sheet name or position.
+
+    Returns
+    -------
+    str
+        ``sheet_name`` as text, empty for the default sheet (position 0).
+
+    Examples
+    --------
+    >>> sheet_label('Ventas')
+    'Ventas'
+    >>> sheet_label(0)
+    ''
+
+    """
+    return str(sheet_name) if sheet_name else ''
+
+
+def _read_chunks(
+    filepath: str,
+    columns: Sequence[str] | None,
+    *,
+    chunksize: int,
+    normalize: bool,
+    filters: Sequence[Predicate],
+    sheet_name: str | int,
+    **read_kwargs,
+) -> Iterator[DataFrame]:
+    # Like read_chunks, but yields the empty chunks too
+    if filepath.lower().endswith(EXCEL_EXTENSIONS):
+        dtype = read_kwargs.pop('dtype', None)
+        if dtype not in (None, str):
+            read_kwargs['dtype'] = dtype
+        if read_kwargs:
+            unsupported = ', '.join(read_kwargs)
+            msg = f'unsupported arguments for Excel files: {unsupported}'
+            raise TypeError(msg)
+        chunks = _read_excel_chunks(
+            filepath,
+            columns,
+            chunksize=chunksize,
+            sheet_name=sheet_name,
+            as_text=dtype is str,
+        )
+    else:
+        if columns:
+            _check_csv_columns(filepath, columns, **read_kwargs)
+        chunks = pd.read_csv(
+            filepath,
+            usecols=usecols(columns) if columns else None,
+            chunksize=chunksize,
+            **read_kwargs,
+        )
+
+    for chunk in chunks:
+        df = strip_columns(chunk)
+        if normalize:
+            df = normalize_dataframe(df, unique=True)
+        for predicate in filters:
+            df = df[predicate(df)]
+        yield df
+
+
+def _check_csv_columns(
+    filepath: str,
+    columns: Sequence[str],
+    **read_kwargs,
+) -> None:
+    # A callable usecols silently skips the columns that are not found
+    header = pd.read_csv(filepath, nrows=0, **read_kwargs).columns
+    found = {str(name).strip() for name in header}
+    missing = [col for col in columns if col not in found]
+    if missing:
+        filename = Path(filepath).name
+        msg = (
+            f'No se encontró la columna {missing[0]!r}'
+            f' en el archivo {filename!r}'
+        )
+        raise ExternalReadingError(msg)
+
+
+def _write_parquet(chunks: Iterator[DataFrame], output: str) -> int:
+    if pq is None:
+        msg = 'Parquet output requires pyarrow: pip install pyarrow'
+        raise ImportError(msg)
+
+    rows = 0
+    schema = pa.schema([])
+    writer = None
+    try:
+        for chunk in chunks:
+            if writer is None:
+                # Explicit, as an empty column would be inferred as null
+                # or double and break the chunks that have values
+                schema = pa.schema(
+                    [(str(name), pa.string()) for name in chunk.columns],
+                )
+                writer = pq.ParquetWriter(output, schema)
+            if chunk.empty:
+                continue
+            table = pa.Table.from_pandas(
+                chunk,
+                schema=schema,
+                preserve_index=False,
+            )
+            writer.write_table(table)
+            rows += len(chunk)
+        if writer is None:
+            writer = pq.ParquetWriter(output, schema)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def _read_excel_chunks(
+    filepath: str,
+    columns: Sequence[str] | None,
+    *,
+    chunksize: int,
+    sheet_name: str | int,
+    as_text: bool = False,
+) -> Iterator[DataFrame]:
+    if load_workbook is None:
+        msg = 'Excel input requires openpyxl: pip install openpyxl'
+        raise ImportError(msg)
+
+    filename = Path(filepath).name
+    wb = load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        ws = get_worksheet(wb, sheet_name, filename)
+        rows = ws.iter_rows(values_only=True)
+        header = ['' if name is None else str(name) for name in next(rows, ())]
+        if columns:
+            found = {name.strip() for name in header}
+            missing = [col for col in columns if col not in found]
+            if missing:
+                raise excel_reading_exc_middleware(
+                    KeyError(missing[0]),
+                    filename,
+                    sheet_label(sheet_name),
+                )
+            keep = usecols(columns)
+            positions = [i for i, name in enumerate(header) if keep(name)]
+        else:
+            positions = list(range(len(header)))
+
+        names = [header[i] for i in positions]
+        dtype = str if as_text else None
+        batch = []
+        empty = True
+        for row in rows:
+            values = [row[i] if i < len(row) else None for i in positions]
+            if as_text:
+                values = [None if v is None else str(v) for v in values]
+            batch.append(values)
+            if len(batch) >= chunksize:
+                yield DataFrame(batch, columns=names, dtype=dtype)
+                batch = []
+                empty = False
+        if batch or empty:
+            yield DataFrame(batch, columns=names, dtype=dtype)
+    finally:
+        wb.close()
@@ -4,12 +4,323 @@ Install loguru with:
     pip install loguru
 """
 
+import atexit
+import json
 import sys
+import threading
+import traceback
+from collections import deque
+from collections.abc import Callable
 from datetime import time, timedelta
+from functools import lru_cache
 from pathlib import Path
+from time import monotonic
+from typing import Literal
 
 from loguru import logger
 
+from .metrics import REGISTRY
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+OverflowPolicy = Literal['block', 'drop_oldest', 'drop_debug']
+
+# Records of this level and above are written at once by BatchedFileSink
+_ERROR = 40
+# DEBUG and TRACE records are dropped by the 'drop_debug' policy
+_DEBUG = 10
+
+_log_records = REGISTRY.counter(
+    'log_records_total',
+    'Log records emitted, by level.',
+    ['level'],
+)
+_log_dropped = REGISTRY.counter(
+    'log_records_dropped_total',
+    'Log records dropped because the sink buffer was full, by level.',
+    ['level'],
+)
+
+
+def _counting_patcher(previous: Callable | None) -> Callable:
+    """Return a patcher that counts the records, then calls ``previous``.
+
+    ``logger.configure`` replaces the current patcher, so the one the
+    application may have set is chained instead of discarded.
+    """
+    if getattr(previous, 'counts_records', False):
+        return previous
+
+    def patcher(record: dict) -> None:
+        _log_records.inc(1, (record['level'].name,))
+        if previous is not None:
+            previous(record)
+
+    patcher.counts_records = True
+    return patcher
+
+
+class BatchedFileSink:
+    """File sink that writes the formatted records in batches.
+
+    Records are encoded and appended to an in-memory buffer, and
+    a background thread writes them in a single call once
+    ``flush_bytes`` bytes or ``max_records`` records are buffered, or
+    ``flush_interval`` seconds after the oldest buffered record
+    arrived, so the logging thread does not wait for the disk. ERROR
+    and CRITICAL records make the logging thread wait until they are
+    written, along with the buffer, so they are not lost if the process
+    is killed. The file is only open while a batch is written.
+
+    When the buffer holds ``max_records`` and the writer is busy, the
+    overflow policy decides whether the logging thread waits
+    (``'block'``), the oldest buffered record is discarded
+    (``'drop_oldest'``) or DEBUG and TRACE records are discarded while
+    the rest wait (``'drop_debug'``). Discarded records are counted
+    by ``log_records_dropped_total``.
+
+    The buffer is written when the sink is removed from the logger
+    and at interpreter exit. Records received after that are written
+    one by one.
+
+    Examples
+    --------
+    >>> logger.add(BatchedFileSink('.logs/main.log'), format='{message}')
+
+    """
+
+    def __init__(
+        self,
+        filepath: str | Path,
+        max_records: int = 10_000,
+        flush_bytes: int = 64 * 1024,
+        flush_interval: float = 1.0,
+        overflow: OverflowPolicy = 'block',
+    ) -> None:
+        """Create the sink and start its writer thread.
+
+        Parameters
+        ----------
+        filepath : str | Path
+            Log file path, opened in append mode.
+        max_records : int, optional
+            Maximum number of buffered records, by default 10 000.
+        flush_bytes : int, optional
+            Buffered bytes that trigger a write, by default 64 KiB.
+        flush_interval : float, optional
+            Maximum seconds a record stays in the buffer, by default 1.
+        overflow : OverflowPolicy, optional
+            What to do when the buffer is full, by default 'block'.
+
+        """
+        self.name = str(filepath)
+        self.path = Path(filepath)
+        self.max_records = max_records
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        # Encoded text and level name only, the records are not kept
+        self._buffer: deque[tuple[bytes, str]] = deque()
+        self._size = 0
+        self._oldest = 0.0
+        # Records accepted, and written or dropped, so far
+        self._accepted = 0
+        self._done = 0
+        self._flush_requested = False
+        self._stopped = False
+        self._cond = threading.Condition()
+        self._writer = threading.Thread(
+            target=self._run,
+            name='log-writer',
+            daemon=True,
+        )
+        self._writer.start()
+        atexit.register(self.stop)
+
+    def write(self, message: str) -> None:
+        """Buffer a formatted record. Called by the logger."""
+        level = message.record['level']
+        data = str(message).encode('utf-8')
+        with self._cond:
+            if self._stopped:
+                self._write_file(data)
+                return
+
+            while len(self._buffer) >= self.max_records:
+                if self.overflow == 'drop_oldest':
+                    oldest, oldest_level = self._buffer.popleft()
+                    self._size -= len(oldest)
+                    self._done += 1
+                    _log_dropped.inc(1, (oldest_level,))
+                elif self.overflow == 'drop_debug' and level.no <= _DEBUG:
+                    _log_dropped.inc(1, (level.name,))
+                    return
+                else:
+                    self._cond.wait()
+                    if self._stopped:
+                        self._write_file(data)
+                        return
+
+            first = not self._buffer
+            if first:
+                self._oldest = monotonic()
+            self._buffer.append((data, level.name))
+            self._size += len(data)
+            self._accepted += 1
+            if level.no >= _ERROR:
+                self._wait_written()
+            elif first or self._must_flush():
+                # The first record starts the flush_interval timer
+                self._cond.notify_all()
+
+    def drain(self, timeout: float | None = None) -> bool:
+        """Write the buffered records now and wait until they are.
+
+        Parameters
+        ----------
+        timeout : float | None, optional
+            Seconds to wait, by default None (forever).
+
+        Returns
+        -------
+        bool
+            Whether all the records were written in time.
+
+        """
+        with self._cond:
+            return self._wait_written(timeout)
+
+    def stop(self) -> None:
+        """Write the buffered records and stop the writer thread.
+
+        Called by the logger when the sink is removed.
+        """
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self._writer.join()
+        atexit.unregister(self.stop)
+
+    def _wait_written(self, timeout: float | None = None) -> bool:
+        # Called holding the condition
+        accepted = self._accepted
+        self._flush_requested = True
+        self._cond.notify_all()
+        return self._cond.wait_for(
+            lambda: self._done >= accepted or not self._writer.is_alive(),
+            timeout,
+        )
+
+    def _must_flush(self) -> bool:
+        return (
+            self._stopped
+            or self._flush_requested
+            or self._size >= self.flush_bytes
+            or len(self._buffer) >= self.max_records
+        )
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._must_flush():
+                    if not self._buffer:
+                        self._cond.wait()
+                        continue
+                    # The oldest record is due flush_interval after it
+                    # arrived, even if no other record comes
+                    due = self._oldest + self.flush_interval - monotonic()
+                    if due <= 0:
+                        break
+                    self._cond.wait(due)
+                batch, self._buffer = self._buffer, deque()
+                self._size = 0
+                self._flush_requested = False
+                if self._stopped:
+                    # Written holding the lock, before the records that
+                    # write() then writes one by one
+                    self._write_batch(batch)
+                    return
+                # Wake the logging threads blocked by a full buffer
+                self._cond.notify_all()
+
+            self._write_batch(batch)
+
+    def _write_batch(self, batch: deque[tuple[bytes, str]]) -> None:
+        if batch:
+            self._write_file(b''.join(data for data, _ in batch))
+        with self._cond:
+            self._done += len(batch)
+            self._cond.notify_all()
+
+    def _write_file(self, data: bytes) -> None:
+        try:
+            with self.path.open('ab') as f:
+                f.write(data)
+        except OSError as e:
+            sys.stderr.write(f'No se pudo escribir el log: {e}\n')
+
+
+def _dumps(value: object) -> str:
+    if orjson is not None:
+        return orjson.dumps(value, default=str).decode()
+    return json.dumps(
+        value,
+        default=str,
+        ensure_ascii=False,
+        separators=(',', ':'),
+    )
+
+
+# '<' only appears inside JSON strings, where it can be escaped
+_FORMAT_ESCAPES = str.maketrans({'{': '{{', '}': '}}', '<': '\\u003c'})
+
+
+@lru_cache(maxsize=4096)
+def _json_static(level: str, name: str, function: str, line: int) -> str:
+    # Fields that only depend on the call site are serialized once
+    return (
+        f',"level":{_dumps(level)}'
+        f',"location":{_dumps(f"{name}:{function}:{line}")}'
+    )
+
+
+def _json_format(record: dict) -> str:
+    """Format a record as a JSON line.
+
+    loguru formats the returned string with the record and parses its
+    color tags, so the braces are doubled and ``<`` is written as its
+    JSON escape instead of storing the line in the record.
+    """
+    parts = [
+        '{"timestamp":"',
+        record['time'].isoformat(timespec='milliseconds'),
+        '"',
+        _json_static(
+            record['level'].name,
+            record['name'],
+            record['function'],
+            record['line'],
+        ),
+        ',"message":',
+        _dumps(record['message']),
+    ]
+    if record['extra']:
+        parts += [',"extra":', _dumps(record['extra'])]
+    if record['exception']:
+        type_, value, tb = record['exception']
+        exception = {
+            'type': type_.__name__ if type_ else None,
+            'value': str(value),
+            'traceback': ''.join(traceback.format_exception(type_, value, tb)),
+        }
+        parts += [',"exception":', _dumps(exception)]
+    parts.append('}')
+    line = ''.join(parts).translate(_FORMAT_ESCAPES)
+    return f'{line}\n'
+
 
 def setup_logger(
     level: str | int = 'INFO',
@@ -26,8 +337,13 @@ def setup_logger(
     dst: str = '.logs',
     docker_dst: str = '/var/log/app',
     on_docker: bool = False,
+    batch: bool = False,
+    batch_max_records: int = 10_000,
+    batch_interval: float = 1.0,
+    batch_overflow: OverflowPolicy = 'block',
+    json_lines: bool = False,
 ) -> None:
-    """Sets up logger.
+    r"""Sets up logger.
 
     Parameters
     ----------
@@ -69,6 +385,30 @@ def setup_logger(
         ``on_docker`` is True, by default '/var/log/app'.
     on_docker : bool, optional
         Whether the app is running on docker, by default False.
+    batch : bool, optional
+        Whether to write the file in batches from a background thread
+        if ``use_file`` is True, by default False. Cheaper than
+        ``enqueue``, but does not support ``rotation`` nor
+        ``retention``. See ``BatchedFileSink``.
+    batch_max_records : int, optional
+        Maximum number of buffered records if ``batch`` is True,
+        by default 10 000.
+    batch_interval : float, optional
+        Maximum seconds a record stays buffered if ``batch`` is True,
+        by default 1.
+    batch_overflow : OverflowPolicy, optional
+        What to do when the buffer is full if ``batch`` is True,
+        by default 'block'.
+    json_lines : bool, optional
+        Whether to write one JSON object per record, with the
+        timestamp, level, location (``module:function:line``), message,
+        extra (bound context) and exception, instead of ``fmt``,
+        by default False. Serialized with orjson if it is installed.
+
+    Raises
+    ------
+    ValueError
+        If ``batch`` is used with ``rotation`` or ``retention``.
 
     Examples
     --------
@@ -78,8 +418,18 @@ def setup_logger(
     >>> setup_logger(fmt='<level>{message}</level>')
     >>> logger.info('info')
     info
+    >>> setup_logger(json_lines=True)
+    >>> logger.bind(user='ana').info('info')
+    {"timestamp":"2025-05-05T11:46:36.123-05:00","level":"INFO","location":"__main__:\u003cmodule>:1","message":"info","extra":{"user":"ana"}}
     """
+    if use_file and batch and (rotation or retention):
+        msg = 'batch does not support rotation nor retention'
+        raise ValueError(msg)
+
     logger.remove()
+    # loguru has no public getter for the current patcher
+    current = logger._core.patcher  # noqa: SLF001
+    logger.configure(patcher=_counting_patcher(current))
 
     fmt = (
         fmt
@@ -91,6 +441,9 @@ def setup_logger(
         )
         % alignment_width
     )
+    if json_lines:
+        fmt = _json_format
+        colorize = False
 
     logger.add(
         sink=sys.stderr,
@@ -110,6 +463,22 @@ def setup_logger(
             Path(dst).mkdir(parents=True, exist_ok=True)
             filepath = Path(dst) / filepath
 
+        if batch:
+            logger.add(
+                BatchedFileSink(
+                    filepath,
+                    max_records=batch_max_records,
+                    flush_interval=batch_interval,
+                    overflow=batch_overflow,
+                ),
+                level=level,
+                format=fmt,
+                backtrace=backtrace,
+                diagnose=diagnose,
+                colorize=colorize,
+            )
+            return
+
         logger.add(
             filepath,
             level=level,
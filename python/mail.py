@@ -1,65 +1,397 @@
-"""Mail class to send mails via SMTP."""
+"""Mail classes to send mails via SMTP."""
 
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
+import asyncio
+from collections.abc import Mapping, Sequence
+from concurrent.futures import Future
+from functools import partial
+from typing import TYPE_CHECKING
 
+from .async_smtp import AsyncSMTPPool
 from .config import config
+from .graceful_killer import GracefulKiller
 from .logger import logger
 from .mail_template import mail_template
+from .metrics import REGISTRY
+from .outbox import Outbox, OutboxFullError, OverflowPolicy
+from .smtp_pool import SMTPPool
+from .spool import MailSpool
+from .templates import HtmlMessageFactory, MailTemplate
+
+if TYPE_CHECKING:
+    # Python 3.11+
+    from typing import Self
+
+_mails = REGISTRY.counter(
+    'mails_total',
+    'Mails handled by Mail and AsyncMail, by status.',
+    ['status'],
+)
+# The message is HTML, as when it was replaced in the template
+_template = MailTemplate(mail_template, raw=('message',))
+
 
 class Mail:
     """Provide a method to send mails via SMTP."""
 
-    def __init__(self) -> None:
-        """Initialize the mails sender."""
-        self.__host = config.SMTP_HOST.strip()
-        self.__port = config.SMTP_PORT
+    def __init__(
+        self,
+        *,
+        pool_size: int = 1,
+        idle_timeout: float = 60.0,
+        outbox: bool = False,
+        outbox_size: int = 1000,
+        overflow: OverflowPolicy = 'block',
+        killer: GracefulKiller | None = None,
+        spool: str | None = None,
+        template: str | MailTemplate | None = None,
+    ) -> None:
+        """Initialize the mails sender.
+
+        Parameters
+        ----------
+        pool_size : int, optional
+            Maximum number of SMTP connections kept open, by default 1.
+        idle_timeout : float, optional
+            Seconds after which an unused connection is closed,
+            by default 60.
+        outbox : bool, optional
+            Whether to queue the mails and deliver them on a background
+            thread, so ``send`` does not block, by default False.
+        outbox_size : int, optional
+            Maximum number of queued mails if ``outbox`` is True,
+            by default 1000.
+        overflow : OverflowPolicy, optional
+            What to do when the outbox is full, by default 'block'.
+            See ``Outbox``.
+        killer : GracefulKiller | None, optional
+            Flush the outbox (or stop the spool) once its ``kill_now``
+            flag is set, by default None.
+        spool : str | None, optional
+            Path of a SQLite spool. If given, mails are stored on disk
+            before delivery and retried until the relay accepts them,
+            also after a restart, by default None. Cannot be used with
+            ``outbox``. See ``MailSpool``.
+        template : str | MailTemplate | None, optional
+            HTML template with a ``{{message}}`` placeholder, inserted
+            without escaping, and any other named placeholders,
+            by default the template of ``mail_template``.
+
+        Raises
+        ------
+        ValueError
+            If both ``outbox`` and ``spool`` are given.
+
+        """
+        if outbox and spool:
+            msg = 'outbox and spool cannot be used together'
+            raise ValueError(msg)
+
         self.__sender = config.SMTP_FROM.strip()
-        self.__to = config.SMTP_TO.strip()
-        self.__username = config.SMTP_USERNAME
-        self.__password = config.SMTP_PASSWORD
+        self.__to = config.SMTP_TO.split(',')
+        if isinstance(template, str):
+            template = MailTemplate(template, raw=('message',))
+        self.__template = template or _template
+        self.__factory = HtmlMessageFactory(self.__sender)
+        self.__pool = SMTPPool(
+            config.SMTP_HOST.strip(),
+            config.SMTP_PORT,
+            config.SMTP_USERNAME,
+            config.SMTP_PASSWORD,
+            size=pool_size,
+            idle_timeout=idle_timeout,
+        )
+        self.__outbox = (
+            Outbox(
+                self.__pool,
+                max_size=outbox_size,
+                policy=overflow,
+                killer=killer,
+            )
+            if outbox
+            else None
+        )
+        self.__spool = (
+            MailSpool(self.__pool, spool, killer=killer) if spool else None
+        )
 
-    def send(self, subject: str, message: str) -> None:
+    def send(
+        self,
+        subject: str,
+        message: str,
+        to: str | Sequence[str] | None = None,
+        **values: object,
+    ) -> Future | None:
         """Send a mail.
 
+        All the recipients get the same message in a single SMTP
+        transaction.
+
         Parameters
         ----------
         subject : str
             Subject.
         message : str
             Message.
+        to : str | Sequence[str] | None, optional
+            Recipient address or addresses, by default the comma
+            separated addresses of ``SMTP_TO``.
+        **values : object
+            Values of the other placeholders of the template.
+            They are HTML escaped.
+
+        Returns
+        -------
+        Future | None
+            With the outbox, a future of the delivery result,
+            otherwise None.
+
         """
         try:
-            if not self.__sender:
-                logger.warning('Correo no enviado. Remitente no establecido.')
-                return
+            recipients = _recipients(to, self.__to)
+            if not _can_send(self.__sender, recipients, subject, message):
+                return None
 
-            if not self.__to:
-                logger.warning(
-                    'Correo no enviado. Destinatario no establecido.'
-                )
-                return
+            body = self.__template.render(message=message, **values)
+            msg = self.__factory.build(recipients, subject, body)
 
-            if not subject or not message:
-                logger.warning(
-                    'Correo no enviado. El asunto y el mensaje son requeridos.'
+            if self.__spool is not None:
+                self.__spool.put(self.__sender, recipients, msg)
+                logger.info(f'Correo en cola para {", ".join(recipients)!r}')
+                _mails.inc(1, ('spooled',))
+                return None
+
+            if self.__outbox is not None:
+                future = self.__outbox.put(self.__sender, recipients, msg)
+                future.add_done_callback(
+                    partial(self._log_delivery, recipients),
                 )
-                return
-
-            msg = MIMEMultipart()
-            msg['From'] = self.__sender
-            msg['To'] = self.__to
-            msg['Subject'] = subject
-            body = mail_template.replace('{{message}}', message)
-            msg.attach(MIMEText(body, 'html'))
-
-            with smtplib.SMTP(self.__host, self.__port) as server:
-                server.set_debuglevel(False)
-                if self.__username and self.__password:
-                    server.login(self.__username, self.__password)
-                server.sendmail(self.__sender, self.__to, msg.as_string())
-
-            logger.success(f'Correo enviado correctamente a {self.__to!r}')
+                return future
+
+            self.__pool.sendmail(self.__sender, recipients, msg)
+
+            logger.success(
+                f'Correo enviado correctamente a {", ".join(recipients)!r}',
+            )
+            _mails.inc(1, ('success',))
         except Exception as e:
             logger.error(f'No se pudo enviar el correo: {str(e)}')
+            _mails.inc(1, ('failure',))
+        return None
+
+    def send_personalized(
+        self,
+        subject: str,
+        message: str,
+        recipients: Mapping[str, Mapping[str, object]],
+    ) -> list[Future | None]:
+        """Send a mail to each recipient with its own placeholder values.
+
+        The mails reuse the same pooled SMTP session.
+
+        Parameters
+        ----------
+        subject : str
+            Subject.
+        message : str
+            Message.
+        recipients : Mapping[str, Mapping[str, object]]
+            Placeholder values of each recipient address.
+
+        Returns
+        -------
+        list[Future | None]
+            Result of ``send`` for each recipient.
+
+        Examples
+        --------
+        >>> mail.send_personalized(
+        ...     'Reporte',
+        ...     'El reporte está listo',
+        ...     {'ana@example.com': {'name': 'Ana'}},
+        ... )
+        [None]
+
+        """
+        return [
+            self.send(subject, message, to, **values)
+            for to, values in recipients.items()
+        ]
+
+    def close(self) -> None:
+        """Deliver the queued mails and close the SMTP connections.
+
+        Spooled mails not yet delivered are kept on disk.
+        """
+        if self.__outbox is not None:
+            self.__outbox.close()
+        if self.__spool is not None:
+            self.__spool.close()
+        self.__pool.close()
+
+    def _log_delivery(self, recipients: list[str], future: Future) -> None:
+        if future.cancelled():
+            return
+
+        e = future.exception()
+        if e is None:
+            logger.success(
+                f'Correo enviado correctamente a {", ".join(recipients)!r}',
+            )
+            _mails.inc(1, ('success',))
+        elif isinstance(e, OutboxFullError):
+            logger.warning(
+                'Correo descartado. La bandeja de salida está llena.',
+            )
+            _mails.inc(1, ('dropped',))
+        else:
+            logger.error(f'No se pudo enviar el correo: {e}')
+            _mails.inc(1, ('failure',))
+
+
+class AsyncMail:
+    """asyncio counterpart of ``Mail``.
+
+    Sends mails over a pool of persistent SMTP sessions built on asyncio
+    streams, with STARTTLS, AUTH and PIPELINING when the server supports
+    them. Reads the same ``config`` and logs through the same ``logger``.
+
+    Examples
+    --------
+    >>> async with AsyncMail(max_sessions=4) as mail:
+    ...     await asyncio.gather(
+    ...         *(mail.send('Alerta', f'Error {i}') for i in range(100))
+    ...     )
+
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 4,
+        timeout: float = 30.0,
+        idle_timeout: float = 60.0,
+        template: str | MailTemplate | None = None,
+    ) -> None:
+        """Initialize the mails sender.
+
+        Parameters
+        ----------
+        max_sessions : int, optional
+            Maximum number of concurrent SMTP sessions, by default 4.
+        timeout : float, optional
+            Seconds to deliver a mail, including the wait for a free
+            session, by default 30.
+        idle_timeout : float, optional
+            Seconds after which an unused connection is closed,
+            by default 60.
+        template : str | MailTemplate | None, optional
+            HTML template, see ``Mail``.
+
+        """
+        self.__sender = config.SMTP_FROM.strip()
+        self.__to = config.SMTP_TO.split(',')
+        self.__timeout = timeout
+        if isinstance(template, str):
+            template = MailTemplate(template, raw=('message',))
+        self.__template = template or _template
+        self.__factory = HtmlMessageFactory(self.__sender)
+        self.__pool = AsyncSMTPPool(
+            config.SMTP_HOST.strip(),
+            config.SMTP_PORT,
+            config.SMTP_USERNAME,
+            config.SMTP_PASSWORD,
+            size=max_sessions,
+            idle_timeout=idle_timeout,
+        )
+
+    async def __aenter__(self) -> 'Self':
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        await self.close()
+
+    async def send(
+        self,
+        subject: str,
+        message: str,
+        to: str | Sequence[str] | None = None,
+        **values: object,
+    ) -> bool:
+        """Send a mail.
+
+        See ``Mail.send``. Cancelling the task aborts the delivery.
+
+        Parameters
+        ----------
+        subject : str
+            Subject.
+        message : str
+            Message.
+        to : str | Sequence[str] | None, optional
+            Recipient address or addresses, by default the comma
+            separated addresses of ``SMTP_TO``.
+        **values : object
+            Values of the other placeholders of the template.
+
+        Returns
+        -------
+        bool
+            Whether the mail was sent.
+
+        """
+        try:
+            recipients = _recipients(to, self.__to)
+            if not _can_send(self.__sender, recipients, subject, message):
+                return False
+
+            body = self.__template.render(message=message, **values)
+            msg = self.__factory.build(recipients, subject, body)
+            async with asyncio.timeout(self.__timeout):
+                await self.__pool.sendmail(self.__sender, recipients, msg)
+
+        except Exception as e:  # noqa: BLE001
+            # Like Mail.send, failures are logged instead of raised
+            logger.error(f'No se pudo enviar el correo: {str(e) or repr(e)}')
+            _mails.inc(1, ('failure',))
+            return False
+
+        logger.success(
+            f'Correo enviado correctamente a {", ".join(recipients)!r}',
+        )
+        _mails.inc(1, ('success',))
+        return True
+
+    async def close(self) -> None:
+        """Close the SMTP connections."""
+        await self.__pool.close()
+
+
+def _recipients(
+    to: str | Sequence[str] | None,
+    default: Sequence[str],
+) -> list[str]:
+    if to is None:
+        to = default
+    elif isinstance(to, str):
+        to = to.split(',')
+    return [address.strip() for address in to if address.strip()]
+
+
+def _can_send(
+    sender: str,
+    recipients: list[str],
+    subject: str,
+    message: str,
+) -> bool:
+    if not sender:
+        logger.warning('Correo no enviado. Remitente no establecido.')
+    elif not recipients:
+        logger.warning('Correo no enviado. Destinatario no establecido.')
+    elif not subject or not message:
+        logger.warning(
+            'Correo no enviado. El asunto y el mensaje son requeridos.',
+        )
+    else:
+        return True
+
+    _mails.inc(1, ('skipped',))
+    return False
@@ -0,0 +1,410 @@
+"""In-process metrics with Prometheus text exposition to a file.
+
+The exposition file is meant for the textfile collector of
+node-exporter, so no network listener is required.
+"""
+
+import abc
+import bisect
+import math
+import os
+import threading
+from collections.abc import Sequence
+from pathlib import Path
+
+Labels = tuple[str, ...]
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    300.0,
+)
+
+
+class _Metric(abc.ABC):
+    type_ = ''
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    @abc.abstractmethod
+    def _merged(self) -> dict:
+        """Return the current value of every label set."""
+
+    def _format_labels(self, labels: Labels, extra: str = '') -> str:
+        pairs = [
+            f'{name}="{_escape(value)}"'
+            for name, value in zip(self.labelnames, labels, strict=True)
+        ]
+        if extra:
+            pairs.append(extra)
+        return '{' + ','.join(pairs) + '}' if pairs else ''
+
+    def expose(self) -> str:
+        """Return the metric in Prometheus text format."""
+        lines = [
+            f'# HELP {self.name} {_escape(self.documentation, quotes=False)}',
+            f'# TYPE {self.name} {self.type_}',
+        ]
+        lines.extend(self._samples())
+        return '\n'.join(lines) + '\n'
+
+    def _samples(self) -> list[str]:
+        return [
+            f'{self.name}{self._format_labels(labels)} {_number(value)}'
+            for labels, value in sorted(self._merged().items())
+        ]
+
+
+class _ShardedMetric(_Metric):
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._local = threading.local()
+        self._shards: dict[threading.Thread, dict] = {}
+        # Values of the finished threads
+        self._base: dict = {}
+
+    def _shard(self) -> dict:
+        """Return the values written by the current thread.
+
+        Each thread updates its own dict, so updates need no lock
+        and are never lost. Shards are merged on exposition, and those
+        of finished threads are folded into a single dict.
+        """
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._local.values = {}
+            with self._lock:
+                self._fold_finished()
+                self._shards[threading.current_thread()] = values
+            return values
+
+    def _merged(self) -> dict:
+        merged: dict = {}
+        with self._lock:
+            self._fold_finished()
+            self._add(merged, self._base)
+            shards = list(self._shards.values())
+        for shard in shards:
+            self._add(merged, shard)
+        return merged
+
+    def _fold_finished(self) -> None:
+        # A finished thread no longer writes to its shard
+        for thread in [t for t in self._shards if not t.is_alive()]:
+            self._add(self._base, self._shards.pop(thread))
+
+    @abc.abstractmethod
+    def _add(self, total: dict, shard: dict) -> None:
+        """Add the values of a shard to ``total``."""
+
+
+class Counter(_ShardedMetric):
+    """Monotonically increasing counter."""
+
+    type_ = 'counter'
+
+    def inc(self, amount: float = 1, labels: Labels = ()) -> None:
+        """Increase the counter.
+
+        Parameters
+        ----------
+        amount : float, optional
+            Amount to add, by default 1.
+        labels : Labels, optional
+            Label values, in the order of ``labelnames``, by default ().
+
+        """
+        values = self._shard()
+        values[labels] = values.get(labels, 0) + amount
+
+    def value(self, labels: Labels = ()) -> float:
+        """Return the current value of the counter."""
+        return self._merged().get(labels, 0)
+
+    def _add(
+        self,
+        total: dict[Labels, float],
+        shard: dict[Labels, float],
+    ) -> None:
+        for labels, value in list(shard.items()):
+            total[labels] = total.get(labels, 0) + value
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    type_ = 'gauge'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[Labels, float] = {}
+
+    def set(self, value: float, labels: Labels = ()) -> None:
+        """Set the gauge to a value."""
+        self._values[labels] = value
+
+    def inc(self, amount: float = 1, labels: Labels = ()) -> None:
+        """Increase (or decrease, if negative) the gauge."""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels: Labels = ()) -> float:
+        """Return the current value of the gauge."""
+        return self._values.get(labels, 0)
+
+    def _merged(self) -> dict[Labels, float]:
+        return dict(self._values)
+
+
+class Histogram(_ShardedMetric):
+    """Distribution of values over fixed buckets."""
+
+    type_ = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        """Record a value.
+
+        Parameters
+        ----------
+        value : float
+            Observed value.
+        labels : Labels, optional
+            Label values, in the order of ``labelnames``, by default ().
+
+        """
+        values = self._shard()
+        counts = values.get(labels)
+        if counts is None:
+            # Bucket counts, then +Inf count, then sum
+            counts = values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def _add(
+        self,
+        total: dict[Labels, list[float]],
+        shard: dict[Labels, list[float]],
+    ) -> None:
+        for labels, counts in list(shard.items()):
+            merged = total.setdefault(labels, [0] * len(counts))
+            for i, count in enumerate(list(counts)):
+                merged[i] += count
+
+    def _samples(self) -> list[str]:
+        lines = []
+        for labels, counts in sorted(self._merged().items()):
+            cumulative = 0
+            for bound, count in zip(
+                (*self.buckets, math.inf),
+                counts[:-1],
+                strict=True,
+            ):
+                cumulative += count
+                le = self._format_labels(labels, f'le="{_number(bound)}"')
+                lines.append(f'{self.name}_bucket{le} {cumulative}')
+            label_str = self._format_labels(labels)
+            lines.append(f'{self.name}_sum{label_str} {_number(counts[-1])}')
+            lines.append(f'{self.name}_count{label_str} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics that can be exposed together.
+
+    Examples
+    --------
+    >>> registry = MetricsRegistry()
+    >>> rows = registry.counter('rows_total', 'Processed rows.', ['source'])
+    >>> rows.inc(100, ('sales',))
+    >>> print(registry.exposition())
+    # HELP rows_total Processed rows.
+    # TYPE rows_total counter
+    rows_total{source="sales"} 100
+
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+    ) -> Counter:
+        """Return the counter ``name``, creating it if needed."""
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+    ) -> Gauge:
+        """Return the gauge ``name``, creating it if needed."""
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Return the histogram ``name``, creating it if needed."""
+        return self._get_or_create(
+            Histogram,
+            name,
+            documentation,
+            labelnames,
+            buckets=buckets,
+        )
+
+    def exposition(self) -> str:
+        """Return all the metrics in Prometheus text format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return ''.join(metric.expose() for metric in metrics)
+
+    def write(self, filepath: str) -> None:
+        """Write the exposition to a file atomically.
+
+        Parameters
+        ----------
+        filepath : str
+            File path, usually ending with ``.prom`` inside the
+            directory of the node-exporter textfile collector.
+
+        """
+        tmp_path = Path(f'{filepath}.{os.getpid()}.tmp')
+        with tmp_path.open('w') as f:
+            f.write(self.exposition())
+        tmp_path.replace(filepath)
+
+    def _get_or_create(
+        self,
+        cls: type[_Metric],
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        **kwargs,
+    ) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, documentation, labelnames, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                msg = (
+                    f'metric {name!r} is already registered'
+                    f' as a {metric.type_}'
+                )
+                raise TypeError(msg)
+            return metric
+
+
+REGISTRY = MetricsRegistry()
+
+
+class TextfileExporter(threading.Thread):
+    """Writes a registry to a file periodically on a background thread.
+
+    Examples
+    --------
+    >>> exporter = TextfileExporter(
+    ...     '/var/lib/node_exporter/textfile/app.prom', interval=15
+    ... )
+    >>> exporter.start()
+    >>> exporter.stop()  # Writes the file one last time
+
+    """
+
+    def __init__(
+        self,
+        filepath: str,
+        interval: float = 15.0,
+        registry: MetricsRegistry | None = None,
+    ) -> None:
+        """Create the exporter.
+
+        Parameters
+        ----------
+        filepath : str
+            Exposition file path.
+        interval : float, optional
+            Seconds between writes, by default 15.
+        registry : MetricsRegistry | None, optional
+            Registry to export, by default ``REGISTRY``.
+
+        """
+        super().__init__(daemon=True)
+        self.filepath = filepath
+        self.interval = interval
+        self.registry = registry or REGISTRY
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.registry.write(self.filepath)
+
+    def stop(self) -> None:
+        """Stop the exporter and write the file a last time."""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join()
+        self.registry.write(self.filepath)
+
+
+def _escape(value: str, quotes: bool = True) -> str:
+    value = str(value).replace('\\', '\\\\').replace('\n', '\\n')
+    return value.replace('"', '\\"') if quotes else value
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
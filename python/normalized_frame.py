@@ -0,0 +1,284 @@
+"""NormalizedFrame class to filter a DataFrame by normalized values."""
+
+from collections.abc import Hashable, Sequence
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame, Index, Series
+
+from .utils import normalize_series, normalize_string
+
+
+class _ColumnIndex:
+    """Normalized shadow of a column with a hash index of its values.
+
+    Keeps a reference to the column it was built from, see ``matches``.
+    """
+
+    def __init__(self, column: Series) -> None:
+        self.column = column
+        self.normalized = normalize_series(column, unique=True)
+        self.codes, self.uniques = pd.factorize(self.normalized)
+        self.positions = {value: i for i, value in enumerate(self.uniques)}
+        valid = self.codes >= 0
+        self.order = np.flatnonzero(valid)[
+            np.argsort(self.codes[valid], kind='stable')
+        ]
+        counts = np.bincount(self.codes[valid], minlength=len(self.uniques))
+        self.offsets = np.concatenate(([0], np.cumsum(counts)))
+
+    def matches(self, column: Series) -> bool:
+        """Check the column still has the values it was built from.
+
+        With Copy-on-Write, the frame copies the values of a column
+        before changing them while this reference to them is alive, so
+        they are compared by identity instead of by content.
+        """
+        old, new = self.column, column
+        if isinstance(old.dtype, np.dtype):
+            return old.dtype == new.dtype and np.may_share_memory(
+                old.to_numpy(),
+                new.to_numpy(),
+            )
+        return old.array is new.array
+
+    def mask(self, values: Sequence[str]) -> np.ndarray:
+        result = np.zeros(len(self.codes), dtype=bool)
+        for value in values:
+            code = self.positions.get(value)
+            if code is not None:
+                rows = self.order[self.offsets[code] : self.offsets[code + 1]]
+                result[rows] = True
+        return result
+
+
+class NormalizedFrame:
+    """Wrap a ``DataFrame`` to filter it by normalized values.
+
+    The normalized shadow of each column is computed the first time
+    the column is queried and cached along with a hash index of its
+    values, so repeated ``equal_to`` and ``isin`` filters are index
+    probes instead of full-column string comparisons.
+
+    Changes made through the wrapper discard the cached shadow. Thanks
+    to Copy-on-Write (the default since pandas 3.0), changes made
+    directly to the wrapped ``DataFrame``, like ``df.loc`` updates or
+    ``df.drop(..., inplace=True)``, give the column new values, which
+    each query detects by identity, without scanning the column. The
+    first such change copies the column once. ``invalidate`` discards
+    the cache explicitly.
+
+    Examples
+    --------
+    >>> import pandas as pd
+    >>> df = pd.DataFrame({'city': ['Bogotá', 'Cali', 'bogota']})
+    >>> frame = NormalizedFrame(df)
+    >>> frame.equal_to('city', 'Bogota')
+    0     True
+    1    False
+    2     True
+    Name: city, dtype: bool
+    >>> df[frame.isin('city', ['cali', 'medellín'])]
+       city
+    1  Cali
+
+    """
+
+    def __init__(self, df: DataFrame) -> None:
+        """Wrap a ``DataFrame``.
+
+        Parameters
+        ----------
+        df : DataFrame
+            DataFrame to be wrapped.
+
+        """
+        self.__df = df
+        self.__indexes: dict[Hashable, _ColumnIndex] = {}
+
+    @property
+    def df(self) -> DataFrame:
+        """Wrapped ``DataFrame``."""
+        return self.__df
+
+    def __getitem__(self, column: Hashable) -> Series:
+        return self.__df[column]
+
+    def __setitem__(self, column: Hashable, value: object) -> None:
+        self.__df[column] = value
+        self.invalidate(column)
+
+    def __delitem__(self, column: Hashable) -> None:
+        del self.__df[column]
+        self.invalidate(column)
+
+    def __len__(self) -> int:
+        return len(self.__df)
+
+    def invalidate(self, column: Hashable | None = None) -> None:
+        """Discard the cached shadow of a column.
+
+        Parameters
+        ----------
+        column : Hashable | None, optional
+            Column name, by default None (all columns).
+
+        """
+        if column is None:
+            self.__indexes.clear()
+        else:
+            self.__indexes.pop(column, None)
+
+    def normalized(self, column: Hashable) -> Series:
+        """Return the normalized shadow of a column.
+
+        Parameters
+        ----------
+        column : Hashable
+            Column name.
+
+        Returns
+        -------
+        Series
+            Normalized column.
+
+        """
+        return self.__index(column).normalized
+
+    def equal_to(
+        self,
+        column: Hashable,
+        value: str,
+        normalize_value: bool = True,
+    ) -> Series:
+        """Compare a normalized column with a value.
+
+        Parameters
+        ----------
+        column : Hashable
+            Column name.
+        value : str
+            Value to compare with.
+        normalize_value : bool, optional
+            Normalize value, by default True.
+
+        Returns
+        -------
+        Series
+            Boolean Series with the comparison result.
+
+        """
+        return self.isin(column, [value], normalize_value)
+
+    def not_equal_to(
+        self,
+        column: Hashable,
+        value: str,
+        normalize_value: bool = True,
+    ) -> Series:
+        """Compare a normalized column with a value.
+
+        Parameters
+        ----------
+        column : Hashable
+            Column name.
+        value : str
+            Value to compare with.
+        normalize_value : bool, optional
+            Normalize value, by default True.
+
+        Returns
+        -------
+        Series
+            Boolean Series with the comparison result.
+
+        """
+        return ~self.equal_to(column, value, normalize_value)
+
+    def isin(
+        self,
+        column: Hashable,
+        values: Series | Sequence[str],
+        normalize_value: bool = True,
+    ) -> Series:
+        """Compare a normalized column with a list of values.
+
+        Parameters
+        ----------
+        column : Hashable
+            Column name.
+        values : Series | Sequence[str]
+            Series or sequence of values to compare with.
+        normalize_value : bool, optional
+            Normalize values, by default True.
+
+        Returns
+        -------
+        Series
+            Boolean Series with the comparison result.
+
+        """
+        if normalize_value:
+            if isinstance(values, Series):
+                values = normalize_series(values, unique=True)
+            else:
+                values = [normalize_string(str(v)) for v in values]
+
+        index = self.__index(column)
+        return Series(
+            index.mask(pd.unique(Index(values))),
+            index=self.__df.index,
+            name=column,
+        )
+
+    def contains(
+        self,
+        column: Hashable,
+        value: str | Sequence[str],
+        regex: bool = False,
+        normalize_value: bool = True,
+    ) -> Series:
+        """Check if a normalized column contains a value.
+
+        Only the unique values of the column are scanned.
+
+        Parameters
+        ----------
+        column : Hashable
+            Column name.
+        value : str | Sequence[str]
+            Value to look for.
+        regex : bool, optional
+            Whether to use regular expressions, by default False.
+        normalize_value : bool, optional
+            Normalize value, by default True.
+
+        Returns
+        -------
+        Series
+            Boolean Series with the comparison result.
+
+        """
+        if isinstance(value, str):
+            value = [value]
+        if normalize_value and not regex:
+            value = [normalize_string(v) for v in value]
+
+        index = self.__index(column)
+        uniques = Series(index.uniques, dtype=object)
+        found = np.zeros(len(uniques) + 1, dtype=bool)  # Last is for NaN
+        for pattern in ['|'.join(value)] if regex else value:
+            found[:-1] |= uniques.str.contains(pattern, regex=regex).to_numpy(
+                dtype=bool,
+                na_value=False,
+            )
+
+        return Series(found[index.codes], index=self.__df.index, name=column)
+
+    def __index(self, column: Hashable) -> _ColumnIndex:
+        series = self.__df[column]
+        index = self.__indexes.get(column)
+        if index is None or not index.matches(series):
+            index = _ColumnIndex(series)
+            self.__indexes[column] = index
+        return index
@@ -0,0 +1,308 @@
+"""Bounded outbox delivering mails on a background thread."""
+
+import atexit
+import dataclasses
+import queue
+import smtplib
+import threading
+from collections.abc import Sequence
+from concurrent.futures import Future
+from typing import Literal
+
+from .graceful_killer import GracefulKiller
+from .metrics import REGISTRY
+from .smtp_pool import SMTPPool
+
+OverflowPolicy = Literal['block', 'drop_newest', 'drop_oldest']
+
+_depth = REGISTRY.gauge('mail_outbox_depth', 'Mails waiting in the outbox.')
+_dropped = REGISTRY.counter(
+    'mail_outbox_dropped_total',
+    'Mails dropped because the outbox was full.',
+)
+
+# Errors that concern a single message, not the connection
+_MESSAGE_ERRORS = (
+    smtplib.SMTPRecipientsRefused,
+    smtplib.SMTPSenderRefused,
+    smtplib.SMTPDataError,
+)
+
+
+class OutboxFullError(Exception):
+    """The mail was dropped because the outbox was full."""
+
+
+class OutboxClosedError(Exception):
+    """The mail was not queued because the outbox is closed."""
+
+
+@dataclasses.dataclass
+class _Envelope:
+    sender: str
+    to: str | Sequence[str]
+    msg: str
+    future: Future
+
+
+class Outbox:
+    """Queue of mails delivered in batches by a background thread.
+
+    ``put`` returns immediately with a future of the delivery result.
+    The worker takes up to ``batch_size`` queued mails at a time and
+    sends them over a single SMTP session. When the queue is full,
+    ``policy`` decides whether ``put`` waits (``'block'``), rejects the
+    new mail (``'drop_newest'``) or discards the oldest queued mail
+    (``'drop_oldest'``); dropped mails fail with ``OutboxFullError``.
+
+    Queued mails are flushed by ``close``, at interpreter exit and,
+    if a ``GracefulKiller`` is given, as soon as ``kill_now`` is set.
+
+    Examples
+    --------
+    >>> outbox = Outbox(SMTPPool('localhost', 1025), max_size=1000)
+    >>> future = outbox.put('app@example.com', 'ops@example.com', msg)
+    >>> future.result(timeout=30)
+    {}
+    >>> outbox.close()
+
+    """
+
+    def __init__(
+        self,
+        pool: SMTPPool,
+        max_size: int = 1000,
+        *,
+        batch_size: int = 50,
+        policy: OverflowPolicy = 'block',
+        block_timeout: float | None = None,
+        killer: GracefulKiller | None = None,
+        poll_interval: float = 0.5,
+    ) -> None:
+        """Create the outbox and start its worker.
+
+        Parameters
+        ----------
+        pool : SMTPPool
+            Connections used to deliver the mails.
+        max_size : int, optional
+            Maximum number of queued mails, by default 1000.
+        batch_size : int, optional
+            Maximum number of mails sent over one session, by default 50.
+        policy : OverflowPolicy, optional
+            What to do when the queue is full, by default 'block'.
+        block_timeout : float | None, optional
+            Seconds to wait for room with the 'block' policy before
+            dropping the new mail, by default None (wait forever).
+        killer : GracefulKiller | None, optional
+            Flush and stop once its ``kill_now`` flag is set,
+            by default None.
+        poll_interval : float, optional
+            Seconds between checks of ``kill_now`` while idle,
+            by default 0.5.
+
+        """
+        self.pool = pool
+        self.batch_size = batch_size
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.killer = killer
+        self.poll_interval = poll_interval
+        self._queue: queue.Queue[_Envelope] = queue.Queue(max_size)
+        self._lock = threading.Lock()
+        self._closed = False
+        # Blocking puts in progress, waiting for room in the queue
+        self._putting = 0
+        self._stop = threading.Event()
+        self._worker = threading.Thread(
+            target=self._run,
+            name='mail-outbox',
+            daemon=True,
+        )
+        self._worker.start()
+        atexit.register(self.close)
+
+    def put(self, sender: str, to: str | Sequence[str], msg: str) -> Future:
+        """Queue a mail.
+
+        Parameters
+        ----------
+        sender : str
+            Sender address.
+        to : str | Sequence[str]
+            Recipient address or addresses.
+        msg : str
+            Message.
+
+        Returns
+        -------
+        Future
+            Resolves to the refused recipients (see
+            ``smtplib.SMTP.sendmail``) or fails with the delivery error.
+
+        """
+        envelope = _Envelope(sender, to, msg, Future())
+        # Mails are queued holding the lock, so the worker cannot see
+        # an empty queue and exit while a mail is being queued
+        with self._lock:
+            if self._closed:
+                envelope.future.set_exception(
+                    OutboxClosedError('Outbox is closed'),
+                )
+                return envelope.future
+            if self.policy != 'block':
+                self._put_nowait(envelope)
+                return envelope.future
+            self._putting += 1
+
+        # A blocking put waits without the lock, so close can time out;
+        # the worker keeps running until the pending puts are queued
+        try:
+            self._queue.put(envelope, timeout=self.block_timeout)
+        except queue.Full:
+            self._drop(envelope)
+        finally:
+            with self._lock:
+                self._putting -= 1
+                # The worker only exits once the pending puts are done,
+                # unless it died, and then nothing would deliver this
+                if self._closed and not self._worker.is_alive():
+                    self._fail_queued()
+        _depth.set(self._queue.qsize())
+        return envelope.future
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until the queued mails are delivered.
+
+        Parameters
+        ----------
+        timeout : float | None, optional
+            Seconds to wait, by default None (forever).
+
+        Returns
+        -------
+        bool
+            Whether the queue was emptied in time.
+
+        """
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(
+                lambda: not self._queue.unfinished_tasks,
+                timeout,
+            )
+
+    def close(self, timeout: float | None = None) -> None:
+        """Stop accepting mails and deliver the queued ones.
+
+        Parameters
+        ----------
+        timeout : float | None, optional
+            Seconds to wait for the delivery, by default None (forever).
+            The mails still queued then fail with
+            ``OutboxClosedError``.
+
+        """
+        with self._lock:
+            self._closed = True
+        self._stop.set()
+        if self._worker.is_alive():
+            self._worker.join(timeout)
+        if self._worker.is_alive():
+            self._fail_queued()
+        atexit.unregister(self.close)
+
+    def _fail_queued(self) -> None:
+        # The batch being delivered is left to the worker
+        while True:
+            try:
+                envelope = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if envelope.future.set_running_or_notify_cancel():
+                envelope.future.set_exception(
+                    OutboxClosedError('Outbox closed before delivery'),
+                )
+            self._queue.task_done()
+        _depth.set(self._queue.qsize())
+
+    def _put_nowait(self, envelope: _Envelope) -> None:
+        while True:
+            try:
+                self._queue.put_nowait(envelope)
+                break
+            except queue.Full:
+                if self.policy == 'drop_newest':
+                    self._drop(envelope)
+                    break
+            try:
+                oldest = self._queue.get_nowait()
+            except queue.Empty:
+                continue
+            self._queue.task_done()
+            self._drop(oldest)
+        _depth.set(self._queue.qsize())
+
+    def _drop(self, envelope: _Envelope) -> None:
+        _dropped.inc()
+        if envelope.future.set_running_or_notify_cancel():
+            envelope.future.set_exception(OutboxFullError('Outbox is full'))
+
+    def _stopping(self) -> bool:
+        return self._stop.is_set() or bool(
+            self.killer and self.killer.kill_now,
+        )
+
+    def _run(self) -> None:
+        while True:
+            try:
+                batch = [self._queue.get(timeout=self.poll_interval)]
+            except queue.Empty:
+                if self._stopping():
+                    with self._lock:
+                        self._closed = True
+                        # Mails may have been queued while closing
+                        if self._queue.empty() and not self._putting:
+                            break
+                continue
+
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            _depth.set(self._queue.qsize())
+
+            try:
+                self._deliver(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _deliver(self, batch: list[_Envelope]) -> None:
+        pending = [e for e in batch if e.future.set_running_or_notify_cancel()]
+        error: BaseException | None = None
+        # A dropped connection is retried once on a new one
+        for _ in range(2):
+            try:
+                with self.pool.connection() as server:
+                    while pending:
+                        envelope = pending[0]
+                        try:
+                            refused = server.sendmail(
+                                envelope.sender,
+                                envelope.to,
+                                envelope.msg,
+                            )
+                        except _MESSAGE_ERRORS as e:
+                            envelope.future.set_exception(e)
+                        else:
+                            envelope.future.set_result(refused)
+                        pending.pop(0)
+            except Exception as e:  # noqa: BLE001
+                # Any error is handed to the futures of the pending mails
+                error = e
+            else:
+                return
+
+        for envelope in pending:
+            envelope.future.set_exception(error)
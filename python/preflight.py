@@ -0,0 +1,242 @@
+"""Header-only validation of Excel and CSV files before loading them.
+
+Install openpyxl with:
+    pip install openpyxl
+"""
+
+import zipfile
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pandas as pd
+
+from .ingestion import EXCEL_EXTENSIONS, get_worksheet, sheet_label
+from .utils import (
+    ExternalReadingError,
+    excel_reading_exc_middleware,
+    normalize_string,
+)
+
+try:
+    from openpyxl import load_workbook
+    from openpyxl.utils.exceptions import InvalidFileException
+except ImportError:
+    load_workbook = None
+    InvalidFileException = zipfile.BadZipFile
+
+if TYPE_CHECKING:
+    from openpyxl.workbook import Workbook
+
+# Errors of a file that cannot be read at all, reported by
+# validate_headers instead of aborting the other files. ValueError
+# covers the pandas parser and decoding errors.
+_READ_ERRORS = (OSError, ValueError, zipfile.BadZipFile, InvalidFileException)
+
+
+def list_sheets(filepath: str) -> list[str]:
+    """List the sheets of an Excel file without loading them.
+
+    Parameters
+    ----------
+    filepath : str
+        Excel file path.
+
+    Returns
+    -------
+    list[str]
+        Sheet names.
+
+    """
+    wb = _load_workbook(filepath)
+    try:
+        return wb.sheetnames
+    finally:
+        wb.close()
+
+
+def read_header(
+    filepath: str,
+    sheet_name: str | int = 0,
+    **read_kwargs,
+) -> list[str]:
+    """Read only the header row of an Excel sheet or CSV file.
+
+    Excel files are opened in read-only mode, so only the first row
+    of the sheet is parsed.
+
+    Parameters
+    ----------
+    filepath : str
+        Excel (.xlsx, .xlsm) or CSV file path.
+    sheet_name : str | int, optional
+        Excel sheet name or position, by default 0.
+    **read_kwargs
+        Extra arguments for ``pandas.read_csv``.
+
+    Returns
+    -------
+    list[str]
+        Column names, as they are in the file.
+
+    Raises
+    ------
+    ExternalReadingError
+        If the sheet is not found.
+
+    """
+    if not filepath.lower().endswith(EXCEL_EXTENSIONS):
+        return [
+            str(col) for col in pd.read_csv(filepath, nrows=0, **read_kwargs)
+        ]
+
+    wb = _load_workbook(filepath)
+    try:
+        ws = get_worksheet(wb, sheet_name, Path(filepath).name)
+        row = next(ws.iter_rows(max_row=1, values_only=True), ())
+        return ['' if value is None else str(value) for value in row]
+    finally:
+        wb.close()
+
+
+def validate_header(
+    filepath: str,
+    columns: Sequence[str],
+    sheet_name: str | int = 0,
+    normalized: bool = False,
+    **read_kwargs,
+) -> list[str]:
+    """Check the required columns reading only the header row.
+
+    Works on an Excel sheet or a CSV file.
+
+    Column names are compared ignoring leading and trailing whitespaces,
+    like ``usecols`` does. If ``normalized`` is True, they are compared
+    once normalized with ``normalize_string``.
+
+    Parameters
+    ----------
+    filepath : str
+        Excel (.xlsx, .xlsm) or CSV file path.
+    columns : Sequence[str]
+        Required columns.
+    sheet_name : str | int, optional
+        Excel sheet name or position, by default 0.
+    normalized : bool, optional
+        Compare normalized column names, by default False.
+    **read_kwargs
+        Extra arguments for ``pandas.read_csv``.
+
+    Returns
+    -------
+    list[str]
+        Column names of the file matching ``columns``, in the order
+        of ``columns``.
+
+    Raises
+    ------
+    ExternalReadingError
+        If the sheet or a column is not found.
+
+    Examples
+    --------
+    >>> validate_header('sales.xlsx', ['City', 'Total'], 'Ventas')
+    [' City', 'Total ']
+    >>> validate_header('sales.xlsx', ['CIUDAD'], 'Ventas')
+    Traceback (most recent call last):
+        ...
+    ExternalReadingError: No se encontró la columna 'CIUDAD' en la hoja 'Ventas' del archivo 'sales.xlsx'
+
+    """
+    header = read_header(filepath, sheet_name, **read_kwargs)
+    key = normalize_string if normalized else str.strip
+    found = {key(name): name for name in reversed(header)}
+
+    matched = []
+    for col in columns:
+        name = found.get(key(col))
+        if name is None:
+            raise excel_reading_exc_middleware(
+                KeyError(col),
+                Path(filepath).name,
+                sheet_label(sheet_name),
+            )
+        matched.append(name)
+    return matched
+
+
+def validate_headers(
+    filepaths: Iterable[str],
+    columns: Sequence[str],
+    sheet_name: str | int = 0,
+    normalized: bool = False,
+    max_workers: int | None = None,
+    **read_kwargs,
+) -> dict[str, ExternalReadingError | None]:
+    """Validate the headers of many files concurrently.
+
+    See ``validate_header``. A file that cannot be read, because it is
+    missing, is not a valid Excel file or cannot be parsed as CSV, is
+    reported as an ``ExternalReadingError`` caused by the original
+    error instead of stopping the validation of the other files.
+
+    Parameters
+    ----------
+    filepaths : Iterable[str]
+        Excel (.xlsx, .xlsm) or CSV file paths.
+    columns : Sequence[str]
+        Required columns.
+    sheet_name : str | int, optional
+        Excel sheet name or position, by default 0.
+    normalized : bool, optional
+        Compare normalized column names, by default False.
+    max_workers : int | None, optional
+        Number of threads, by default None.
+    **read_kwargs
+        Extra arguments for ``pandas.read_csv``.
+
+    Returns
+    -------
+    dict[str, ExternalReadingError | None]
+        Error of each file, or None if it is valid.
+
+    Examples
+    --------
+    >>> errors = validate_headers(glob('inputs/*.xlsx'), ['City', 'Total'])
+    >>> [str(e) for e in errors.values() if e]
+    ["No se encontró la columna 'Total' en la hoja predeterminada del archivo 'b.xlsx'"]
+
+    """
+
+    def validate(filepath: str) -> ExternalReadingError | None:
+        try:
+            validate_header(
+                filepath,
+                columns,
+                sheet_name,
+                normalized,
+                **read_kwargs,
+            )
+        except ExternalReadingError as e:
+            return e
+        except _READ_ERRORS as e:
+            error = ExternalReadingError(
+                f'No se pudo leer el archivo {Path(filepath).name!r}: {e}',
+            )
+            error.__cause__ = e
+            return error
+        return None
+
+    filepaths = list(filepaths)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(
+            zip(filepaths, executor.map(validate, filepaths), strict=True),
+        )
+
+
+def _load_workbook(filepath: str) -> 'Workbook':
+    if load_workbook is None:
+        msg = 'Excel input requires openpyxl: pip install openpyxl'
+        raise ImportError(msg)
+    return load_workbook(filepath, read_only=True)
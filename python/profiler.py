@@ -0,0 +1,355 @@
+"""Profiler class to measure nested spans of code."""
+
+import contextvars
+import dataclasses
+import itertools
+import json
+import random
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from functools import wraps
+from typing import overload
+
+
+@dataclasses.dataclass
+class SpanStats:
+    """Aggregated durations of a span, in milliseconds.
+
+    Percentiles are computed over a bounded random sample
+    of the durations.
+    """
+
+    count: int
+    total: float
+    min: float
+    max: float
+    p50: float
+    p95: float
+    p99: float
+
+    @property
+    def mean(self) -> float:
+        """Mean duration."""
+        return self.total / self.count if self.count else 0.0
+
+
+class _SpanRecord:
+    __slots__ = ('count', 'max', 'min', 'samples', 'total')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+        self.samples: list[int] = []
+
+
+class Profiler:
+    """Hierarchical span profiler.
+
+    Spans are measured with ``time.perf_counter_ns`` and can be nested,
+    both across function calls and across ``await`` points. Durations
+    are aggregated per span name and per call stack, so they can be
+    exported as JSON or as collapsed stacks for flamegraph tools.
+
+    Examples
+    --------
+    >>> profiler = Profiler()
+    >>> @profiler.profile
+    ... def load(): ...
+    >>> @profiler.profile(sample_every=100)
+    ... def parse_row(row): ...
+    >>> with profiler.span('pipeline'):
+    ...     load()
+    >>> profiler.stats()['load'].p95
+    12.5
+    >>> profiler.to_collapsed('profile.folded')
+
+    """
+
+    def __init__(self, max_samples: int = 10_000) -> None:
+        """Create a profiler.
+
+        Parameters
+        ----------
+        max_samples : int, optional
+            Maximum number of durations kept per span name to compute
+            percentiles, by default 10 000.
+
+        """
+        self.max_samples = max_samples
+        self._records: dict[str, _SpanRecord] = {}
+        self._stacks: dict[tuple[str, ...], int] = {}
+        self._lock = threading.Lock()
+        self._stack: contextvars.ContextVar[tuple[str, ...]] = (
+            contextvars.ContextVar(f'profiler_stack_{id(self)}', default=())
+        )
+        self._children: contextvars.ContextVar[list[int] | None] = (
+            contextvars.ContextVar(
+                f'profiler_children_{id(self)}',
+                default=None,
+            )
+        )
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Measure a block of code as a span.
+
+        Parameters
+        ----------
+        name : str
+            Span name.
+
+        """
+        with self._span(name):
+            yield
+
+    @contextmanager
+    def _span(self, name: str, weight: int = 1) -> Iterator[None]:
+        stack = (*self._stack.get(), name)
+        stack_token = self._stack.set(stack)
+        children: list[int] = [0]
+        children_token = self._children.set(children)
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            self._children.reset(children_token)
+            self._stack.reset(stack_token)
+            parent_children = self._children.get()
+            if parent_children is not None:
+                parent_children[0] += elapsed
+            self._record(
+                stack,
+                elapsed,
+                max(elapsed - children[0], 0),
+                weight,
+            )
+
+    def record(self, name: str, elapsed: int) -> None:
+        """Record a span measured elsewhere.
+
+        The span is nested in the current span, if any.
+        Useful for executions that cannot be enclosed in ``span``,
+        like generators, which are suspended between items.
+
+        Parameters
+        ----------
+        name : str
+            Span name.
+        elapsed : int
+            Duration in nanoseconds.
+
+        """
+        parent_children = self._children.get()
+        if parent_children is not None:
+            parent_children[0] += elapsed
+        self._record((*self._stack.get(), name), elapsed, elapsed)
+
+    @overload
+    def profile(self, func: Callable) -> Callable: ...
+
+    @overload
+    def profile(
+        self,
+        *,
+        name: str | None = None,
+        sample_every: int = 1,
+    ) -> Callable[[Callable], Callable]: ...
+
+    def profile(
+        self,
+        func: Callable | None = None,
+        *,
+        name: str | None = None,
+        sample_every: int = 1,
+    ) -> Callable:
+        """Measure each call of the decorated function as a span.
+
+        Parameters
+        ----------
+        func : Callable | None, optional
+            Function to decorate, if used without arguments.
+        name : str | None, optional
+            Span name, by default the qualified name of the function.
+        sample_every : int, optional
+            Record only one of every ``sample_every`` calls, weighted
+            by ``sample_every`` so the count, total and self time
+            estimate those of all the calls, by default 1 (all calls).
+            The other calls are only timed to be subtracted from the
+            self time of the enclosing span, if any.
+
+        Raises
+        ------
+        ValueError
+            If ``sample_every`` is less than 1.
+
+        """
+        if sample_every < 1:
+            msg = f'sample_every must be at least 1, got {sample_every}'
+            raise ValueError(msg)
+
+        def decorator(func: Callable) -> Callable:
+            span_name = name or func.__qualname__
+            # next() on a count is atomic, unlike += on an int
+            calls = itertools.count(1)
+
+            @wraps(func)
+            def wrapper(*args, **kwargs) -> object:
+                if next(calls) % sample_every == 0:
+                    with self._span(span_name, sample_every):
+                        return func(*args, **kwargs)
+                return self._call_unsampled(func, args, kwargs)
+
+            return wrapper
+
+        if func is not None:
+            return decorator(func)
+
+        return decorator
+
+    def stats(self) -> dict[str, SpanStats]:
+        """Return the aggregated statistics of each span name.
+
+        Returns
+        -------
+        dict[str, SpanStats]
+            Statistics by span name.
+
+        """
+        with self._lock:
+            records = {
+                name: (r.count, r.total, r.min, r.max, sorted(r.samples))
+                for name, r in self._records.items()
+            }
+
+        return {
+            name: SpanStats(
+                count=count,
+                total=total / 1e6,
+                min=min_ / 1e6,
+                max=max_ / 1e6,
+                p50=_percentile(samples, 50) / 1e6,
+                p95=_percentile(samples, 95) / 1e6,
+                p99=_percentile(samples, 99) / 1e6,
+            )
+            for name, (count, total, min_, max_, samples) in records.items()
+        }
+
+    def to_json(self, filepath: str | None = None) -> str:
+        """Export the statistics as JSON.
+
+        Parameters
+        ----------
+        filepath : str | None, optional
+            File to write the JSON to, by default None.
+
+        Returns
+        -------
+        str
+            JSON with the statistics of each span name, in milliseconds.
+
+        """
+        data = {
+            name: {**dataclasses.asdict(stats), 'mean': stats.mean}
+            for name, stats in self.stats().items()
+        }
+        text = json.dumps(data, indent=2)
+        if filepath:
+            with open(filepath, 'w') as f:
+                f.write(text)
+        return text
+
+    def to_collapsed(self, filepath: str | None = None) -> str:
+        """Export the self time of each call stack in collapsed format.
+
+        Each line is ``outer;inner;leaf <microseconds>``, the input
+        format of ``flamegraph.pl`` and speedscope.
+
+        Parameters
+        ----------
+        filepath : str | None, optional
+            File to write the stacks to, by default None.
+
+        Returns
+        -------
+        str
+            Collapsed stacks.
+
+        """
+        with self._lock:
+            stacks = sorted(self._stacks.items())
+        text = ''.join(
+            f'{";".join(stack)} {self_time // 1000}\n'
+            for stack, self_time in stacks
+        )
+        if filepath:
+            with open(filepath, 'w') as f:
+                f.write(text)
+        return text
+
+    def reset(self) -> None:
+        """Discard all the recorded spans."""
+        with self._lock:
+            self._records.clear()
+            self._stacks.clear()
+
+    def _call_unsampled(
+        self,
+        func: Callable,
+        args: tuple,
+        kwargs: dict,
+    ) -> object:
+        parent_children = self._children.get()
+        if parent_children is None:
+            return func(*args, **kwargs)
+
+        # Spans inside the call must not be subtracted from the parent,
+        # as the whole call is
+        token = self._children.set([0])
+        start = time.perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            parent_children[0] += time.perf_counter_ns() - start
+            self._children.reset(token)
+
+    def _record(
+        self,
+        stack: tuple[str, ...],
+        elapsed: int,
+        self_time: int,
+        weight: int = 1,
+    ) -> None:
+        with self._lock:
+            record = self._records.get(stack[-1])
+            if record is None:
+                record = self._records[stack[-1]] = _SpanRecord()
+                record.min = elapsed
+            record.count += weight
+            record.total += elapsed * weight
+            record.min = min(record.min, elapsed)
+            record.max = max(record.max, elapsed)
+            if len(record.samples) < self.max_samples:
+                record.samples.append(elapsed)
+            else:
+                # Reservoir sampling keeps a uniform sample of all calls
+                i = random.randrange(record.count)
+                if i < self.max_samples:
+                    record.samples[i] = elapsed
+            self._stacks[stack] = (
+                self._stacks.get(stack, 0) + self_time * weight
+            )
+
+
+def _percentile(samples: list[int], percent: int) -> float:
+    if not samples:
+        return 0.0
+    index = round(percent / 100 * (len(samples) - 1))
+    return float(samples[index])
+
+
+profiler = Profiler()
@@ -0,0 +1,274 @@
+"""Pool of persistent, authenticated SMTP connections."""
+
+import smtplib
+import threading
+import time
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+
+from .logger import logger
+from .metrics import REGISTRY
+
+_OK = 250
+# Raised by sendmail after resetting the transaction with RSET
+_RESET_ERRORS = (
+    smtplib.SMTPSenderRefused,
+    smtplib.SMTPRecipientsRefused,
+    smtplib.SMTPDataError,
+)
+
+_connections = REGISTRY.counter(
+    'smtp_connections_total',
+    'SMTP connections handled by the pools, by event.',
+    ['event'],
+)
+
+
+class _Connection:
+    __slots__ = ('checked_at', 'released_at', 'server')
+
+    def __init__(self, server: smtplib.SMTP) -> None:
+        self.server = server
+        self.checked_at = time.monotonic()
+        self.released_at = self.checked_at
+
+
+class SMTPPool:
+    """Thread-safe pool of persistent SMTP connections.
+
+    Connections are opened and authenticated once and reused by
+    back-to-back sends. A connection unused for ``health_check_interval``
+    seconds is checked with ``NOOP`` before reuse, and one unused for
+    ``idle_timeout`` seconds is closed by a background thread. A send
+    that finds the connection dropped by the server is retried once
+    on a new connection.
+
+    Examples
+    --------
+    >>> pool = SMTPPool('localhost', 1025, size=2)
+    >>> pool.sendmail('app@example.com', ['ops@example.com'], msg)
+    >>> with pool.connection() as server:
+    ...     server.sendmail('app@example.com', ['ops@example.com'], msg)
+    >>> pool.close()
+
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str | None = None,
+        password: str | None = None,
+        *,
+        size: int = 1,
+        idle_timeout: float = 60.0,
+        health_check_interval: float = 10.0,
+        timeout: float = 30.0,
+    ) -> None:
+        """Create the pool. Connections are opened on demand.
+
+        Parameters
+        ----------
+        host : str
+            SMTP host.
+        port : int
+            SMTP port.
+        username : str | None, optional
+            Username, by default None (no authentication).
+        password : str | None, optional
+            Password, by default None (no authentication).
+        size : int, optional
+            Maximum number of connections, by default 1.
+        idle_timeout : float, optional
+            Seconds after which an unused connection is closed,
+            by default 60.
+        health_check_interval : float, optional
+            Seconds after which an unused connection is checked
+            with ``NOOP`` before reuse, by default 10.
+        timeout : float, optional
+            Socket timeout in seconds, by default 30.
+
+        """
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.timeout = timeout
+        self._idle: list[_Connection] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        self._reaper: threading.Thread | None = None
+        self._closed = threading.Event()
+
+    @contextmanager
+    def connection(self) -> Iterator[smtplib.SMTP]:
+        """Borrow a connection, waiting for one if all are in use.
+
+        The connection is discarded instead of returned to the pool
+        if the block raises an SMTP or socket error, except for the
+        refusals of ``sendmail``, which reset the transaction first
+        and leave the connection usable.
+        """
+        if self._closed.is_set():
+            msg = 'SMTP pool is closed'
+            raise RuntimeError(msg)
+
+        self._slots.acquire()
+        conn = None
+        try:
+            conn = self._acquire()
+            yield conn.server
+        except _RESET_ERRORS:
+            # smtplib closes the connection if the RSET fails
+            if conn is not None and conn.server.sock is None:
+                conn = None
+            raise
+        except (smtplib.SMTPException, OSError):
+            if conn is not None:
+                _quit(conn.server)
+                conn = None
+            raise
+        finally:
+            if conn is not None:
+                self._release(conn)
+            self._slots.release()
+
+    def sendmail(
+        self,
+        sender: str,
+        to: str | Sequence[str],
+        msg: str | bytes,
+    ) -> dict:
+        """Send a message, reconnecting once if the connection dropped.
+
+        Parameters
+        ----------
+        sender : str
+            Sender address.
+        to : str | Sequence[str]
+            Recipient address or addresses.
+        msg : str | bytes
+            Message.
+
+        Returns
+        -------
+        dict
+            Refused recipients, see ``smtplib.SMTP.sendmail``.
+
+        """
+        try:
+            with self.connection() as server:
+                return server.sendmail(sender, to, msg)
+        except smtplib.SMTPServerDisconnected:
+            _connections.inc(1, ('reconnected',))
+            logger.debug('Conexión SMTP cerrada por el servidor. Reconectando')
+            with self.connection() as server:
+                return server.sendmail(sender, to, msg)
+
+    def close_idle(self, max_idle: float | None = None) -> int:
+        """Close connections unused for more than ``max_idle`` seconds.
+
+        Parameters
+        ----------
+        max_idle : float | None, optional
+            Seconds, by default ``idle_timeout``.
+
+        Returns
+        -------
+        int
+            Number of closed connections.
+
+        """
+        max_idle = self.idle_timeout if max_idle is None else max_idle
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                c for c in self._idle if now - c.released_at >= max_idle
+            ]
+            self._idle = [c for c in self._idle if c not in expired]
+        for conn in expired:
+            _connections.inc(1, ('expired',))
+            _quit(conn.server)
+        return len(expired)
+
+    def close(self) -> None:
+        """Close all the idle connections and stop the pool.
+
+        Connections in use are closed when returned.
+        """
+        self._closed.set()
+        self.close_idle(0)
+        if self._reaper is not None and self._reaper.is_alive():
+            self._reaper.join()
+
+    def _acquire(self) -> _Connection:
+        while True:
+            with self._lock:
+                # LIFO, so the least recently used connections expire
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                return self._connect()
+
+            now = time.monotonic()
+            if now - conn.released_at >= self.idle_timeout:
+                _connections.inc(1, ('expired',))
+                _quit(conn.server)
+                continue
+            if now - conn.checked_at < self.health_check_interval:
+                _connections.inc(1, ('reused',))
+                return conn
+            try:
+                status, _ = conn.server.noop()
+            except (smtplib.SMTPException, OSError):
+                status = None
+            if status == _OK:
+                conn.checked_at = now
+                _connections.inc(1, ('reused',))
+                return conn
+            _connections.inc(1, ('unhealthy',))
+            _quit(conn.server)
+
+    def _connect(self) -> _Connection:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            server.set_debuglevel(False)
+            if self.username and self.password:
+                server.login(self.username, self.password)
+        except BaseException:
+            _quit(server)
+            raise
+        _connections.inc(1, ('opened',))
+        return _Connection(server)
+
+    def _release(self, conn: _Connection) -> None:
+        if self._closed.is_set():
+            _quit(conn.server)
+            return
+
+        conn.released_at = time.monotonic()
+        # The last successful command proves the connection is alive
+        conn.checked_at = conn.released_at
+        with self._lock:
+            self._idle.append(conn)
+            if self._reaper is None:
+                self._reaper = threading.Thread(
+                    target=self._reap,
+                    name='smtp-pool-reaper',
+                    daemon=True,
+                )
+                self._reaper.start()
+
+    def _reap(self) -> None:
+        interval = max(self.idle_timeout / 2, 0.1)
+        while not self._closed.wait(interval):
+            self.close_idle()
+
+
+def _quit(server: smtplib.SMTP) -> None:
+    try:
+        server.quit()
+    except (smtplib.SMTPException, OSError):
+        server.close()
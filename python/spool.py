@@ -0,0 +1,405 @@
+"""Durable SQLite spool of outgoing mails with retries."""
+
+import dataclasses
+import json
+import random
+import smtplib
+import sqlite3
+import threading
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .graceful_killer import GracefulKiller
+from .logger import logger
+from .metrics import REGISTRY
+from .smtp_pool import SMTPPool
+
+if TYPE_CHECKING:
+    # Python 3.11+
+    from typing import Self
+
+# Lowest reply code of a permanent SMTP error
+_PERMANENT = 500
+
+_depth = REGISTRY.gauge('mail_spool_depth', 'Mails waiting in the spool.')
+_age = REGISTRY.gauge(
+    'mail_spool_oldest_age_seconds',
+    'Age of the oldest mail in the spool.',
+)
+_events = REGISTRY.counter(
+    'mail_spool_events_total',
+    'Mails handled by the spool, by event.',
+    ['event'],
+)
+
+
+@dataclasses.dataclass
+class _Failure:
+    id: int
+    attempts: int
+    error: str
+    permanent: bool = False
+    # Recipients to retry, if only some of them failed
+    recipients: list[str] | None = None
+
+
+class MailSpool:
+    """Durable queue of outgoing mails backed by SQLite.
+
+    Every mail is committed to the database before any delivery
+    attempt and removed only once the server accepts it, so mails
+    survive relay outages and process restarts. A background thread
+    delivers the due mails in batches over a single SMTP session.
+    Failed mails are retried with exponential backoff and jitter, up to
+    ``max_attempts``; mails the server rejects permanently (5xx) are
+    discarded, and recipients refused temporarily (4xx) are retried
+    alone. When the spool holds ``max_size`` mails, the oldest ones
+    not being delivered are discarded to make room.
+
+    Examples
+    --------
+    >>> spool = MailSpool(SMTPPool('localhost', 1025), '.spool/mail.db')
+    >>> spool.put('app@example.com', 'ops@example.com', msg)
+    >>> spool.close()  # Undelivered mails are sent on the next start
+
+    """
+
+    def __init__(
+        self,
+        pool: SMTPPool,
+        path: str = '.spool/mail.sqlite3',
+        *,
+        max_size: int = 10_000,
+        batch_size: int = 50,
+        base_delay: float = 5.0,
+        max_delay: float = 900.0,
+        max_attempts: int = 20,
+        poll_interval: float = 1.0,
+        killer: GracefulKiller | None = None,
+    ) -> None:
+        """Open (or create) the spool and start its worker.
+
+        Parameters
+        ----------
+        pool : SMTPPool
+            Connections used to deliver the mails.
+        path : str, optional
+            Database path, by default '.spool/mail.sqlite3'.
+        max_size : int, optional
+            Maximum number of spooled mails, by default 10 000.
+        batch_size : int, optional
+            Maximum number of mails sent over one session, by default 50.
+        base_delay : float, optional
+            Seconds before the first retry, doubled on every failed
+            attempt, by default 5.
+        max_delay : float, optional
+            Maximum seconds between retries, by default 900.
+        max_attempts : int, optional
+            Delivery attempts before a mail is discarded, by default 20.
+        poll_interval : float, optional
+            Seconds between checks for due mails, by default 1.
+        killer : GracefulKiller | None, optional
+            Stop the worker once its ``kill_now`` flag is set,
+            by default None.
+
+        """
+        self.pool = pool
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.killer = killer
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS mails ('
+            ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+            ' sender TEXT NOT NULL,'
+            ' recipients TEXT NOT NULL,'
+            ' msg TEXT NOT NULL,'
+            ' created_at REAL NOT NULL,'
+            ' attempts INTEGER NOT NULL DEFAULT 0,'
+            ' next_attempt_at REAL NOT NULL,'
+            ' last_error TEXT'
+            ')',
+        )
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS mails_next_attempt_at'
+            ' ON mails (next_attempt_at)',
+        )
+        (self._size,) = self._conn.execute(
+            'SELECT COUNT(*) FROM mails',
+        ).fetchone()
+        self._conn.commit()
+        self._lock = threading.Lock()
+        # Ids of the batch being delivered, which are not evicted
+        self._in_flight: set[int] = set()
+        self._deliver_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._update_metrics()
+        self._worker = threading.Thread(
+            target=self._run,
+            name='mail-spool',
+            daemon=True,
+        )
+        self._worker.start()
+
+    def __enter__(self) -> 'Self':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def put(self, sender: str, to: str | Sequence[str], msg: str) -> None:
+        """Spool a mail for delivery.
+
+        Returns once the mail is committed to the database.
+
+        Parameters
+        ----------
+        sender : str
+            Sender address.
+        to : str | Sequence[str]
+            Recipient address or addresses.
+        msg : str
+            Message.
+
+        """
+        recipients = json.dumps([to] if isinstance(to, str) else list(to))
+        now = time.time()
+        with self._lock:
+            evicted = max(self._size - self.max_size + 1, 0)
+            if evicted:
+                # Only placeholders are interpolated in the query
+                in_flight = ', '.join('?' * len(self._in_flight))
+                evicted = self._conn.execute(
+                    'DELETE FROM mails WHERE id IN'  # noqa: S608
+                    ' (SELECT id FROM mails'
+                    f' WHERE id NOT IN ({in_flight})'
+                    ' ORDER BY id LIMIT ?)',
+                    (*self._in_flight, evicted),
+                ).rowcount
+            self._conn.execute(
+                'INSERT INTO mails'
+                ' (sender, recipients, msg, created_at, next_attempt_at)'
+                ' VALUES (?, ?, ?, ?, ?)',
+                (sender, recipients, msg, now, now),
+            )
+            self._conn.commit()
+            self._size += 1 - evicted
+            size = self._size
+
+        if evicted:
+            logger.warning(
+                f'Cola de correo llena. Se descartaron {evicted} correos',
+            )
+            _events.inc(evicted, ('evicted',))
+        _events.inc(1, ('spooled',))
+        # The age of the oldest mail is updated by the worker
+        _depth.set(size)
+        self._wakeup.set()
+
+    def deliver(self) -> int:
+        """Deliver the due mails now, in batches.
+
+        Called by the worker; useful to force a delivery.
+
+        Returns
+        -------
+        int
+            Number of delivered mails.
+
+        """
+        delivered = 0
+        with self._deliver_lock:
+            while not self._stop.is_set():
+                with self._lock:
+                    rows = self._conn.execute(
+                        'SELECT id, sender, recipients, msg, attempts'
+                        ' FROM mails WHERE next_attempt_at <= ?'
+                        ' ORDER BY id LIMIT ?',
+                        (time.time(), self.batch_size),
+                    ).fetchall()
+                    self._in_flight = {row[0] for row in rows}
+                if not rows:
+                    break
+                sent = self._deliver_batch(rows)
+                delivered += sent
+                if sent < len(rows):
+                    # The relay is failing, wait for the retries
+                    break
+        self._update_metrics()
+        return delivered
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute(
+                'SELECT COUNT(*) FROM mails',
+            ).fetchone()
+        return count
+
+    def close(self) -> None:
+        """Stop the worker and close the database.
+
+        Undelivered mails stay in the spool.
+        """
+        self._stop.set()
+        self._wakeup.set()
+        if self._worker.is_alive():
+            self._worker.join()
+        with self._lock:
+            self._conn.close()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if self.killer and self.killer.kill_now:
+                break
+            try:
+                self.deliver()
+            except Exception:
+                # Keep the worker running, the mails stay in the spool
+                logger.exception('Error en la cola de correo')
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _deliver_batch(self, rows: list[tuple]) -> int:
+        done: list[int] = []
+        failed: list[_Failure] = []
+        pending = list(rows)
+        try:
+            with self.pool.connection() as server:
+                while pending:
+                    id_, sender, recipients, msg, attempts = pending[0]
+                    try:
+                        refused = server.sendmail(
+                            sender,
+                            json.loads(recipients),
+                            msg,
+                        )
+                    except smtplib.SMTPRecipientsRefused as e:
+                        retry = _temporarily_refused(e.recipients)
+                        failed.append(
+                            _Failure(
+                                id_,
+                                attempts,
+                                str(e),
+                                permanent=not retry,
+                                recipients=retry,
+                            ),
+                        )
+                    except (
+                        smtplib.SMTPSenderRefused,
+                        smtplib.SMTPDataError,
+                    ) as e:
+                        # 5xx are permanent, 4xx may succeed later
+                        failed.append(
+                            _Failure(
+                                id_,
+                                attempts,
+                                str(e),
+                                permanent=e.smtp_code >= _PERMANENT,
+                            ),
+                        )
+                    except (smtplib.SMTPException, OSError):
+                        raise
+                    except Exception as e:  # noqa: BLE001
+                        # Counted as a failed attempt, so a mail that
+                        # cannot be sent is discarded after max_attempts
+                        error = f'{type(e).__name__}: {e}'
+                        failed.append(_Failure(id_, attempts, error))
+                        pending.pop(0)
+                        # Leave the session ready for the next mail
+                        server.rset()
+                        continue
+                    else:
+                        retry = _temporarily_refused(refused)
+                        if retry:
+                            failed.append(
+                                _Failure(
+                                    id_,
+                                    attempts,
+                                    str(refused),
+                                    recipients=retry,
+                                ),
+                            )
+                        else:
+                            done.append(id_)
+                    pending.pop(0)
+        except (smtplib.SMTPException, OSError) as e:
+            failed.extend(
+                _Failure(id_, attempts, str(e))
+                for id_, *_, attempts in pending
+            )
+            logger.warning(f'No se pudo enviar el correo: {e}')
+
+        self._record(done, failed)
+        return len(done)
+
+    def _record(self, done: list[int], failed: list[_Failure]) -> None:
+        now = time.time()
+        retries = []
+        dead = []
+        for failure in failed:
+            attempts = failure.attempts + 1
+            if failure.permanent or attempts >= self.max_attempts:
+                dead.append((failure.id,))
+                logger.error(
+                    f'Correo descartado tras {attempts} intentos:'
+                    f' {failure.error}',
+                )
+                continue
+            delay = min(self.base_delay * 2 ** (attempts - 1), self.max_delay)
+            # Jitter spreads the retries of mails that failed together
+            delay *= random.uniform(0.5, 1.0)
+            recipients = (
+                json.dumps(failure.recipients) if failure.recipients else None
+            )
+            retries.append(
+                (attempts, now + delay, failure.error, recipients, failure.id),
+            )
+
+        with self._lock:
+            deleted = self._conn.executemany(
+                'DELETE FROM mails WHERE id = ?',
+                [(id_,) for id_ in done] + dead,
+            ).rowcount
+            self._conn.executemany(
+                'UPDATE mails SET attempts = ?, next_attempt_at = ?,'
+                ' last_error = ?, recipients = COALESCE(?, recipients)'
+                ' WHERE id = ?',
+                retries,
+            )
+            self._conn.commit()
+            self._size -= max(deleted, 0)
+            self._in_flight = set()
+
+        if done:
+            logger.success(f'{len(done)} correos enviados correctamente')
+            _events.inc(len(done), ('delivered',))
+        if retries:
+            _events.inc(len(retries), ('retried',))
+        if dead:
+            _events.inc(len(dead), ('dead',))
+
+    def _update_metrics(self) -> None:
+        with self._lock:
+            # The oldest mail has the lowest id, found with the index
+            oldest = self._conn.execute(
+                'SELECT created_at FROM mails ORDER BY id LIMIT 1',
+            ).fetchone()
+            size = self._size
+        _depth.set(size)
+        _age.set(time.time() - oldest[0] if oldest else 0)
+
+
+def _temporarily_refused(refused: dict[str, tuple[int, bytes]]) -> list[str]:
+    return [
+        address for address, (code, _) in refused.items() if code < _PERMANENT
+    ]
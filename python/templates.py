@@ -0,0 +1,162 @@
+"""Precompiled HTML mail templates and MIME messages."""
+
+import base64
+import html
+import random
+import re
+import sys
+from collections.abc import Iterable, Sequence
+from email.policy import compat32
+
+_PLACEHOLDER_RE = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+# Like Message.as_string, which does not fold long headers
+_HEADERS_POLICY = compat32.clone(max_line_length=0)
+
+
+class MailTemplate:
+    """HTML template with named ``{{placeholders}}``.
+
+    The template is split once into static chunks and placeholders,
+    so rendering is a single join instead of a search and replace over
+    the whole template for every placeholder.
+
+    Examples
+    --------
+    >>> template = MailTemplate('<h1>{{title}}</h1>{{ body }}', raw=['body'])
+    >>> template.render(title='5 < 6', body='<p>Hola</p>')
+    '<h1>5 &lt; 6</h1><p>Hola</p>'
+
+    """
+
+    def __init__(self, source: str, raw: Iterable[str] = ()) -> None:
+        """Compile a template.
+
+        Parameters
+        ----------
+        source : str
+            Template source.
+        raw : Iterable[str], optional
+            Placeholders whose values are inserted as they are,
+            by default () (all values are HTML escaped).
+
+        """
+        parts = _PLACEHOLDER_RE.split(source)
+        # Even positions are static chunks, odd ones placeholder names
+        self._chunks = parts[::2]
+        self.placeholders = tuple(parts[1::2])
+        raw = set(raw)
+        self._escape = tuple(name not in raw for name in self.placeholders)
+
+    def render(self, **values: object) -> str:
+        """Render the template.
+
+        Parameters
+        ----------
+        **values : object
+            Value of each placeholder, converted with ``str``.
+
+        Returns
+        -------
+        str
+            Rendered template.
+
+        Raises
+        ------
+        KeyError
+            If a placeholder has no value.
+
+        """
+        out = [self._chunks[0]]
+        for name, escape, chunk in zip(
+            self.placeholders,
+            self._escape,
+            self._chunks[1:],
+            strict=True,
+        ):
+            try:
+                value = str(values[name])
+            except KeyError:
+                msg = f'missing value for placeholder {name!r}'
+                raise KeyError(msg) from None
+            out.append(html.escape(value) if escape else value)
+            out.append(chunk)
+        return ''.join(out)
+
+
+class HtmlMessageFactory:
+    """Builds ``multipart/mixed`` messages with a single HTML part.
+
+    The output is the same as building a ``MIMEMultipart`` with an
+    attached ``MIMEText(body, 'html')`` and calling ``as_string``, but
+    the static headers and the boundary are computed once per sender.
+
+    Examples
+    --------
+    >>> factory = HtmlMessageFactory('app@example.com')
+    >>> msg = factory.build(['ops@example.com'], 'Alerta', '<p>Hola</p>')
+
+    """
+
+    def __init__(self, sender: str) -> None:
+        """Create the factory.
+
+        Parameters
+        ----------
+        sender : str
+            Sender address.
+
+        """
+        self.sender = sender
+        self._boundary = f'{"=" * 15}{random.randrange(sys.maxsize):019d}=='
+        self._head = (
+            f'Content-Type: multipart/mixed; boundary="{self._boundary}"\n'
+            'MIME-Version: 1.0\n' + _HEADERS_POLICY.fold('From', sender)
+        )
+        self._part_head = {
+            charset: f'\n--{self._boundary}\n'
+            f'Content-Type: text/html; charset="{charset}"\n'
+            'MIME-Version: 1.0\n'
+            f'Content-Transfer-Encoding: {encoding}\n\n'
+            for charset, encoding in (
+                ('us-ascii', '7bit'),
+                ('utf-8', 'base64'),
+            )
+        }
+        self._tail = f'\n--{self._boundary}--\n'
+
+    def build(self, to: str | Sequence[str], subject: str, body: str) -> str:
+        """Build a message.
+
+        Parameters
+        ----------
+        to : str | Sequence[str]
+            Recipient address or addresses.
+        subject : str
+            Subject.
+        body : str
+            HTML body.
+
+        Returns
+        -------
+        str
+            Message, ready for ``smtplib.SMTP.sendmail``.
+
+        """
+        if not isinstance(to, str):
+            to = ', '.join(to)
+
+        if body.isascii():
+            part = self._part_head['us-ascii'] + body
+        else:
+            encoded = base64.encodebytes(body.encode()).decode('ascii')
+            part = self._part_head['utf-8'] + encoded
+
+        return ''.join(
+            (
+                self._head,
+                _HEADERS_POLICY.fold('To', to),
+                _HEADERS_POLICY.fold('Subject', subject),
+                part,
+                self._tail,
+            ),
+        )
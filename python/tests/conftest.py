@@ -0,0 +1,159 @@
+"""Shared fixtures.
+
+The modules are imported as the ``python`` package, so the repository
+root is added to the path and the tests can run from any directory.
+"""
+
+import importlib.util
+import os
+import socket
+import socketserver
+import sys
+import threading
+import types
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+# Required by python.config
+os.environ.setdefault('PROD', '0')
+os.environ.setdefault('PORT', '8000')
+
+# The mail template is not versioned
+if importlib.util.find_spec('python.mail_template') is None:
+    _mail_template = types.ModuleType('python.mail_template')
+    _mail_template.mail_template = '<html><body>{{message}}</body></html>'
+    sys.modules['python.mail_template'] = _mail_template
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        try:
+            self.session()
+        except OSError:
+            # Dropped by drop_connections or by the client
+            pass
+
+    def session(self) -> None:
+        server = self.server
+        with server.lock:
+            server.connections += 1
+            server.sockets.append(self.connection)
+        self.reply('220 localhost ESMTP')
+        sender = None
+        recipients = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            line = line.decode().rstrip('\r\n')
+            command = line.split(' ', 1)[0].upper()
+            server.commands.append(command)
+            if command in ('EHLO', 'HELO'):
+                self.reply(
+                    '250-localhost',
+                    '250-AUTH PLAIN LOGIN',
+                    '250-PIPELINING',
+                    '250 8BITMIME',
+                )
+            elif command == 'AUTH':
+                self.reply('235 Authentication successful')
+            elif command == 'MAIL':
+                sender = _address(line)
+                recipients = []
+                self.reply('250 OK')
+            elif command == 'RCPT':
+                address = _address(line)
+                reply = server.refuse.get(address)
+                if reply:
+                    self.reply(reply)
+                else:
+                    recipients.append(address)
+                    self.reply('250 OK')
+            elif command == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = []
+                while (line := self.rfile.readline()) not in (b'.\r\n', b''):
+                    data.append(line.decode())
+                server.messages.append((sender, recipients, ''.join(data)))
+                self.reply('250 OK')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            elif command == 'RSET':
+                sender = None
+                recipients = []
+                self.reply('250 OK')
+            else:
+                self.reply('250 OK')
+
+    def reply(self, *lines: str) -> None:
+        self.wfile.write(''.join(f'{line}\r\n' for line in lines).encode())
+
+
+class SMTPServer(socketserver.ThreadingTCPServer):
+    """Minimal in-process SMTP server.
+
+    Accepts any credentials and records the received messages as
+    (sender, recipients, data). Recipients in ``refuse`` get the given
+    reply instead of being accepted.
+    """
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(('127.0.0.1', 0), _SMTPHandler)
+        self.port = self.server_address[1]
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.sockets: list[socket.socket] = []
+        self.commands: list[str] = []
+        self.messages: list[tuple[str, list[str], str]] = []
+        self.refuse: dict[str, str] = {}
+
+    def drop_connections(self) -> None:
+        """Close the open client connections, like an idle timeout."""
+        with self.lock:
+            sockets, self.sockets = self.sockets, []
+        for sock in sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+def _address(line: str) -> str:
+    return line.partition('<')[2].partition('>')[0]
+
+
+@pytest.fixture
+def smtp_server():
+    server = SMTPServer()
+    thread = threading.Thread(
+        target=server.serve_forever, args=(0.05,), daemon=True
+    )
+    thread.start()
+    yield server
+    server.shutdown()
+    server.drop_connections()
+    server.server_close()
+
+
+@pytest.fixture
+def mail_config(smtp_server, monkeypatch):
+    """Point ``config`` to ``smtp_server``."""
+    from python.config import config
+
+    for name, value in {
+        'SMTP_HOST': '127.0.0.1',
+        'SMTP_PORT': smtp_server.port,
+        'SMTP_USERNAME': 'user',
+        'SMTP_PASSWORD': 'secret',
+        'SMTP_FROM': 'app@example.com',
+        'SMTP_TO': 'ops@example.com',
+    }.items():
+        monkeypatch.setattr(config, name, value, raising=False)
+    return config
@@ -0,0 +1,73 @@
+import re
+
+import pandas as pd
+import pytest
+from pandas.testing import assert_series_equal
+
+from python.aho_corasick import AhoCorasick
+from python.utils import (
+    AHO_CORASICK_MIN_VALUES,
+    normalize_string,
+    series_contains,
+    series_find_value,
+)
+
+METACHARACTERS = ['a+b', '(x)', '[y]', 'c.d', r'e\f', '^g', 'h$', 'i|j', '*']
+
+
+def regex_contains(series, values):
+    pattern = '|'.join(map(re.escape, values))
+    return series.astype(str).str.contains(pattern, regex=True)
+
+
+def test_automaton():
+    automaton = AhoCorasick(['he', 'she', 'his', 'hers', 'a+b'])
+
+    assert automaton.search('ushers') == 'she'
+    assert automaton.findall('ushers') == ['she', 'he', 'hers']
+    assert automaton.contains('1 a+b')
+    assert not automaton.contains('aab')
+    assert automaton.search('') is None
+    assert AhoCorasick(['', 'x']).search('abc') == ''
+
+
+@pytest.mark.parametrize(
+    'n_values',
+    [AHO_CORASICK_MIN_VALUES - 1, AHO_CORASICK_MIN_VALUES],
+)
+def test_series_contains_matches_regex_path(n_values):
+    values = METACHARACTERS + [
+        f'value {i}' for i in range(n_values - len(METACHARACTERS))
+    ]
+    series = pd.Series(
+        ['1 a+b', 'aab', 'x (x) y', 'c.d', 'cxd', r'e\f', 'i|j', 'ij', '**']
+        + ['value 12', 'value', None],
+    )
+
+    result = series_contains(series, values, normalize_value=False)
+
+    assert len(values) == n_values
+    assert_series_equal(result, regex_contains(series, values))
+
+
+def test_series_contains_normalized_values():
+    values = ['Bogotá', 'Medellín'] * AHO_CORASICK_MIN_VALUES
+    series = pd.Series(['BOGOTA_DC', 'MEDELLIN', 'CALI'])
+
+    result = series_contains(series, values)
+
+    assert result.tolist() == [True, True, False]
+    assert_series_equal(
+        result,
+        regex_contains(series, [normalize_string(v) for v in values]),
+    )
+
+
+def test_series_find_value():
+    series = pd.Series(['ushers', 'nothing', None], name='text')
+
+    result = series_find_value(series, ['he', 'she'], normalize_value=False)
+
+    assert result.name == 'text'
+    assert result[0] == 'she'
+    assert result[1:].isna().all()
@@ -0,0 +1,58 @@
+import json
+
+from python.alerts import AlertThrottle, fingerprint
+
+
+class FakeMail:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, subject, message):
+        self.sent.append((subject, message))
+
+
+def test_fingerprint_ignores_digits():
+    assert fingerprint('Error', 'fila 12') == fingerprint('Error', 'fila 7')
+    assert fingerprint('Error', 'fila 12') != fingerprint('Error', 'columna')
+
+
+def test_throttle_suppresses_and_digests(tmp_path):
+    mail = FakeMail()
+    path = tmp_path / 'alerts.json'
+    throttle = AlertThrottle(mail, rate=0, burst=2, path=str(path))
+
+    sent = [throttle.send('Error', f'fila {i}') for i in range(5)]
+    throttle.close()
+
+    assert sent == [True, True, False, False, False]
+    assert mail.sent[-1][0] == 'Resumen de alertas: 3 suprimidas'
+    assert path.exists()
+
+
+def test_state_survives_restart(tmp_path):
+    path = str(tmp_path / 'alerts.json')
+    throttle = AlertThrottle(FakeMail(), rate=0, burst=1, path=path)
+    throttle.send('Error', 'fila 1')
+    throttle.close()
+
+    restarted = AlertThrottle(FakeMail(), rate=0, burst=1, path=path)
+
+    assert restarted.send('Error', 'fila 2') is False
+    restarted.close()
+
+
+def test_restored_tokens_clamped_to_capacity(tmp_path):
+    path = tmp_path / 'alerts.json'
+    throttle = AlertThrottle(FakeMail(), rate=0, global_rate=0, path=str(path))
+    throttle.close()
+
+    restarted = AlertThrottle(
+        FakeMail(),
+        rate=0,
+        global_rate=0,
+        global_burst=2,
+        path=str(path),
+    )
+    restarted.close()
+
+    assert json.loads(path.read_text())['global'][0] == 2
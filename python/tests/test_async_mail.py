@@ -0,0 +1,102 @@
+import asyncio
+import smtplib
+
+import pytest
+
+from python.async_smtp import AsyncSMTPConnection, AsyncSMTPPool
+from python.mail import AsyncMail
+
+MSG = 'Subject: Hola\r\n\r\n.Hola\r\n'
+
+
+def test_async_mail_end_to_end(mail_config, smtp_server):
+    async def main():
+        async with AsyncMail(max_sessions=2) as mail:
+            return await asyncio.gather(
+                *(mail.send('Alerta', f'<p>Error {i}</p>') for i in range(6))
+            )
+
+    assert asyncio.run(main()) == [True] * 6
+    assert len(smtp_server.messages) == 6
+    assert smtp_server.connections <= 2
+    sender, recipients, data = smtp_server.messages[0]
+    assert sender == 'app@example.com'
+    assert recipients == ['ops@example.com']
+    assert 'Subject: Alerta' in data
+
+
+def test_async_mail_timeout(mail_config, smtp_server):
+    async def main():
+        async with AsyncMail(timeout=1e-6) as mail:
+            return await mail.send('Alerta', '<p>Hola</p>')
+
+    assert asyncio.run(main()) is False
+
+
+def test_async_pool_reconnects_and_dot_stuffs(smtp_server):
+    async def main():
+        pool = AsyncSMTPPool(
+            '127.0.0.1', smtp_server.port, health_check_interval=60
+        )
+        await pool.sendmail('app@example.com', 'ops@example.com', MSG)
+        smtp_server.drop_connections()
+        await pool.sendmail('app@example.com', 'ops@example.com', MSG)
+        await pool.close()
+
+    asyncio.run(main())
+
+    assert len(smtp_server.messages) == 2
+    assert smtp_server.connections == 2
+    assert '..Hola' in smtp_server.messages[0][2]
+
+
+def test_login_requires_auth_extension():
+    conn = AsyncSMTPConnection('127.0.0.1', 25, 'user', 'secret')
+    conn.extensions = {'pipelining': ''}
+
+    with pytest.raises(smtplib.SMTPNotSupportedError):
+        asyncio.run(conn._login())
+    assert conn.starttls is False
+
+
+def test_failed_reset_not_pooled(smtp_server, monkeypatch):
+    async def broken_reset(self):
+        self.close()
+
+    monkeypatch.setattr(AsyncSMTPConnection, '_reset', broken_reset)
+    smtp_server.refuse['bad@example.com'] = '550 No such user'
+
+    async def main():
+        pool = AsyncSMTPPool('127.0.0.1', smtp_server.port)
+        with pytest.raises(smtplib.SMTPRecipientsRefused):
+            await pool.sendmail('app@example.com', 'bad@example.com', MSG)
+        return pool._idle
+
+    assert asyncio.run(main()) == []
+
+
+def test_cancelled_health_check_closes_connection(smtp_server, monkeypatch):
+    async def hanging_noop(self):
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(AsyncSMTPConnection, 'noop', hanging_noop)
+
+    async def main():
+        pool = AsyncSMTPPool(
+            '127.0.0.1', smtp_server.port, health_check_interval=0
+        )
+        await pool.sendmail('app@example.com', 'ops@example.com', MSG)
+        [(conn, _)] = pool._idle
+        task = asyncio.create_task(
+            pool.sendmail('app@example.com', 'ops@example.com', MSG),
+        )
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return conn, pool._idle
+
+    conn, idle = asyncio.run(main())
+
+    assert not conn.is_connected
+    assert idle == []
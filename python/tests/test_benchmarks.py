@@ -0,0 +1,34 @@
+import dataclasses
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from python.benchmarks import compare_baseline, run_benchmarks, save_baseline
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def test_enforced_dataclass_runs_without_config_env():
+    env = {k: v for k, v in os.environ.items() if k not in ('PROD', 'PORT')}
+    code = (
+        'from python.benchmarks import run_benchmarks;'
+        "r = run_benchmarks((10,), ['enforced_dataclass'], 1);"
+        'assert len(r) == 1'
+    )
+
+    subprocess.run(
+        [sys.executable, '-c', code], cwd=ROOT, env=env, check=True
+    )
+
+
+def test_compare_baseline_flags_regressions(tmp_path):
+    results = run_benchmarks((10,), ['extract_digits'], 1)
+    path = tmp_path / 'baseline.json'
+    save_baseline(results, str(path))
+
+    assert compare_baseline(results, str(path)) == []
+    slower = [
+        dataclasses.replace(r, throughput=r.throughput / 10) for r in results
+    ]
+    assert compare_baseline(slower, str(path))
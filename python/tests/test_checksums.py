@@ -0,0 +1,213 @@
+import hashlib
+import os
+
+import pytest
+
+from python.utils import (
+    ChecksumManifest,
+    file_digests,
+    find_duplicates,
+    iter_checksums,
+    iter_files,
+    md5sum,
+    sha256sum,
+)
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+@pytest.mark.parametrize('mmap_threshold', [0, 1])
+def test_file_digests(tmp_path, mmap_threshold):
+    path = tmp_path / 'data.bin'
+    data = os.urandom(300_000)
+    path.write_bytes(data)
+
+    digests = file_digests(str(path), ('md5', 'sha256'), mmap_threshold)
+
+    assert digests == {
+        'md5': hashlib.md5(data).hexdigest(),
+        'sha256': sha256(data),
+    }
+    assert md5sum(str(path)) == digests['md5']
+    assert sha256sum(str(path)) == digests['sha256']
+
+
+def test_iter_checksums_directory(tmp_path):
+    (tmp_path / 'sub').mkdir()
+    files = {
+        tmp_path / 'a.txt': b'a',
+        tmp_path / 'sub' / 'b.txt': b'b',
+        tmp_path / 'sub' / 'empty.txt': b'',
+    }
+    for path, data in files.items():
+        path.write_bytes(data)
+
+    result = dict(iter_checksums(str(tmp_path), max_workers=2))
+
+    assert result == {str(p): sha256(data) for p, data in files.items()}
+    assert list(iter_files(str(tmp_path), recursive=False)) == [
+        str(tmp_path / 'a.txt')
+    ]
+
+
+def test_iter_checksums_single_file(tmp_path):
+    path = tmp_path / 'a.txt'
+    path.write_bytes(b'a')
+
+    assert list(iter_checksums(str(path), ('md5',))) == [
+        (str(path), {'md5': hashlib.md5(b'a').hexdigest()})
+    ]
+
+
+def test_iter_checksums_skips_unreadable_files(tmp_path):
+    path = tmp_path / 'a.txt'
+    path.write_bytes(b'a')
+    missing = str(tmp_path / 'missing.txt')
+    errors = []
+
+    result = list(iter_checksums([missing, str(path)], onerror=errors.append))
+
+    assert result == [(str(path), sha256(b'a'))]
+    assert [e.filename for e in errors] == [missing]
+    assert isinstance(errors[0], FileNotFoundError)
+
+
+def test_iter_checksums_onerror_can_stop(tmp_path):
+    def onerror(error):
+        raise error
+
+    with pytest.raises(FileNotFoundError):
+        list(iter_checksums([str(tmp_path / 'missing')], onerror=onerror))
+
+
+def test_missing_root_raises(tmp_path):
+    missing = str(tmp_path / 'missing')
+
+    with pytest.raises(FileNotFoundError):
+        list(iter_files(missing))
+    with pytest.raises(FileNotFoundError):
+        list(iter_checksums(missing, onerror=lambda e: None))
+
+
+def test_unreadable_root_raises(tmp_path, monkeypatch):
+    (tmp_path / 'sub').mkdir()
+    scandir = os.scandir
+
+    def fail_root(path):
+        if path == str(tmp_path):
+            raise PermissionError(13, 'Permission denied', path)
+        return scandir(path)
+
+    monkeypatch.setattr('python.utils.os.scandir', fail_root)
+
+    with pytest.raises(PermissionError):
+        list(iter_files(str(tmp_path), onerror=lambda e: None))
+
+
+def test_find_duplicates_directory(tmp_path):
+    (tmp_path / 'a.txt').write_bytes(b'same')
+    (tmp_path / 'b.txt').write_bytes(b'same')
+    (tmp_path / 'c.txt').write_bytes(b'other')
+
+    groups = find_duplicates(str(tmp_path))
+
+    assert len(groups) == 1
+    assert sorted(groups[0].paths) == [
+        str(tmp_path / 'a.txt'),
+        str(tmp_path / 'b.txt'),
+    ]
+    assert groups[0].bytes_saved == 4
+
+
+def test_manifest_changes(tmp_path):
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'a.txt').write_bytes(b'a')
+    (tmp_path / 'sub' / 'b.txt').write_bytes(b'b')
+
+    with ChecksumManifest(str(tmp_path)) as manifest:
+        first = manifest.changes()
+        (tmp_path / 'a.txt').write_bytes(b'aa')
+        (tmp_path / 'sub' / 'b.txt').unlink()
+        (tmp_path / 'c.txt').write_bytes(b'c')
+        second = manifest.changes()
+        third = manifest.changes()
+
+    assert first.added == ['a.txt', os.path.join('sub', 'b.txt')]
+    assert second.added == ['c.txt']
+    assert second.modified == ['a.txt']
+    assert second.removed == [os.path.join('sub', 'b.txt')]
+    assert not third
+
+
+def test_manifest_non_recursive_keeps_subdirectories(tmp_path):
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'a.txt').write_bytes(b'a')
+    (tmp_path / 'sub' / 'b.txt').write_bytes(b'b')
+
+    with ChecksumManifest(str(tmp_path)) as manifest:
+        manifest.changes()
+        shallow = manifest.changes(recursive=False)
+        deep = manifest.changes()
+
+    assert not shallow
+    assert not deep
+
+
+def test_manifest_has_changed(tmp_path):
+    path = tmp_path / 'a.txt'
+    path.write_bytes(b'a')
+
+    with ChecksumManifest(str(tmp_path)) as manifest:
+        assert manifest.has_changed(str(path))
+        assert not manifest.has_changed(str(path))
+        path.write_bytes(b'bb')
+        assert manifest.has_changed(str(path), update=False)
+        assert manifest.has_changed(str(path))
+
+
+def test_manifest_rejects_paths_outside_root(tmp_path):
+    (tmp_path / 'root').mkdir()
+    outside = tmp_path / 'outside.txt'
+    outside.write_bytes(b'a')
+
+    with ChecksumManifest(str(tmp_path / 'root')) as manifest:
+        with pytest.raises(ValueError, match='not inside'):
+            manifest.has_changed(str(outside))
+        assert not manifest.changes()
+
+
+def test_manifest_only_skips_its_own_files(tmp_path):
+    (tmp_path / '.checksums.sqlite3.bak').write_bytes(b'a')
+
+    with ChecksumManifest(str(tmp_path)) as manifest:
+        changes = manifest.changes()
+
+    assert changes.added == ['.checksums.sqlite3.bak']
+
+
+@pytest.mark.parametrize('size', [10, 100, 1000])
+def test_find_duplicates_digest_is_content_sha256(tmp_path, size):
+    data = os.urandom(size)
+    (tmp_path / 'a.bin').write_bytes(data)
+    (tmp_path / 'b.bin').write_bytes(data)
+
+    groups = find_duplicates(str(tmp_path), block_size=64)
+
+    assert [g.digest for g in groups] == [sha256(data)]
+
+
+def test_find_duplicates_skips_unreadable_files(tmp_path):
+    (tmp_path / 'a.txt').write_bytes(b'same')
+    (tmp_path / 'b.txt').write_bytes(b'same')
+    missing = str(tmp_path / 'missing.txt')
+    errors = []
+
+    groups = find_duplicates(
+        [missing, str(tmp_path / 'a.txt'), str(tmp_path / 'b.txt')],
+        onerror=errors.append,
+    )
+
+    assert len(groups) == 1
+    assert [e.filename for e in errors] == [missing]
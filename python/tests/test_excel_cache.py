@@ -0,0 +1,91 @@
+import os
+
+import pytest
+from openpyxl import Workbook
+
+from python import excel_cache
+from python.excel_cache import read_csv_cached, read_excel_cached
+from python.utils import ExternalReadingError
+
+
+def write_xlsx(path, rows):
+    wb = Workbook()
+    wb.active.title = 'Ventas'
+    for row in rows:
+        wb.active.append(row)
+    wb.save(path)
+
+
+def test_unchanged_file_read_from_cache(tmp_path, monkeypatch):
+    src = tmp_path / 'sales.xlsx'
+    write_xlsx(src, [['City', 'Total'], ['Cali', 3]])
+    cache_dir = str(tmp_path / 'cache')
+
+    def read_excel(*args, **kwargs):
+        raise AssertionError('file parsed again')
+
+    first = read_excel_cached(str(src), 'Ventas', cache_dir=cache_dir)
+    monkeypatch.setattr(excel_cache.pd, 'read_excel', read_excel)
+    second = read_excel_cached(str(src), 'Ventas', cache_dir=cache_dir)
+
+    assert second.equals(first)
+
+
+def test_changed_file_replaces_entry(tmp_path):
+    src = tmp_path / 'data.csv'
+    src.write_text('city\nCali\n')
+    cache_dir = tmp_path / 'cache'
+
+    read_csv_cached(str(src), cache_dir=str(cache_dir))
+    src.write_text('city\nBogotá\n')
+    os.utime(src, ns=(0, 0))
+    df = read_csv_cached(str(src), cache_dir=str(cache_dir))
+
+    assert df['city'].tolist() == ['Bogotá']
+    assert len(list(cache_dir.glob('*.parquet'))) == 1
+
+
+def test_missing_column_raises(tmp_path):
+    src = tmp_path / 'sales.xlsx'
+    write_xlsx(src, [['City'], ['Cali']])
+
+    with pytest.raises(ExternalReadingError, match="columna 'Total'"):
+        read_excel_cached(
+            str(src),
+            'Ventas',
+            ['City', 'Total'],
+            cache_dir=str(tmp_path / 'cache'),
+        )
+
+
+def test_several_sheets_rejected(tmp_path):
+    with pytest.raises(TypeError, match='sheet_name'):
+        read_excel_cached(str(tmp_path / 'sales.xlsx'), sheet_name=None)
+
+
+def test_pyarrow_required(tmp_path, monkeypatch):
+    src = tmp_path / 'data.csv'
+    src.write_text('city\nCali\n')
+    monkeypatch.setattr(excel_cache, 'pa', None)
+
+    with pytest.raises(ImportError, match='pip install pyarrow'):
+        read_csv_cached(str(src), cache_dir=str(tmp_path / 'cache'))
+
+
+def test_digest_cache_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(excel_cache, 'DIGEST_CACHE_SIZE', 2)
+    monkeypatch.setattr(excel_cache, '_digests', excel_cache.OrderedDict())
+    cache_dir = str(tmp_path / 'cache')
+    paths = []
+    for name in ('a', 'b', 'c'):
+        src = tmp_path / f'{name}.csv'
+        src.write_text(f'city\n{name}\n')
+        paths.append(src)
+
+    for src in (paths[0], paths[1], paths[0], paths[2]):
+        read_csv_cached(str(src), cache_dir=cache_dir)
+
+    assert list(excel_cache._digests) == [
+        str(paths[0].resolve()),
+        str(paths[2].resolve()),
+    ]
@@ -0,0 +1,93 @@
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from openpyxl import Workbook
+
+from python.ingestion import ingest, read_chunks
+from python.utils import ExternalReadingError
+
+
+def write_xlsx(path, rows):
+    wb = Workbook()
+    for row in rows:
+        wb.active.append(row)
+    wb.save(path)
+
+
+def test_parquet_column_empty_in_first_chunk_csv(tmp_path):
+    src = tmp_path / 'data.csv'
+    src.write_text('id,city\n1,\n2,\n3,Cali\n4,Bogotá\n', encoding='utf-8')
+    out = tmp_path / 'data.parquet'
+
+    assert ingest(str(src), str(out), chunksize=2) == 4
+    table = pq.read_table(out)
+    assert table.column('city').to_pylist() == [None, None, 'Cali', 'Bogotá']
+    assert table.column('id').to_pylist() == ['1', '2', '3', '4']
+
+
+def test_parquet_column_empty_in_first_chunk_xlsx(tmp_path):
+    src = tmp_path / 'data.xlsx'
+    write_xlsx(src, [['id', 'city'], [1, None], [2, None], [3, 'Cali']])
+    out = tmp_path / 'data.parquet'
+
+    assert ingest(str(src), str(out), chunksize=2) == 3
+    table = pq.read_table(out)
+    assert table.column('city').to_pylist() == [None, None, 'Cali']
+    assert table.column('id').to_pylist() == ['1', '2', '3']
+
+
+@pytest.mark.parametrize('suffix', ['.parquet', '.csv'])
+def test_output_created_when_no_rows_pass(tmp_path, suffix):
+    src = tmp_path / 'data.csv'
+    src.write_text('id,city\n1,Cali\n', encoding='utf-8')
+    out = tmp_path / f'out{suffix}'
+
+    rows = ingest(
+        str(src), str(out), filters=[lambda df: df['city'] == 'Medellín']
+    )
+
+    assert rows == 0
+    if suffix == '.parquet':
+        assert pq.read_table(out).column_names == ['id', 'city']
+    else:
+        assert pd.read_csv(out).columns.tolist() == ['id', 'city']
+
+
+def test_csv_missing_column(tmp_path):
+    src = tmp_path / 'data.csv'
+    src.write_text('id,city\n1,Cali\n', encoding='utf-8')
+
+    with pytest.raises(ExternalReadingError, match='total'):
+        next(read_chunks(str(src), columns=['id', 'total']))
+
+
+def test_excel_missing_column(tmp_path):
+    src = tmp_path / 'data.xlsx'
+    write_xlsx(src, [['id', 'city'], [1, 'Cali']])
+
+    with pytest.raises(ExternalReadingError, match='total'):
+        next(read_chunks(str(src), columns=['id', 'total']))
+
+
+def test_excel_rejects_read_kwargs(tmp_path):
+    src = tmp_path / 'data.xlsx'
+    write_xlsx(src, [['id'], [1]])
+
+    with pytest.raises(TypeError, match='sep'):
+        next(read_chunks(str(src), sep=';'))
+
+
+def test_read_chunks_filters_and_normalizes(tmp_path):
+    src = tmp_path / 'data.csv'
+    src.write_text(' City ,Total\nbogotá,1\nCali,2\n', encoding='utf-8')
+
+    chunks = list(
+        read_chunks(
+            str(src),
+            normalize=True,
+            filters=[lambda df: df['CITY'] == 'BOGOTA'],
+        )
+    )
+
+    assert len(chunks) == 1
+    assert chunks[0]['CITY'].tolist() == ['BOGOTA']
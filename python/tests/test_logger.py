@@ -0,0 +1,189 @@
+import json
+import threading
+import time
+
+import pytest
+
+from python.logger import (
+    BatchedFileSink,
+    _json_format,
+    _log_dropped,
+    _log_records,
+    logger,
+    setup_logger,
+)
+
+
+def test_setup_logger_chains_patcher():
+    seen = []
+    logger.configure(patcher=lambda record: seen.append(record['message']))
+    setup_logger()
+    setup_logger()
+    before = _log_records.value(('INFO',))
+
+    logger.info('hola')
+
+    assert seen == ['hola']
+    assert _log_records.value(('INFO',)) == before + 1
+    logger.configure(patcher=lambda record: None)
+
+
+def add_sink(sink):
+    logger.remove()
+    return logger.add(sink, format='{level} {message}')
+
+
+def read_lines(path, count, timeout=5.0):
+    # The writer thread writes the batches asynchronously
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        lines = path.read_text().splitlines() if path.exists() else []
+        if len(lines) >= count:
+            return lines
+        time.sleep(0.01)
+    return lines
+
+
+def test_batched_sink_writes_in_batches(tmp_path):
+    path = tmp_path / 'main.log'
+    sink = BatchedFileSink(path, max_records=3, flush_interval=60)
+    handler = add_sink(sink)
+
+    logger.info('uno')
+    logger.info('dos')
+    time.sleep(0.05)
+    assert not path.exists()
+    assert all(type(data) is bytes for data, _ in sink._buffer)
+
+    logger.info('tres')
+    assert read_lines(path, 3) == ['INFO uno', 'INFO dos', 'INFO tres']
+    logger.remove(handler)
+    setup_logger()
+
+
+def test_batched_sink_counts_bytes(tmp_path):
+    path = tmp_path / 'main.log'
+    handler = logger.add(
+        BatchedFileSink(path, flush_bytes=10, flush_interval=60),
+        format='{message}',
+    )
+
+    # 6 characters, 11 bytes
+    logger.info('ñññññ')
+
+    assert read_lines(path, 1) == ['ñññññ']
+    logger.remove(handler)
+
+
+def test_idle_record_written_within_batch_interval(tmp_path):
+    setup_logger(
+        use_file=True,
+        dst=str(tmp_path),
+        batch=True,
+        batch_interval=0.2,
+        fmt='{message}',
+    )
+    start = time.monotonic()
+
+    logger.info('uno')
+    lines = read_lines(tmp_path / 'main.log', 1)
+    elapsed = time.monotonic() - start
+    setup_logger()
+
+    assert lines == ['uno']
+    assert 0.2 <= elapsed < 1.0
+
+
+def test_batched_sink_writes_errors_at_once(tmp_path):
+    path = tmp_path / 'main.log'
+    handler = add_sink(BatchedFileSink(path, flush_interval=60))
+
+    logger.info('uno')
+    logger.error('dos')
+
+    assert path.read_text().splitlines() == ['INFO uno', 'ERROR dos']
+    logger.remove(handler)
+    setup_logger()
+
+
+def test_batched_sink_writes_after_stop(tmp_path):
+    path = tmp_path / 'main.log'
+    sink = BatchedFileSink(path, flush_interval=60)
+    handler = add_sink(sink)
+
+    logger.info('uno')
+    sink.stop()
+    logger.info('dos')
+
+    assert path.read_text().splitlines() == ['INFO uno', 'INFO dos']
+    logger.remove(handler)
+    setup_logger()
+
+
+class SlowSink(BatchedFileSink):
+    """Sink whose writes wait until ``release`` is set."""
+
+    def __init__(self, *args, **kwargs):
+        self.writing = threading.Event()
+        self.release = threading.Event()
+        super().__init__(*args, **kwargs)
+
+    def _write_file(self, data):
+        self.writing.set()
+        self.release.wait(5)
+        super()._write_file(data)
+
+
+@pytest.mark.parametrize(
+    ('overflow', 'expected', 'dropped'),
+    [
+        ('drop_oldest', ['a', 'b', 'd', 'e'], 'INFO'),
+        ('drop_debug', ['a', 'b', 'c', 'd'], 'DEBUG'),
+        ('block', ['a', 'b', 'c', 'd', 'e'], None),
+    ],
+)
+def test_batched_sink_overflow(tmp_path, overflow, expected, dropped):
+    path = tmp_path / 'main.log'
+    sink = SlowSink(path, max_records=2, flush_interval=60, overflow=overflow)
+    logger.remove()
+    handler = logger.add(sink, format='{message}', level='DEBUG')
+    before = _log_dropped.value((dropped,)) if dropped else 0
+
+    # The writer takes a and b and waits, c and d fill the buffer
+    logger.info('a')
+    logger.info('b')
+    assert sink.writing.wait(5)
+    logger.info('c')
+    logger.info('d')
+    last = threading.Thread(
+        target=logger.debug if overflow == 'drop_debug' else logger.info,
+        args=('e',),
+    )
+    last.start()
+    last.join(0.1)
+    blocked = last.is_alive()
+    sink.release.set()
+    last.join(5)
+    logger.remove(handler)
+    setup_logger()
+
+    assert blocked == (overflow == 'block')
+    assert path.read_text().splitlines() == expected
+    if dropped:
+        assert _log_dropped.value((dropped,)) == before + 1
+
+
+def test_json_lines_do_not_touch_the_record(tmp_path):
+    records = []
+    logger.remove()
+    logger.add(tmp_path / 'main.log', format=_json_format)
+    logger.add(lambda message: records.append(message.record))
+
+    logger.bind(user='ana').info('{a} <red> \\<b>', a=1)
+    logger.remove()
+    setup_logger()
+
+    line = json.loads((tmp_path / 'main.log').read_text())
+    assert line['message'] == '1 <red> \\<b>'
+    assert line['extra'] == {'user': 'ana', 'a': 1}
+    assert records[0]['extra'] == {'user': 'ana', 'a': 1}
@@ -0,0 +1,49 @@
+import threading
+
+import pytest
+
+from python.metrics import Counter, Histogram, MetricsRegistry, _Metric
+
+
+def run_threads(target, n):
+    threads = [threading.Thread(target=target) for _ in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_counter_folds_finished_threads():
+    counter = Counter('c_total', 'Counter.', ['kind'])
+
+    run_threads(lambda: counter.inc(2, ('a',)), 200)
+
+    assert counter.value(('a',)) == 400
+    assert not counter._shards
+    counter.inc(1, ('a',))
+    assert len(counter._shards) == 1
+    assert counter.value(('a',)) == 401
+
+
+def test_histogram_folds_finished_threads():
+    histogram = Histogram('h_seconds', 'Histogram.', buckets=(1, 10))
+
+    run_threads(lambda: histogram.observe(5), 50)
+
+    text = histogram.expose()
+    assert 'h_seconds_bucket{le="10"} 50' in text
+    assert 'h_seconds_sum 250' in text
+    assert not histogram._shards
+
+
+def test_metric_is_abstract():
+    with pytest.raises(TypeError):
+        _Metric('m', 'Metric.')
+
+
+def test_registry_type_mismatch():
+    registry = MetricsRegistry()
+    registry.counter('x_total', 'X.')
+
+    with pytest.raises(TypeError, match='already registered'):
+        registry.gauge('x_total', 'X.')
@@ -0,0 +1,219 @@
+import re
+import unicodedata
+
+import pandas as pd
+import pytest
+from pandas.testing import (
+    assert_frame_equal,
+    assert_index_equal,
+    assert_series_equal,
+)
+
+from python import utils
+from python.utils import (
+    NORMALIZE_CACHE_SIZE,
+    NormalizeCacheInfo,
+    extract_digits,
+    normalize_cache_clear,
+    normalize_cache_info,
+    normalize_dataframe,
+    normalize_series,
+    normalize_string,
+    series_equal_to,
+    set_normalize_cache_size,
+    strip_columns,
+    upper_strip_series,
+)
+
+VALUES = ['Bogotá', 'Bogota', None, 'Cali', 'Bogotá', 'user@example.com']
+# Ligatures, full-width letters, superscripts, special case mappings,
+# decomposed accents, non-ASCII digits and Unicode whitespace
+UNICODE_VALUES = [
+    ' Bogotá ',
+    'Bogota\u0301',
+    None,
+    '',
+    'ﬁ ² ½',
+    '\uff21b\uff11',
+    'straße',
+    'ŉ ﬀ ǅ',
+    'İstanbul',
+    '€5-ñ',
+    'x\u200by',
+    '\u3000a٣4\t',
+    'Ω \U0001d400',
+    '007',
+]
+ARROW_DTYPES = ['str', 'string[pyarrow]']
+
+
+def _apply(func, values):
+    return [None if value is None else func(value) for value in values]
+
+
+def _object_normalize(value):
+    # Object path of normalize_series, value by value
+    value = unicodedata.normalize('NFKD', value.replace(' ', ''))
+    value = value.encode('ascii', errors='ignore').decode('utf-8')
+    return re.sub(r'\W', '_', value).upper()
+
+
+def assert_values_equal(result, expected):
+    assert [None if pd.isna(v) else v for v in result] == expected
+
+
+@pytest.mark.parametrize('dtype', [object, 'str'])
+def test_normalize_series_unique_matches_plain(dtype):
+    series = pd.Series(VALUES * 3, index=range(10, 28), name='city')
+    series = series.astype(dtype)
+
+    assert_series_equal(
+        normalize_series(series, unique=True),
+        normalize_series(series),
+    )
+
+
+def test_normalize_series_categorical():
+    series = pd.Series(VALUES, name='city', dtype=object)
+
+    result = normalize_series(series, categorical=True)
+
+    assert result.dtype == 'category'
+    assert list(result.cat.categories) == [
+        'BOGOTA',
+        'CALI',
+        'USER_EXAMPLE_COM',
+    ]
+    assert_series_equal(
+        result.astype(object),
+        normalize_series(series).astype(object),
+    )
+
+
+def test_normalize_series_unique_index():
+    index = pd.Index(VALUES, name='city', dtype=object)
+
+    assert_index_equal(
+        normalize_series(index, unique=True),
+        normalize_series(index),
+    )
+
+
+def test_normalize_dataframe_unique_matches_plain():
+    df = pd.DataFrame({'a': VALUES, 'b': VALUES[::-1]}, dtype=object)
+
+    assert normalize_dataframe(df, unique=True).equals(
+        normalize_dataframe(df),
+    )
+
+
+@pytest.mark.parametrize('columns', [1, 3])
+@pytest.mark.parametrize(
+    ('unique', 'categorical'),
+    [(False, False), (True, False), (False, True)],
+)
+def test_normalize_dataframe_parallel_matches_serial(
+    columns,
+    unique,
+    categorical,
+    monkeypatch,
+):
+    monkeypatch.setattr(utils, 'PARALLEL_MIN_CELLS', 0)
+    # Later values first, so the categories of each row shard differ
+    values = ['Pasto', 'Cali', None] + VALUES * 5
+    df = pd.DataFrame(
+        {f'col{i} ': values[i:] + values[:i] for i in range(columns)},
+        index=range(100, 100 + len(values)),
+    )
+
+    serial = normalize_dataframe(df, unique, categorical)
+    parallel = normalize_dataframe(df, unique, categorical, max_workers=2)
+
+    assert_frame_equal(parallel, serial)
+
+
+@pytest.fixture
+def normalize_cache():
+    normalize_cache_clear()
+    yield
+    set_normalize_cache_size(NORMALIZE_CACHE_SIZE)
+
+
+def test_normalize_cache_info(normalize_cache):
+    series = pd.Series(['BOGOTA', 'CALI'])
+    for _ in range(3):
+        series_equal_to(series, 'Bogotá')
+
+    info = normalize_cache_info()
+
+    assert isinstance(info, NormalizeCacheInfo)
+    assert (info.hits, info.misses) == (2, 1)
+    assert info.maxsize == NORMALIZE_CACHE_SIZE
+    assert info.currsize == 1
+
+
+def test_normalize_cache_is_bounded(normalize_cache):
+    set_normalize_cache_size(2)
+
+    for text in ('a', 'b', 'c', 'a'):
+        assert normalize_string(text) == text.upper()
+
+    assert normalize_cache_info() == (0, 4, 2, 2)
+
+
+def test_normalize_cache_can_be_disabled(normalize_cache):
+    set_normalize_cache_size(0)
+
+    normalize_string('Bogotá')
+    normalize_string('Bogotá')
+
+    assert normalize_cache_info() == (0, 2, 0, 0)
+    assert normalize_string('Bogotá') == 'BOGOTA'
+
+
+@pytest.mark.parametrize('dtype', [object, *ARROW_DTYPES])
+@pytest.mark.parametrize('unique', [False, True])
+def test_normalize_series_arrow_matches_object(dtype, unique):
+    series = pd.Series(UNICODE_VALUES, dtype=dtype)
+
+    result = normalize_series(series, unique=unique)
+
+    if dtype is not object:
+        assert result.dtype == series.dtype
+    assert_values_equal(result, _apply(_object_normalize, UNICODE_VALUES))
+
+
+@pytest.mark.parametrize('dtype', [object, *ARROW_DTYPES])
+def test_upper_strip_series_arrow_matches_object(dtype):
+    series = pd.Series(UNICODE_VALUES, dtype=dtype)
+
+    result = upper_strip_series(series)
+
+    if dtype is not object:
+        assert result.dtype == series.dtype
+    assert_values_equal(
+        result,
+        _apply(lambda v: v.strip().upper(), UNICODE_VALUES),
+    )
+
+
+@pytest.mark.parametrize('dtype', [object, *ARROW_DTYPES])
+def test_extract_digits_arrow_matches_object(dtype):
+    series = pd.Series(UNICODE_VALUES, dtype=dtype)
+
+    result = extract_digits(series)
+
+    if dtype is not object:
+        assert result.dtype == series.dtype
+    assert_values_equal(result, _apply(extract_digits, UNICODE_VALUES))
+
+
+@pytest.mark.parametrize('dtype', [object, *ARROW_DTYPES])
+def test_strip_columns_arrow_matches_object(dtype):
+    columns = [' a ', '\u3000b\t', 'c d', 'ß ']
+    df = pd.DataFrame([range(len(columns))], columns=columns)
+    df.columns = df.columns.astype(dtype)
+
+    result = strip_columns(df).columns
+
+    assert list(result) == [column.strip() for column in columns]
@@ -0,0 +1,122 @@
+import pandas as pd
+import pytest
+
+from python import normalized_frame
+from python.normalized_frame import NormalizedFrame
+
+
+def make_frame():
+    df = pd.DataFrame({'city': ['Bogotá', 'Cali', 'bogota', None]})
+    return df, NormalizedFrame(df)
+
+
+def test_filters():
+    df, frame = make_frame()
+
+    assert frame.equal_to('city', 'BOGOTA').tolist() == [
+        True,
+        False,
+        True,
+        False,
+    ]
+    assert frame.not_equal_to('city', 'cali').tolist() == [
+        True,
+        False,
+        True,
+        True,
+    ]
+    assert df[frame.isin('city', ['cali', 'medellín'])].index.tolist() == [1]
+    assert frame.contains('city', 'GOT').tolist() == [
+        True,
+        False,
+        True,
+        False,
+    ]
+
+
+def test_index_reused_while_unchanged():
+    _, frame = make_frame()
+
+    frame.equal_to('city', 'cali')
+    normalized = frame.normalized('city')
+    frame.isin('city', ['bogota'])
+
+    assert frame.normalized('city') is normalized
+
+
+@pytest.mark.parametrize('dtype', [object, 'str', 'category'])
+def test_repeated_query_does_not_scan_column(dtype, monkeypatch):
+    df = pd.DataFrame({'city': ['Bogotá', 'Cali', 'bogota', None]})
+    df['city'] = df['city'].astype(dtype)
+    frame = NormalizedFrame(df)
+    frame.equal_to('city', 'cali')
+    calls = []
+
+    def hash_pandas_object(*args, **kwargs):
+        calls.append('hash')
+
+    def normalize_series(*args, **kwargs):
+        calls.append('normalize')
+
+    monkeypatch.setattr(pd.util, 'hash_pandas_object', hash_pandas_object)
+    monkeypatch.setattr(normalized_frame, 'normalize_series', normalize_series)
+    for _ in range(3):
+        result = frame.equal_to('city', 'bogota')
+
+    assert calls == []
+    assert result.tolist() == [True, False, True, False]
+
+
+def test_direct_update_rebuilds_index():
+    df, frame = make_frame()
+    frame.equal_to('city', 'bogota')
+
+    df.loc[1, 'city'] = 'Bogota'
+
+    assert frame.equal_to('city', 'bogota').tolist() == [
+        True,
+        True,
+        True,
+        False,
+    ]
+
+
+def test_direct_drop_rebuilds_index():
+    df, frame = make_frame()
+    frame.equal_to('city', 'bogota')
+
+    df.drop(index=0, inplace=True)
+    result = frame.equal_to('city', 'bogota')
+
+    assert result.index.tolist() == [1, 2, 3]
+    assert result.tolist() == [False, True, False]
+
+
+def test_setitem_through_wrapper():
+    _, frame = make_frame()
+    frame.equal_to('city', 'cali')
+
+    frame['city'] = ['Cali', 'Cali', 'Cali', 'Cali']
+
+    assert frame.equal_to('city', 'cali').all()
+
+
+def test_relabeled_index_keeps_positions():
+    df, frame = make_frame()
+    frame.equal_to('city', 'cali')
+
+    df.index = ['a', 'b', 'c', 'd']
+    result = frame.equal_to('city', 'cali')
+
+    assert result.index.tolist() == ['a', 'b', 'c', 'd']
+    assert result.tolist() == [False, True, False, False]
+
+
+def test_direct_column_swap_rebuilds_index():
+    df = pd.DataFrame({'city': ['Cali', 'Pasto'], 'other': ['Pasto', 'Cali']})
+    frame = NormalizedFrame(df)
+    frame.equal_to('city', 'cali')
+
+    df.rename(columns={'city': 'other', 'other': 'city'}, inplace=True)
+
+    assert frame.equal_to('city', 'cali').tolist() == [False, True]
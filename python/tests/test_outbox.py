@@ -0,0 +1,149 @@
+import threading
+from concurrent.futures import wait
+from contextlib import contextmanager
+
+import pytest
+
+from python.outbox import Outbox, OutboxClosedError, OutboxFullError
+from python.smtp_pool import SMTPPool
+
+MSG = 'Subject: Hola\r\n\r\nHola\r\n'
+
+
+class BlockedPool:
+    """Pool whose connections wait until ``release`` is set."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.borrowed = threading.Event()
+
+    @contextmanager
+    def connection(self):
+        self.borrowed.set()
+        self.release.wait()
+        yield self
+
+    def sendmail(self, sender, to, msg):
+        return {}
+
+
+@pytest.fixture
+def pool(smtp_server):
+    pool = SMTPPool('127.0.0.1', smtp_server.port)
+    yield pool
+    pool.close()
+
+
+def test_mails_delivered(pool, smtp_server):
+    outbox = Outbox(pool, batch_size=10)
+    futures = [outbox.put('app@example.com', 'ops@example.com', MSG)]
+    futures += [
+        outbox.put('app@example.com', ['ops@example.com'], MSG)
+        for _ in range(19)
+    ]
+
+    outbox.close()
+
+    assert [f.result(timeout=5) for f in futures] == [{}] * 20
+    assert len(smtp_server.messages) == 20
+    assert smtp_server.connections == 1
+
+
+def test_put_after_close_fails(pool):
+    outbox = Outbox(pool)
+    outbox.close()
+
+    future = outbox.put('app@example.com', 'ops@example.com', MSG)
+
+    with pytest.raises(OutboxClosedError):
+        future.result(timeout=1)
+
+
+def test_no_mail_stranded_when_closing(pool):
+    outbox = Outbox(pool, max_size=5, poll_interval=0.01)
+    futures = []
+
+    def produce():
+        for _ in range(50):
+            futures.append(
+                outbox.put('app@example.com', 'ops@example.com', MSG)
+            )
+
+    producers = [threading.Thread(target=produce) for _ in range(4)]
+    for producer in producers:
+        producer.start()
+    outbox.close()
+    for producer in producers:
+        producer.join()
+
+    _, not_done = wait(futures, timeout=10)
+    assert not not_done
+
+
+def test_close_timeout_fails_queued_mails():
+    pool = BlockedPool()
+    outbox = Outbox(pool, batch_size=1)
+    first = outbox.put('app@example.com', 'ops@example.com', MSG)
+    pool.borrowed.wait(5)
+    queued = [
+        outbox.put('app@example.com', 'ops@example.com', MSG)
+        for _ in range(3)
+    ]
+
+    outbox.close(timeout=0.05)
+
+    for future in queued:
+        with pytest.raises(OutboxClosedError):
+            future.result(timeout=1)
+    pool.release.set()
+    assert first.result(timeout=5) == {}
+
+
+def test_close_timeout_not_delayed_by_blocked_put():
+    pool = BlockedPool()
+    outbox = Outbox(pool, max_size=1, batch_size=1)
+    first = outbox.put('app@example.com', 'ops@example.com', MSG)
+    pool.borrowed.wait(5)
+    outbox.put('app@example.com', 'ops@example.com', MSG)
+    blocked = []
+    producer = threading.Thread(
+        target=lambda: blocked.append(
+            outbox.put('app@example.com', 'ops@example.com', MSG),
+        ),
+    )
+    producer.start()
+    producer.join(0.05)
+
+    closer = threading.Thread(target=outbox.close, kwargs={'timeout': 0.05})
+    closer.start()
+    closer.join(1)
+    timed_out = not closer.is_alive()
+    pool.release.set()
+    producer.join(5)
+
+    assert timed_out
+    assert first.result(timeout=5) == {}
+    assert blocked[0].result(timeout=5) == {}
+
+
+@pytest.mark.parametrize(
+    ('policy', 'kept'), [('drop_newest', 0), ('drop_oldest', 1)]
+)
+def test_overflow_policies(policy, kept):
+    pool = BlockedPool()
+    outbox = Outbox(pool, max_size=1, batch_size=1, policy=policy)
+    first = outbox.put('app@example.com', 'ops@example.com', MSG)
+    pool.borrowed.wait(5)
+    # The queue has room for one of these
+    futures = [
+        outbox.put('app@example.com', 'ops@example.com', MSG)
+        for _ in range(2)
+    ]
+
+    pool.release.set()
+    outbox.close()
+
+    assert first.result(timeout=5) == {}
+    assert futures[kept].result(timeout=5) == {}
+    with pytest.raises(OutboxFullError):
+        futures[1 - kept].result(timeout=5)
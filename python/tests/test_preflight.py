@@ -0,0 +1,53 @@
+import pytest
+from openpyxl import Workbook
+
+from python.preflight import list_sheets, validate_header, validate_headers
+from python.utils import ExternalReadingError
+
+
+def write_xlsx(path, header, title='Ventas'):
+    wb = Workbook()
+    wb.active.title = title
+    wb.active.append(header)
+    wb.save(path)
+
+
+def test_validate_header_matches_stripped_names(tmp_path):
+    src = tmp_path / 'sales.xlsx'
+    write_xlsx(src, [' City', 'Total ', None])
+
+    assert list_sheets(str(src)) == ['Ventas']
+    assert validate_header(str(src), ['City', 'Total'], 'Ventas') == [
+        ' City',
+        'Total ',
+    ]
+
+
+def test_validate_header_missing_sheet_and_column(tmp_path):
+    src = tmp_path / 'sales.xlsx'
+    write_xlsx(src, ['City'])
+
+    with pytest.raises(ExternalReadingError, match="hoja 'Otra'"):
+        validate_header(str(src), ['City'], 'Otra')
+    with pytest.raises(ExternalReadingError, match="columna 'Total'"):
+        validate_header(str(src), ['Total'])
+
+
+def test_validate_headers_reports_unreadable_files(tmp_path):
+    valid = tmp_path / 'a.xlsx'
+    write_xlsx(valid, ['City', 'Total'])
+    incomplete = tmp_path / 'b.csv'
+    incomplete.write_text('City\nCali\n')
+    corrupt = tmp_path / 'c.xlsx'
+    corrupt.write_text('not a zip file')
+    missing = tmp_path / 'd.csv'
+    files = [str(p) for p in (valid, incomplete, corrupt, missing)]
+
+    errors = validate_headers(files, ['City', 'Total'])
+
+    assert list(errors) == files
+    assert errors[files[0]] is None
+    assert all(isinstance(errors[f], ExternalReadingError) for f in files[1:])
+    assert "columna 'Total'" in str(errors[files[1]])
+    assert "'c.xlsx'" in str(errors[files[2]])
+    assert isinstance(errors[files[3]].__cause__, FileNotFoundError)
@@ -0,0 +1,98 @@
+import time
+
+import pytest
+from loguru import logger
+
+from python.profiler import Profiler
+from python.utils import timer
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_nested_spans_self_time():
+    profiler = Profiler()
+
+    with profiler.span('outer'):
+        busy(0.002)
+        with profiler.span('inner'):
+            busy(0.01)
+
+    stats = profiler.stats()
+    assert stats['outer'].count == stats['inner'].count == 1
+    assert stats['outer'].total >= stats['inner'].total >= 10
+    folded = dict(
+        line.rsplit(' ', 1) for line in profiler.to_collapsed().splitlines()
+    )
+    assert int(folded['outer;inner']) >= 10_000
+    assert int(folded['outer']) < 10_000
+
+
+def test_sampled_spans_are_weighted():
+    profiler = Profiler()
+
+    @profiler.profile(name='step', sample_every=10)
+    def step():
+        pass
+
+    for _ in range(100):
+        step()
+
+    assert profiler.stats()['step'].count == 100
+
+
+def test_unsampled_calls_not_in_parent_self_time():
+    profiler = Profiler()
+
+    @profiler.profile(sample_every=1000)
+    def child():
+        busy(0.001)
+
+    with profiler.span('parent'):
+        for _ in range(20):
+            child()
+
+    folded = dict(
+        line.rsplit(' ', 1) for line in profiler.to_collapsed().splitlines()
+    )
+    # 20 ms in unsampled children, none of it is parent self time
+    assert int(folded['parent']) < 5_000
+
+
+@pytest.mark.parametrize('sample_every', [0, -1])
+def test_sample_every_validated(sample_every):
+    with pytest.raises(ValueError, match='sample_every'):
+        Profiler().profile(sample_every=sample_every)
+
+
+def test_timer_throttles_log_lines():
+    messages = []
+    handler = logger.add(messages.append, format='{message}')
+
+    @timer(log_interval=3600)
+    def hot():
+        pass
+
+    for _ in range(100):
+        hot()
+    logger.remove(handler)
+
+    assert len([m for m in messages if 'hot' in m]) == 1
+
+
+def test_timer_logs_every_call_by_default():
+    messages = []
+    handler = logger.add(messages.append, format='{message}')
+
+    @timer
+    def cold():
+        pass
+
+    for _ in range(3):
+        cold()
+    logger.remove(handler)
+
+    assert len([m for m in messages if 'cold' in m]) == 3
@@ -0,0 +1,91 @@
+import smtplib
+import time
+
+import pytest
+
+from python.mail import Mail
+from python.smtp_pool import SMTPPool, _connections
+
+MSG = 'Subject: Hola\r\n\r\nHola\r\n'
+
+
+def test_session_reused(smtp_server):
+    pool = SMTPPool('127.0.0.1', smtp_server.port, 'user', 'secret')
+
+    for _ in range(5):
+        pool.sendmail('app@example.com', ['ops@example.com'], MSG)
+    pool.close()
+
+    assert len(smtp_server.messages) == 5
+    assert smtp_server.connections == 1
+    assert smtp_server.commands.count('AUTH') == 1
+
+
+def test_reconnect_after_server_disconnect(smtp_server):
+    pool = SMTPPool('127.0.0.1', smtp_server.port, health_check_interval=60)
+    pool.sendmail('app@example.com', ['ops@example.com'], MSG)
+
+    smtp_server.drop_connections()
+    pool.sendmail('app@example.com', ['ops@example.com'], MSG)
+    pool.close()
+
+    assert len(smtp_server.messages) == 2
+    assert smtp_server.connections == 2
+
+
+def test_unhealthy_connection_replaced(smtp_server):
+    pool = SMTPPool('127.0.0.1', smtp_server.port, health_check_interval=0)
+    pool.sendmail('app@example.com', ['ops@example.com'], MSG)
+    unhealthy = _connections.value(('unhealthy',))
+
+    smtp_server.drop_connections()
+    pool.sendmail('app@example.com', ['ops@example.com'], MSG)
+    pool.close()
+
+    assert len(smtp_server.messages) == 2
+    assert smtp_server.connections == 2
+    assert _connections.value(('unhealthy',)) == unhealthy + 1
+
+
+def test_idle_connections_expire(smtp_server):
+    pool = SMTPPool('127.0.0.1', smtp_server.port, idle_timeout=0.05)
+    pool.sendmail('app@example.com', ['ops@example.com'], MSG)
+
+    time.sleep(0.2)
+
+    assert pool.close_idle() == 0
+    assert 'QUIT' in smtp_server.commands
+    pool.close()
+
+
+def test_closed_pool_rejects_sends(smtp_server):
+    pool = SMTPPool('127.0.0.1', smtp_server.port)
+    pool.close()
+
+    with pytest.raises(RuntimeError, match='closed'):
+        pool.sendmail('app@example.com', ['ops@example.com'], MSG)
+
+
+def test_recipients_refused_keeps_connection(smtp_server):
+    smtp_server.refuse['bad@example.com'] = '550 No such user'
+    pool = SMTPPool('127.0.0.1', smtp_server.port)
+
+    with pytest.raises(smtplib.SMTPRecipientsRefused):
+        pool.sendmail('app@example.com', ['bad@example.com'], MSG)
+    pool.sendmail('app@example.com', ['ok@example.com'], MSG)
+    pool.close()
+
+    assert smtp_server.connections == 1
+    assert len(smtp_server.messages) == 1
+
+
+def test_mail_close_quits_connections(mail_config, smtp_server):
+    mail = Mail()
+    mail.send('Alerta', '<p>Hola</p>')
+    mail.send('Alerta', '<p>Adiós</p>')
+
+    mail.close()
+
+    assert len(smtp_server.messages) == 2
+    assert smtp_server.connections == 1
+    assert smtp_server.commands[-1] == 'QUIT'
@@ -0,0 +1,181 @@
+import types
+from contextlib import contextmanager
+
+import pytest
+from loguru import logger
+
+from python.smtp_pool import SMTPPool
+from python.spool import MailSpool, _depth
+
+MSG = 'Subject: Hola\r\n\r\nHola\r\n'
+
+
+@pytest.fixture
+def spool(smtp_server, tmp_path):
+    pool = SMTPPool('127.0.0.1', smtp_server.port)
+    # The worker stops at once, so the tests call deliver themselves
+    killer = types.SimpleNamespace(kill_now=True)
+    spool = MailSpool(
+        pool,
+        str(tmp_path / 'spool' / 'mail.sqlite3'),
+        base_delay=0,
+        max_attempts=3,
+        killer=killer,
+    )
+    yield spool
+    spool.close()
+    pool.close()
+
+
+@pytest.fixture
+def errors():
+    messages = []
+    handler = logger.add(messages.append, level='ERROR', format='{message}')
+    yield messages
+    logger.remove(handler)
+
+
+def rows(spool):
+    with spool._lock:
+        return spool._conn.execute(
+            'SELECT recipients, attempts FROM mails'
+        ).fetchall()
+
+
+def test_delivered_and_removed(spool, smtp_server):
+    spool.put('app@example.com', ['ops@example.com'], MSG)
+
+    assert spool.deliver() == 1
+    assert len(spool) == 0
+    assert len(smtp_server.messages) == 1
+
+
+def test_temporary_refusal_retried(spool, smtp_server):
+    smtp_server.refuse['ops@example.com'] = '450 Mailbox busy'
+    spool.put('app@example.com', ['ops@example.com'], MSG)
+
+    assert spool.deliver() == 0
+    assert rows(spool) == [('["ops@example.com"]', 1)]
+
+    del smtp_server.refuse['ops@example.com']
+    assert spool.deliver() == 1
+    assert len(spool) == 0
+
+
+def test_permanent_refusal_discarded(spool, smtp_server, errors):
+    smtp_server.refuse['ops@example.com'] = '550 No such user'
+    spool.put('app@example.com', ['ops@example.com'], MSG)
+
+    spool.deliver()
+
+    assert len(spool) == 0
+    assert 'tras 1 intentos' in errors[0]
+
+
+def test_partial_refusal_retries_only_refused(spool, smtp_server):
+    smtp_server.refuse['b@example.com'] = '451 Try again later'
+    spool.put('app@example.com', ['a@example.com', 'b@example.com'], MSG)
+
+    spool.deliver()
+
+    assert smtp_server.messages[0][1] == ['a@example.com']
+    assert rows(spool) == [('["b@example.com"]', 1)]
+
+
+def test_discarded_after_max_attempts(spool, smtp_server, errors):
+    smtp_server.refuse['ops@example.com'] = '450 Mailbox busy'
+    spool.put('app@example.com', ['ops@example.com'], MSG)
+
+    for _ in range(3):
+        spool.deliver()
+
+    assert len(spool) == 0
+    assert len(errors) == 1
+    assert 'tras 3 intentos' in errors[0]
+
+
+def test_oldest_evicted_when_full(spool):
+    spool.max_size = 2
+    for i in range(3):
+        spool.put('app@example.com', ['ops@example.com'], f'{i}')
+
+    assert len(spool) == 2
+    assert _depth.value() == 2
+    with spool._lock:
+        msgs = spool._conn.execute('SELECT msg FROM mails').fetchall()
+    assert msgs == [('1',), ('2',)]
+
+
+def test_unsendable_mail_discarded_after_max_attempts(
+    spool,
+    smtp_server,
+    errors,
+):
+    # smtplib only sends ASCII str messages
+    spool.put('app@example.com', ['ops@example.com'], 'Subject: Adiós\r\n')
+    spool.put('app@example.com', ['ops@example.com'], MSG)
+
+    assert spool.deliver() == 1
+    assert rows(spool) == [('["ops@example.com"]', 1)]
+    for _ in range(2):
+        spool.deliver()
+
+    assert len(spool) == 0
+    assert len(smtp_server.messages) == 1
+    assert 'tras 3 intentos: UnicodeEncodeError' in errors[0]
+
+
+class PuttingPool:
+    """Pool that spools a mail while the first one is being sent."""
+
+    def __init__(self, pool, spool):
+        self.pool = pool
+        self.spool = spool
+
+    @contextmanager
+    def connection(self):
+        with self.pool.connection() as server:
+            sendmail = server.sendmail
+
+            def put_and_send(*args):
+                self.spool.put('app@example.com', ['ops@example.com'], 'new')
+                return sendmail(*args)
+
+            server.sendmail = put_and_send
+            try:
+                yield server
+            finally:
+                del server.sendmail
+
+
+def test_mails_in_flight_not_evicted(spool, smtp_server):
+    smtp_server.refuse['ops@example.com'] = '450 Mailbox busy'
+    spool.max_size = 2
+    spool.put('app@example.com', ['ops@example.com'], 'sending')
+    spool.put('app@example.com', ['ops@example.com'], 'waiting')
+    with spool._lock:
+        spool._conn.execute(
+            "UPDATE mails SET next_attempt_at = 1e12 WHERE msg = 'waiting'",
+        )
+    spool.pool = PuttingPool(spool.pool, spool)
+
+    spool.deliver()
+
+    with spool._lock:
+        msgs = spool._conn.execute(
+            'SELECT msg, attempts FROM mails ORDER BY id',
+        ).fetchall()
+    assert msgs == [('sending', 1), ('new', 0)]
+
+
+def test_mails_survive_restart(smtp_server, tmp_path):
+    path = str(tmp_path / 'mail.sqlite3')
+    killer = types.SimpleNamespace(kill_now=True)
+    pool = SMTPPool('127.0.0.1', smtp_server.port)
+    with MailSpool(pool, path, killer=killer) as spool:
+        spool.put('app@example.com', ['ops@example.com'], MSG)
+
+    with MailSpool(pool, path, killer=killer) as spool:
+        assert len(spool) == 1
+        assert spool.deliver() == 1
+    pool.close()
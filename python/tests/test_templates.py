@@ -0,0 +1,48 @@
+import random
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+import pytest
+
+from python.templates import HtmlMessageFactory, MailTemplate
+
+
+def mime_message(sender, to, subject, body):
+    msg = MIMEMultipart()
+    msg['From'] = sender
+    msg['To'] = to
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'html'))
+    return msg.as_string()
+
+
+@pytest.mark.parametrize(
+    ('subject', 'body'),
+    [
+        ('Alerta', '<p>Hola</p>'),
+        ('Alerta de facturación', '<p>Hola</p>'),
+        ('Alerta', '<p>Año nuevo, €5 — ñandú</p>\n' * 20),
+        ('Reporte diario ' * 10, '<p>' + 'x' * 2000 + '</p>'),
+    ],
+)
+def test_html_message_matches_mime(subject, body, monkeypatch):
+    # Same boundary for both messages
+    monkeypatch.setattr(random, 'randrange', lambda _: 1234567890)
+    sender = 'Aplicación <app@example.com>'
+    to = ['ops@example.com', 'Dirección <dir@example.com>']
+    factory = HtmlMessageFactory(sender)
+
+    built = factory.build(to, subject, body)
+
+    expected = mime_message(sender, ', '.join(to), subject, body)
+    assert built.encode() == expected.encode()
+
+
+def test_template_escapes_values():
+    template = MailTemplate('<h1>{{title}}</h1>{{ body }}', raw=['body'])
+
+    result = template.render(title='5 < 6', body='<p>Hola</p>')
+
+    assert result == '<h1>5 &lt; 6</h1><p>Hola</p>'
+    with pytest.raises(KeyError, match='title'):
+        template.render(body='')
@@ -0,0 +1,93 @@
+import asyncio
+import tracemalloc
+
+import pytest
+
+from python.utils import (
+    _tracing,
+    memory_consumption,
+    memory_stats,
+    reset_memory_stats,
+    timer,
+)
+
+
+@pytest.mark.parametrize(
+    'decorator', [timer(log_interval=0), memory_consumption]
+)
+def test_instrumented_functions_keep_behavior(decorator):
+    @decorator
+    def add(a, b):
+        return a + b
+
+    @decorator
+    async def async_add(a, b):
+        return a + b
+
+    @decorator
+    def echo():
+        received = yield 1
+        while received is not None:
+            received = yield received
+        return 'done'
+
+    @decorator
+    async def countdown(n):
+        while n:
+            yield n
+            n -= 1
+
+    async def collect():
+        return [n async for n in countdown(3)]
+
+    assert add(1, 2) == 3
+    assert asyncio.run(async_add(1, 2)) == 3
+    assert asyncio.run(collect()) == [3, 2, 1]
+
+    gen = echo()
+    assert next(gen) == 1
+    assert gen.send('a') == 'a'
+    with pytest.raises(StopIteration) as exc_info:
+        gen.send(None)
+    assert exc_info.value.value == 'done'
+    assert add.__name__ == 'add'
+
+
+def test_generator_throw_is_forwarded():
+    @timer(log_interval=0)
+    def numbers():
+        try:
+            yield 1
+        except ValueError:
+            yield 'handled'
+
+    gen = numbers()
+    next(gen)
+    assert gen.throw(ValueError) == 'handled'
+
+
+def test_nested_tracemalloc_measures_keep_outer_peak():
+    outer, inner = object(), object()
+
+    _tracing.enter(outer)
+    block = bytearray(20 * 1024 * 1024)
+    del block
+    _tracing.enter(inner)
+    inner_peak = _tracing.exit(inner)
+    outer_peak = _tracing.exit(outer)
+
+    assert inner_peak < 20 * 1024 * 1024 <= outer_peak
+    assert not tracemalloc.is_tracing()
+
+
+def test_memory_stats_keyed_by_qualname():
+    reset_memory_stats()
+
+    @memory_consumption(mode='tracemalloc')
+    def load():
+        return [0] * 1000
+
+    load()
+
+    assert list(memory_stats()) == [load.__qualname__]
+    assert not tracemalloc.is_tracing()
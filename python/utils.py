@@ -1,18 +1,114 @@
 """Utils."""
 
+import dataclasses
 import hashlib
+import inspect
+import itertools
+import json
+import mmap
 import os
 import re
+import sqlite3
+import threading
 import time
+import tracemalloc
 import unicodedata
-from collections.abc import Callable, Sequence
+from collections.abc import (
+    AsyncGenerator,
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+    Sequence,
+)
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
 from datetime import timedelta
-from functools import wraps
-from typing import overload
-
+from functools import lru_cache, wraps
+from pathlib import Path
+from types import UnionType
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Literal,
+    NamedTuple,
+    Union,
+    get_args,
+    get_origin,
+    overload,
+)
+
+import numpy as np
+import pandas as pd
 import psutil
 from loguru import logger
 from pandas import DataFrame, Index, Series
+from pandas.api.types import union_categoricals
+
+from .aho_corasick import AhoCorasick
+from .metrics import REGISTRY
+from .profiler import profiler
+
+if TYPE_CHECKING:
+    # Python 3.11+
+    from typing import Self
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = pc = None
+
+MemoryMode = Literal['rss', 'peak', 'tracemalloc']
+
+BYTES_PER_MB = 1024 * 1024
+MB_PER_GB = 1024
+
+HASH_CHUNK_SIZE = 1024 * 1024
+MMAP_THRESHOLD = 8 * 1024 * 1024
+NORMALIZE_CACHE_SIZE = 4096
+AHO_CORASICK_MIN_VALUES = 500
+# Starting the process pool and pickling the shards took about 0.13 s
+# plus 0.3 s per million string cells, while normalizing them took
+# about 1.5 s per million cells, so a few workers pay off from around
+# a million cells.
+PARALLEL_MIN_CELLS = 1_000_000
+
+_function_duration = REGISTRY.histogram(
+    'function_duration_seconds',
+    'Execution time of the functions decorated with timer.',
+    ['function'],
+)
+_function_memory = REGISTRY.gauge(
+    'function_memory_megabytes',
+    'Memory consumed by the last call of the functions decorated'
+    ' with memory_consumption.',
+    ['function'],
+)
+_function_memory_peak = REGISTRY.gauge(
+    'function_memory_peak_megabytes',
+    'Memory peak of the last call of the functions decorated'
+    ' with memory_consumption.',
+    ['function'],
+)
+
+_NON_WORD_RE = re.compile(r'\W')
+# Combining Diacritical Marks block, which covers the accents
+# of the Latin alphabet once decomposed with NFKD
+_COMBINING_TABLE = dict.fromkeys(
+    c for c in range(0x300, 0x370) if unicodedata.combining(chr(c))
+)
+# Characters whose uppercase has several code points ('ß' -> 'SS'),
+# all of them in the Basic Multilingual Plane
+_MULTI_UPPER_RE = '[{}]'.format(
+    re.escape(
+        ''.join(c for c in map(chr, range(0x10000)) if len(c.upper()) > 1),
+    ),
+)
 
 
 class ExternalReadingError(Exception):
@@ -34,52 +130,613 @@ class InvalidTruthValueError(Exception):
         super().__init__(f'invalid truth value: {value!r}')
 
 
-def memory_consumption(func: Callable) -> Callable:
-    """Decorator to measure memory consumption of a function."""
+@dataclasses.dataclass
+class MemoryStats:
+    """Memory consumption statistics of a function, in MB.
 
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        process = psutil.Process(os.getpid())
-        mem_before = process.memory_info().rss / 1024 / 1024
-        result = func(*args, **kwargs)
-        mem_after = process.memory_info().rss / 1024 / 1024
-        mem_consumption = mem_after - mem_before
-        GB = 1024 * 1024
-        if mem_consumption < GB:
-            logger.info(
-                f'Consumo de memoria de {func.__qualname__}:'
-                f' {mem_consumption:.2f} MB'
-            )
-        elif mem_consumption >= GB:
-            logger.warning(
-                f'Consumo de memoria de {func.__qualname__}:'
-                f' {mem_consumption / GB:.2f} GB'
+    Peaks are only recorded by the ``peak`` and ``tracemalloc`` modes
+    of ``memory_consumption``.
+    """
+
+    calls: int = 0
+    last: float = 0.0
+    max: float = 0.0
+    total: float = 0.0
+    last_peak: float | None = None
+    max_peak: float | None = None
+
+    @property
+    def mean(self) -> float:
+        """Mean consumption per call."""
+        return self.total / self.calls if self.calls else 0.0
+
+
+class _PeakSampler(threading.Thread):
+    """Samples the RSS of the process until stopped."""
+
+    def __init__(self, process: psutil.Process, interval: float) -> None:
+        super().__init__(daemon=True)
+        self.process = process
+        self.interval = interval
+        self.peak = process.memory_info().rss
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.peak = max(self.peak, self.process.memory_info().rss)
+
+    def stop(self) -> int:
+        self._stop_event.set()
+        self.join()
+        return max(self.peak, self.process.memory_info().rss)
+
+
+class _Measure:
+    """Base of the measures wrapped around calls by ``_instrument``."""
+
+    def item(self) -> None:
+        """Handle an item of a generator. Nothing by default."""
+
+
+class _MemoryMeasure(_Measure):
+    """Measures the memory consumed between enter and exit."""
+
+    def __init__(
+        self,
+        name: str,
+        mode: MemoryMode,
+        interval: float,
+        top: int,
+    ) -> None:
+        self.name = name
+        self.mode = mode
+        self.interval = interval
+        self.top = top
+
+    def __enter__(self) -> 'Self':
+        self._process = psutil.Process(os.getpid())
+        self._sampler = None
+        if self.mode == 'tracemalloc':
+            _tracing.enter(self)
+            self._snapshot = tracemalloc.take_snapshot()
+
+        self._before = self._process.memory_info().rss
+        if self.mode != 'rss':
+            self._sampler = _PeakSampler(self._process, self.interval)
+            self._sampler.start()
+        return self
+
+    def __exit__(self, *_) -> None:
+        after = self._process.memory_info().rss
+        peak = self._sampler.stop() if self._sampler else None
+        consumption = (after - self._before) / BYTES_PER_MB
+        peak_consumption = (
+            (peak - self._before) / BYTES_PER_MB if peak is not None else None
+        )
+        _record_memory_stats(self.name, consumption, peak_consumption)
+        _function_memory.set(consumption, (self.name,))
+        if peak_consumption is not None:
+            _function_memory_peak.set(peak_consumption, (self.name,))
+
+        msg = f'Consumo de memoria de {self.name}: {_format_mb(consumption)}'
+        if peak_consumption is not None:
+            msg += f' (pico: {_format_mb(peak_consumption)})'
+        if max(consumption, peak_consumption or 0) < MB_PER_GB:
+            logger.info(msg)
+        else:
+            logger.warning(msg)
+
+        if self.mode == 'tracemalloc':
+            self._log_top_allocations()
+
+    def _log_top_allocations(self) -> None:
+        own_traces = tracemalloc.Filter(
+            inclusive=False,
+            filename_pattern=tracemalloc.__file__,
+        )
+        snapshot = tracemalloc.take_snapshot().filter_traces([own_traces])
+        traced_peak = _tracing.exit(self)
+
+        stats = snapshot.compare_to(self._snapshot, 'lineno')[: self.top]
+        lines = '\n'.join(
+            f'  {stat.traceback[0]}: {stat.size_diff / 1024:+.1f} KB'
+            for stat in stats
+        )
+        logger.info(
+            f'Asignaciones de memoria de {self.name}'
+            f' (pico de Python: {_format_mb(traced_peak / BYTES_PER_MB)}):\n{lines}',
+        )
+
+
+class _Tracing:
+    """Shares ``tracemalloc`` among nested and concurrent measures.
+
+    Tracing is started by the first measure and stopped by the last one,
+    unless something else started it. ``tracemalloc`` keeps a single
+    peak, so before a measure resets it the peak reached so far is
+    kept by the measures already running.
+    """
+
+    def __init__(self) -> None:
+        # Running measure -> traced peak before the last reset, in bytes
+        self._peaks: dict[_MemoryMeasure, int] = {}
+        self._started = False
+        self._lock = threading.Lock()
+
+    def enter(self, measure: _MemoryMeasure) -> None:
+        with self._lock:
+            if not self._peaks and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started = True
+            _, peak = tracemalloc.get_traced_memory()
+            for running, running_peak in self._peaks.items():
+                self._peaks[running] = max(running_peak, peak)
+            tracemalloc.reset_peak()
+            self._peaks[measure] = 0
+
+    def exit(self, measure: _MemoryMeasure) -> int:
+        """Return the traced peak since ``measure`` entered, in bytes."""
+        with self._lock:
+            _, peak = tracemalloc.get_traced_memory()
+            peak = max(self._peaks.pop(measure), peak)
+            if not self._peaks and self._started:
+                tracemalloc.stop()
+                self._started = False
+        return peak
+
+
+_tracing = _Tracing()
+
+
+@overload
+def memory_consumption(func: Callable) -> Callable: ...
+
+
+@overload
+def memory_consumption(
+    *,
+    mode: MemoryMode = 'rss',
+    interval: float = 0.01,
+    top: int = 10,
+) -> Callable[[Callable], Callable]: ...
+
+
+def memory_consumption(
+    func: Callable | None = None,
+    *,
+    mode: MemoryMode = 'rss',
+    interval: float = 0.01,
+    top: int = 10,
+) -> Callable:
+    """Measure the memory consumption of a function.
+
+    Coroutine functions are measured until they return, and generators
+    and async generators from their first item until they are exhausted
+    or closed.
+
+    Statistics of every decorated function are recorded and can be
+    queried with ``memory_stats`` or dumped with ``dump_memory_stats``.
+    Functions are named by their qualified name in the statistics,
+    the log and the metrics, like in ``timer``.
+
+    Modes, from cheapest to most expensive:
+
+    - ``rss``: RSS difference before and after the call.
+    - ``peak``: also samples the RSS every ``interval`` seconds
+      on a background thread to report the peak of the call.
+    - ``tracemalloc``: also reports the ``top`` source lines that
+      allocated the most memory with ``tracemalloc``. Slows down
+      the function noticeably; not meant for production.
+
+    Parameters
+    ----------
+    func : Callable | None, optional
+        Function to decorate, if used without arguments.
+    mode : MemoryMode, optional
+        Measurement mode, by default 'rss'.
+    interval : float, optional
+        RSS sampling interval in seconds, by default 0.01.
+    top : int, optional
+        Number of allocating lines to report, by default 10.
+
+    Examples
+    --------
+    >>> @memory_consumption
+    ... def load(): ...
+    >>> @memory_consumption(mode='peak')
+    ... def transform(): ...
+    >>> memory_stats()['transform'].max_peak
+    512.0
+
+    """
+
+    def decorator(func: Callable) -> Callable:
+        return _instrument(
+            func,
+            lambda **_: _MemoryMeasure(
+                func.__qualname__,
+                mode,
+                interval,
+                top,
+            ),
+        )
+
+    if func is not None:
+        return decorator(func)
+
+    return decorator
+
+
+def memory_stats() -> dict[str, MemoryStats]:
+    """Return the memory statistics recorded by ``memory_consumption``.
+
+    Returns
+    -------
+    dict[str, MemoryStats]
+        Copy of the statistics of each function, by qualified name,
+        like ``'Loader.transform'``, the name used by ``timer``.
+
+    """
+    with _memory_stats_lock:
+        return {
+            name: dataclasses.replace(stats)
+            for name, stats in _memory_stats.items()
+        }
+
+
+def dump_memory_stats(filepath: str) -> None:
+    """Write the memory statistics to a JSON file.
+
+    Parameters
+    ----------
+    filepath : str
+        File path.
+
+    """
+    data = {
+        name: {**dataclasses.asdict(stats), 'mean': stats.mean}
+        for name, stats in memory_stats().items()
+    }
+    with open(filepath, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def reset_memory_stats() -> None:
+    """Clear the memory statistics."""
+    with _memory_stats_lock:
+        _memory_stats.clear()
+
+
+def _record_memory_stats(
+    name: str,
+    consumption: float,
+    peak: float | None,
+) -> None:
+    with _memory_stats_lock:
+        stats = _memory_stats.setdefault(name, MemoryStats())
+        stats.calls += 1
+        stats.last = consumption
+        stats.max = (
+            max(stats.max, consumption) if stats.calls > 1 else consumption
+        )
+        stats.total += consumption
+        if peak is not None:
+            stats.last_peak = peak
+            stats.max_peak = (
+                peak if stats.max_peak is None else max(stats.max_peak, peak)
             )
-        return result
 
-    return wrapper
 
+def _format_mb(mb: float) -> str:
+    if abs(mb) >= MB_PER_GB:
+        return f'{mb / MB_PER_GB:.2f} GB'
+    return f'{mb:.2f} MB'
 
-def timer(func: Callable) -> Callable:
-    """Decorator to measure execution time of a function."""
 
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        start_time = time.time()
-        result = func(*args, **kwargs)
-        end_time = time.time()
-        execution_time = end_time - start_time
+_memory_stats: dict[str, MemoryStats] = {}
+_memory_stats_lock = threading.Lock()
+
+
+class _TimerLog:
+    """Log lines of a function decorated with ``timer``.
+
+    A line is logged at most every ``interval`` seconds, with the
+    number of calls since the previous one.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._logged_at: float | None = None
+        self._calls = 0
+        self._total = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> tuple[int, float] | None:
+        """Count a call.
+
+        Returns
+        -------
+        tuple[int, float] | None
+            Calls and total seconds since the previous line, if a line
+            is due, otherwise None.
+
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._calls += 1
+            self._total += seconds
+            if (
+                self._logged_at is not None
+                and now - self._logged_at < self.interval
+            ):
+                return None
+            due = self._calls, self._total
+            self._logged_at = now
+            self._calls = 0
+            self._total = 0.0
+        return due
+
+
+class _TimerMeasure(_Measure):
+    """Measures the time elapsed between enter and exit."""
+
+    def __init__(self, name: str, span: bool, log: _TimerLog) -> None:
+        self.name = name
+        self.span = span
+        self.log = log
+
+    def __enter__(self) -> 'Self':
+        self._span = profiler.span(self.name) if self.span else None
+        if self._span:
+            self._span.__enter__()
+        self._first_item_time = None
+        self._start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        execution_time = time.perf_counter() - self._start_time
+        if self._span:
+            self._span.__exit__(*exc_info)
+        else:
+            profiler.record(self.name, int(execution_time * 1e9))
+        _function_duration.observe(execution_time, (self.name,))
+
+        due = self.log.add(execution_time)
+        if due is None:
+            return
+
         prettified = str(timedelta(seconds=execution_time))
         prettified_minutes = prettified.split(':', 1)[-1].split('.')[0]
-        logger.info(
-            f'Tiempo de ejecución de {func.__qualname__}:'
+        msg = (
+            f'Tiempo de ejecución de {self.name}:'
             f' {execution_time:.2f} segundos, {prettified_minutes} minutos'
         )
-        return result
+        if self._first_item_time is not None:
+            msg += f' (primer elemento: {self._first_item_time:.2f} segundos)'
+        calls, total = due
+        if calls > 1:
+            msg += (
+                f'. {calls} llamadas desde el último registro,'
+                f' media {total / calls:.2f} segundos'
+            )
+        logger.info(msg)
+
+    def item(self) -> None:
+        """Record the time to the first item."""
+        if self._first_item_time is None:
+            self._first_item_time = time.perf_counter() - self._start_time
+
+
+@overload
+def timer(func: Callable) -> Callable: ...
+
+
+@overload
+def timer(*, log_interval: float = 0.0) -> Callable[[Callable], Callable]: ...
+
+
+def timer(
+    func: Callable | None = None,
+    *,
+    log_interval: float = 0.0,
+) -> Callable:
+    """Measure the execution time of a function.
+
+    Coroutine functions are measured until they return. Generators
+    and async generators are measured from their first item until they
+    are exhausted or closed, also reporting the time to the first item.
+
+    Calls are also recorded as spans of the default ``profiler``,
+    which keeps their distribution. Every call is logged by default.
+    With ``log_interval``, the first call is logged, and then at most
+    one call every ``log_interval`` seconds, with the number of calls
+    since the previous line, so hot functions do not flood the log.
+
+    Parameters
+    ----------
+    func : Callable | None, optional
+        Function to decorate, if used without arguments.
+    log_interval : float, optional
+        Minimum seconds between log lines, by default 0
+        (every call is logged).
+
+    Examples
+    --------
+    >>> @timer
+    ... def load(): ...
+    >>> @timer(log_interval=60)
+    ... def parse_row(): ...
+
+    """
+
+    def decorator(func: Callable) -> Callable:
+        log = _TimerLog(log_interval)
+        return _instrument(
+            func,
+            lambda *, span: _TimerMeasure(func.__qualname__, span, log),
+        )
+
+    if func is not None:
+        return decorator(func)
+
+    return decorator
+
+
+def _instrument(func: Callable, measure: Callable[..., _Measure]) -> Callable:
+    """Wrap ``func`` so its whole execution happens inside ``measure``.
+
+    ``measure`` receives ``span``, whether the execution is a single
+    stack frame (functions and coroutines) or is suspended between
+    items (generators), and its ``item`` method is called on every
+    item.
+    """
+    if inspect.iscoroutinefunction(func):
+        return _instrument_coroutine(func, measure)
+    if inspect.isasyncgenfunction(func):
+        return _instrument_async_generator(func, measure)
+    if inspect.isgeneratorfunction(func):
+        return _instrument_generator(func, measure)
+    return _instrument_function(func, measure)
+
+
+def _instrument_function(
+    func: Callable,
+    measure: Callable[..., _Measure],
+) -> Callable:
+    @wraps(func)
+    def wrapper(*args, **kwargs) -> Any:
+        with measure(span=True):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def _instrument_coroutine(
+    func: Callable,
+    measure: Callable[..., _Measure],
+) -> Callable:
+    @wraps(func)
+    async def wrapper(*args, **kwargs) -> Any:
+        with measure(span=True):
+            return await func(*args, **kwargs)
+
+    return wrapper
+
+
+def _instrument_generator(
+    func: Callable,
+    measure: Callable[..., _Measure],
+) -> Callable:
+    @wraps(func)
+    def wrapper(*args, **kwargs) -> Generator:
+        gen = func(*args, **kwargs)
+        with measure(span=False) as m:
+            try:
+                item = next(gen)
+                while True:
+                    m.item()
+                    try:
+                        sent = yield item
+                    except GeneratorExit:
+                        gen.close()
+                        raise
+                    except BaseException as e:  # noqa: BLE001
+                        # Raised at the yield, forwarded to the generator
+                        item = gen.throw(e)
+                    else:
+                        item = gen.send(sent)
+            except StopIteration as e:
+                return e.value
 
     return wrapper
 
 
+def _instrument_async_generator(
+    func: Callable,
+    measure: Callable[..., _Measure],
+) -> Callable:
+    @wraps(func)
+    async def wrapper(*args, **kwargs) -> AsyncGenerator:
+        agen = func(*args, **kwargs)
+        with measure(span=False) as m:
+            try:
+                item = await agen.__anext__()
+                while True:
+                    m.item()
+                    try:
+                        sent = yield item
+                    except GeneratorExit:
+                        await agen.aclose()
+                        raise
+                    except BaseException as e:  # noqa: BLE001
+                        # Raised at the yield, forwarded to the generator
+                        item = await agen.athrow(e)
+                    else:
+                        item = await agen.asend(sent)
+            except StopAsyncIteration:
+                return
+
+    return wrapper
+
+
+def file_digests(
+    filepath: str,
+    algorithms: Sequence[str] = ('sha256',),
+    mmap_threshold: int = MMAP_THRESHOLD,
+) -> dict[str, str]:
+    """Calculate several checksums of a file in a single read pass.
+
+    Files whose size is at least ``mmap_threshold`` bytes are
+    memory-mapped instead of being read through a buffer.
+
+    Parameters
+    ----------
+    filepath : str
+        File path.
+    algorithms : Sequence[str], optional
+        Names of the ``hashlib`` algorithms to use, by default ('sha256',).
+    mmap_threshold : int, optional
+        Minimum size in bytes to memory-map the file,
+        by default ``MMAP_THRESHOLD`` (8 MiB).
+
+    Returns
+    -------
+    dict[str, str]
+        Mapping of algorithm name to checksum.
+
+    Examples
+    --------
+    >>> file_digests('file.txt', ('md5', 'sha256'))
+    {'md5': '...', 'sha256': '...'}
+
+    """
+    hashers = [hashlib.new(name) for name in algorithms]
+    with open(filepath, 'rb', buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        if mmap_threshold and size >= mmap_threshold:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                mv = memoryview(mm)
+                try:
+                    for offset in range(0, size, HASH_CHUNK_SIZE):
+                        chunk = mv[offset : offset + HASH_CHUNK_SIZE]
+                        for h in hashers:
+                            h.update(chunk)
+                        chunk.release()
+                finally:
+                    mv.release()
+        else:
+            b = bytearray(128 * 1024)
+            mv = memoryview(b)
+            for n in iter(lambda: f.readinto(mv), 0):
+                for h in hashers:
+                    h.update(mv[:n])
+
+    return {
+        name: h.hexdigest()
+        for name, h in zip(algorithms, hashers, strict=True)
+    }
+
+
 def md5sum(filepath: str) -> str:
     """Calculates MD5 checksum.
 
@@ -93,13 +750,7 @@ def md5sum(filepath: str) -> str:
     str
         MD5 checksum.
     """
-    h = hashlib.md5()
-    b = bytearray(128 * 1024)
-    mv = memoryview(b)
-    with open(filepath, 'rb', buffering=0) as f:
-        for n in iter(lambda: f.readinto(mv), 0):
-            h.update(mv[:n])
-    return h.hexdigest()
+    return file_digests(filepath, ('md5',))['md5']
 
 
 def sha256sum(filepath: str) -> str:
@@ -115,13 +766,182 @@ def sha256sum(filepath: str) -> str:
     str
         SHA256 checksum.
     """
-    h = hashlib.sha256()
-    b = bytearray(128 * 1024)
-    mv = memoryview(b)
-    with open(filepath, 'rb', buffering=0) as f:
-        for n in iter(lambda: f.readinto(mv), 0):
-            h.update(mv[:n])
-    return h.hexdigest()
+    return file_digests(filepath, ('sha256',))['sha256']
+
+
+def iter_files(
+    root: str,
+    recursive: bool = True,
+    *,
+    onerror: Callable[[OSError], None] | None = None,
+) -> Iterator[str]:
+    """Yield the paths of the regular files under ``root``.
+
+    Subdirectories that cannot be listed are skipped, see ``onerror``.
+
+    Parameters
+    ----------
+    root : str
+        Directory to scan, or a file, which is yielded as is.
+    recursive : bool, optional
+        Whether to descend into subdirectories, by default True.
+    onerror : Callable[[OSError], None] | None, optional
+        Called with the error of each subdirectory that cannot be
+        listed, like in ``os.walk``; it can raise the error to stop.
+        By default None (log a warning).
+
+    Yields
+    ------
+    str
+        File path.
+
+    Raises
+    ------
+    OSError
+        If ``root`` does not exist (``FileNotFoundError``) or cannot
+        be listed.
+
+    """
+    if not Path(root).is_dir():
+        # Raises FileNotFoundError instead of yielding a missing root
+        Path(root).stat()
+        yield root
+        return
+
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            it = os.scandir(directory)
+        except OSError as e:
+            if directory == root:
+                raise
+            _skip_unreadable(e, onerror)
+            continue
+        with it:
+            for entry in it:
+                if entry.is_file(follow_symlinks=False):
+                    yield entry.path
+                elif recursive and entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+
+
+def _skip_unreadable(
+    error: OSError,
+    onerror: Callable[[OSError], None] | None,
+) -> None:
+    if onerror is not None:
+        onerror(error)
+    else:
+        logger.warning('Se omitió {!r}: {}', error.filename, error)
+
+
+@overload
+def iter_checksums(
+    paths: str | Iterable[str],
+    algorithms: str = 'sha256',
+    max_workers: int | None = None,
+    mmap_threshold: int = MMAP_THRESHOLD,
+    *,
+    onerror: Callable[[OSError], None] | None = None,
+) -> Iterator[tuple[str, str]]: ...
+
+
+@overload
+def iter_checksums(
+    paths: str | Iterable[str],
+    algorithms: Sequence[str],
+    max_workers: int | None = None,
+    mmap_threshold: int = MMAP_THRESHOLD,
+    *,
+    onerror: Callable[[OSError], None] | None = None,
+) -> Iterator[tuple[str, dict[str, str]]]: ...
+
+
+def iter_checksums(
+    paths: str | Iterable[str],
+    algorithms: str | Sequence[str] = 'sha256',
+    max_workers: int | None = None,
+    mmap_threshold: int = MMAP_THRESHOLD,
+    *,
+    onerror: Callable[[OSError], None] | None = None,
+) -> Iterator[tuple[str, str | dict[str, str]]]:
+    """Calculate checksums of many files concurrently.
+
+    Files are hashed on a thread pool (``hashlib`` releases the GIL
+    while hashing) and results are yielded as soon as they are ready,
+    so they do not follow the input order. Files that cannot be read
+    are skipped, see ``onerror``.
+
+    Parameters
+    ----------
+    paths : str | Iterable[str]
+        File paths, or a directory whose files are hashed recursively
+        (a single file path is hashed as is).
+    algorithms : str | Sequence[str], optional
+        ``hashlib`` algorithm name, or several names to compute all of
+        them in a single read pass, by default 'sha256'.
+    max_workers : int | None, optional
+        Number of threads, by default None (``os.cpu_count()``).
+    mmap_threshold : int, optional
+        Minimum size in bytes to memory-map a file,
+        by default ``MMAP_THRESHOLD`` (8 MiB).
+    onerror : Callable[[OSError], None] | None, optional
+        Called with the error of each file or subdirectory that cannot
+        be read, like in ``os.walk``; it can raise the error to stop.
+        By default None (log a warning).
+
+    Yields
+    ------
+    tuple[str, str | dict[str, str]]
+        File path and its checksum. If several algorithms are given,
+        the checksum is a mapping of algorithm name to checksum.
+
+    Examples
+    --------
+    >>> for path, digest in iter_checksums('data'):
+    ...     print(path, digest)
+    >>> for path, digests in iter_checksums(paths, ('md5', 'sha256')):
+    ...     print(path, digests['md5'], digests['sha256'])
+
+    """
+    if isinstance(paths, str):
+        paths = iter_files(paths, onerror=onerror)
+
+    single = isinstance(algorithms, str)
+    names = (algorithms,) if single else tuple(algorithms)
+    max_workers = max_workers or os.cpu_count() or 1
+    paths = iter(paths)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Keep a bounded number of pending files to avoid
+        # creating one future per file for huge trees.
+        pending = {}
+        for path in itertools.islice(paths, max_workers * 4):
+            future = executor.submit(file_digests, path, names, mmap_threshold)
+            pending[future] = path
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = pending.pop(future)
+                try:
+                    digests = future.result()
+                except OSError as e:
+                    if e.filename is None:
+                        e.filename = path
+                    _skip_unreadable(e, onerror)
+                    continue
+                yield path, digests[names[0]] if single else digests
+
+            for path in itertools.islice(paths, len(done)):
+                future = executor.submit(
+                    file_digests,
+                    path,
+                    names,
+                    mmap_threshold,
+                )
+                pending[future] = path
 
 
 def file_has_changed(filepath: str, replace_checksum=False) -> bool:
@@ -152,18 +972,428 @@ def file_has_changed(filepath: str, replace_checksum=False) -> bool:
 
     with open(checksum_path, 'r+') as f:
         checksum = f.read()
-        changed = checksum != sha256sum(filepath)
+        current = sha256sum(filepath)
+        changed = checksum != current
         if changed and replace_checksum:
             f.seek(0)
             f.truncate()
-            f.write(sha256sum(filepath))
+            f.write(current)
 
     return changed
 
 
+@dataclasses.dataclass
+class ManifestChanges:
+    """Files that changed in a directory since the last scan.
+
+    Paths are relative to the manifest root.
+    """
+
+    added: list[str] = dataclasses.field(default_factory=list)
+    modified: list[str] = dataclasses.field(default_factory=list)
+    removed: list[str] = dataclasses.field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.modified or self.removed)
+
+
+class ChecksumManifest:
+    """SQLite index of the checksums of the files in a directory.
+
+    Stores the size, modification time, inode and checksum of every
+    file, so files whose stat fingerprint did not change are not
+    hashed again. Replaces the ``<file>.sha256sum.txt`` files written
+    by ``file_has_changed`` with a single file per directory.
+
+    Examples
+    --------
+    >>> with ChecksumManifest('data') as manifest:
+    ...     changes = manifest.changes()
+    >>> changes.added, changes.modified, changes.removed
+    (['new.xlsx'], ['report.csv'], [])
+    >>> with ChecksumManifest('data') as manifest:
+    ...     manifest.has_changed('data/report.csv')
+    False
+
+    """
+
+    def __init__(
+        self,
+        root: str,
+        filename: str = '.checksums.sqlite3',
+        algorithm: str = 'sha256',
+        max_workers: int | None = None,
+    ) -> None:
+        """Open (or create) the manifest of ``root``.
+
+        Parameters
+        ----------
+        root : str
+            Directory whose files are tracked.
+        filename : str, optional
+            Manifest filename inside ``root``,
+            by default '.checksums.sqlite3'.
+        algorithm : str, optional
+            ``hashlib`` algorithm, by default 'sha256'.
+        max_workers : int | None, optional
+            Threads used to hash files in ``changes``,
+            by default None (``os.cpu_count()``).
+
+        """
+        self.root = str(Path(root).absolute())
+        self.algorithm = algorithm
+        self.max_workers = max_workers
+        self._path = Path(self.root) / filename
+        self._manifest_files = {
+            f'{filename}{suffix}'
+            for suffix in ('', '-journal', '-wal', '-shm')
+        }
+        self._conn = sqlite3.connect(self._path)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS files ('
+            ' path TEXT PRIMARY KEY,'
+            ' size INTEGER NOT NULL,'
+            ' mtime_ns INTEGER NOT NULL,'
+            ' inode INTEGER NOT NULL,'
+            ' algorithm TEXT NOT NULL,'
+            ' digest TEXT NOT NULL'
+            ')',
+        )
+        self._conn.commit()
+
+    def __enter__(self) -> 'Self':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the manifest database."""
+        self._conn.close()
+
+    def has_changed(self, filepath: str, update: bool = True) -> bool:
+        """Check if a file has changed since it was last recorded.
+
+        The file is only hashed if its size, modification time
+        or inode differ from the recorded ones.
+
+        Parameters
+        ----------
+        filepath : str
+            File path.
+        update : bool, optional
+            Record the new checksum if the file changed, by default True.
+
+        Returns
+        -------
+        bool
+            True if file has changed or was not recorded, False otherwise.
+
+        Raises
+        ------
+        ValueError
+            If the file is not inside ``root``.
+
+        """
+        relpath = self._relpath(filepath)
+        st = Path(filepath).stat()
+        row = self._conn.execute(
+            'SELECT size, mtime_ns, inode, algorithm, digest'
+            ' FROM files WHERE path = ?',
+            (relpath,),
+        ).fetchone()
+        if row and self._same_fingerprint(row, st):
+            return False
+
+        digest = file_digests(filepath, (self.algorithm,))[self.algorithm]
+        changed = not row or row[3] != self.algorithm or row[4] != digest
+        if update or not changed:
+            self._upsert([(relpath, st, digest)])
+            self._conn.commit()
+
+        return changed
+
+    def changes(
+        self,
+        recursive: bool = True,
+        update: bool = True,
+    ) -> ManifestChanges:
+        """Return the files added, modified and removed since last scan.
+
+        Only files whose stat fingerprint changed are hashed,
+        concurrently with ``iter_checksums``. Without ``recursive``,
+        only the recorded files directly in ``root`` are compared, so
+        the ones in subdirectories are not reported as removed.
+
+        Parameters
+        ----------
+        recursive : bool, optional
+            Whether to scan subdirectories, by default True.
+        update : bool, optional
+            Record the current state of the directory, by default True.
+
+        Returns
+        -------
+        ManifestChanges
+            Added, modified and removed files.
+
+        """
+        recorded = {
+            row[0]: row[1:]
+            for row in self._conn.execute(
+                'SELECT path, size, mtime_ns, inode, algorithm, digest'
+                ' FROM files',
+            )
+        }
+        stats = {}
+        to_hash = []
+        for filepath in iter_files(self.root, recursive):
+            relpath = self._relpath(filepath)
+            if self._is_manifest(relpath):
+                continue
+
+            st = Path(filepath).stat()
+            stats[relpath] = st
+            row = recorded.get(relpath)
+            if not row or not self._same_fingerprint(row, st):
+                to_hash.append(filepath)
+
+        result = ManifestChanges()
+        records = []
+        for filepath, digest in iter_checksums(
+            to_hash,
+            self.algorithm,
+            self.max_workers,
+        ):
+            relpath = self._relpath(filepath)
+            row = recorded.get(relpath)
+            if not row:
+                result.added.append(relpath)
+            elif row[3] != self.algorithm or row[4] != digest:
+                result.modified.append(relpath)
+            records.append((relpath, stats[relpath], digest))
+
+        result.removed = [
+            p
+            for p in recorded
+            if p not in stats and (recursive or os.sep not in p)
+        ]
+        result.added.sort()
+        result.modified.sort()
+        result.removed.sort()
+
+        if update:
+            self._upsert(records)
+            self._conn.executemany(
+                'DELETE FROM files WHERE path = ?',
+                [(p,) for p in result.removed],
+            )
+            self._conn.commit()
+
+        return result
+
+    def _relpath(self, filepath: str) -> str:
+        relpath = os.path.relpath(filepath, self.root)
+        if relpath == os.pardir or relpath.startswith(os.pardir + os.sep):
+            msg = f'{filepath!r} is not inside {self.root!r}'
+            raise ValueError(msg)
+        return relpath
+
+    def _is_manifest(self, relpath: str) -> bool:
+        # The database and its SQLite journal files
+        return relpath in self._manifest_files
+
+    def _same_fingerprint(self, row: tuple, st: os.stat_result) -> bool:
+        return (
+            row[0] == st.st_size
+            and row[1] == st.st_mtime_ns
+            and row[2] == st.st_ino
+            and row[3] == self.algorithm
+        )
+
+    def _upsert(self, records: list[tuple[str, os.stat_result, str]]) -> None:
+        self._conn.executemany(
+            'INSERT OR REPLACE INTO files'
+            ' (path, size, mtime_ns, inode, algorithm, digest)'
+            ' VALUES (?, ?, ?, ?, ?, ?)',
+            [
+                (
+                    relpath,
+                    st.st_size,
+                    st.st_mtime_ns,
+                    st.st_ino,
+                    self.algorithm,
+                    digest,
+                )
+                for relpath, st, digest in records
+            ],
+        )
+
+
+def _same_size_files(
+    paths: Iterable[str],
+    min_size: int,
+    onerror: Callable[[OSError], None] | None,
+) -> list[tuple[int, str]]:
+    by_size: dict[int, list[str]] = {}
+    seen_inodes = set()
+    for path in paths:
+        try:
+            st = Path(path).stat()
+        except OSError as e:
+            _skip_unreadable(e, onerror)
+            continue
+        if st.st_size < min_size or (st.st_dev, st.st_ino) in seen_inodes:
+            continue
+        seen_inodes.add((st.st_dev, st.st_ino))
+        by_size.setdefault(st.st_size, []).append(path)
+
+    return [
+        (size, path)
+        for size, group in by_size.items()
+        if len(group) > 1
+        for path in group
+    ]
+
+
+def _edges_digest(filepath: str, size: int, block_size: int) -> str | OSError:
+    # Files of up to 2 * block_size bytes are read whole, so their
+    # digest is the SHA256 of the content. Errors are returned, so
+    # the other files of the batch are still hashed.
+    h = hashlib.sha256()
+    try:
+        with open(filepath, 'rb', buffering=0) as f:
+            h.update(f.read(block_size))
+            if size > block_size:
+                f.seek(max(block_size, size - block_size))
+                h.update(f.read(block_size))
+    except OSError as e:
+        return e
+    return h.hexdigest()
+
+
+@dataclasses.dataclass
+class DuplicateGroup:
+    """Files with the same content.
+
+    Attributes
+    ----------
+    size : int
+        Size of each file in bytes.
+    digest : str
+        SHA256 of the content of the files.
+    paths : list[str]
+        File paths, sorted.
+
+    """
+
+    size: int
+    digest: str
+    paths: list[str]
+
+    @property
+    def bytes_saved(self) -> int:
+        """Bytes that would be freed by keeping a single copy."""
+        return self.size * (len(self.paths) - 1)
+
+
+def find_duplicates(
+    paths: str | Iterable[str],
+    min_size: int = 1,
+    block_size: int = 64 * 1024,
+    max_workers: int | None = None,
+    *,
+    onerror: Callable[[OSError], None] | None = None,
+) -> list[DuplicateGroup]:
+    """Find files with the same content.
+
+    Files are grouped by size first, then by a hash of their first
+    and last blocks, and only the files that still collide are fully
+    hashed with SHA256. Paths pointing to the same inode (hard links)
+    are counted once. Files that cannot be read are skipped, like in
+    ``iter_checksums``.
+
+    Parameters
+    ----------
+    paths : str | Iterable[str]
+        File paths, or a directory whose files are scanned recursively.
+    min_size : int, optional
+        Ignore files smaller than this size in bytes, by default 1.
+    block_size : int, optional
+        Size of the first and last blocks in bytes, by default 64 KiB.
+    max_workers : int | None, optional
+        Threads used to hash files, by default None (``os.cpu_count()``).
+    onerror : Callable[[OSError], None] | None, optional
+        Called with the error of each file or subdirectory that cannot
+        be read, like in ``os.walk``; it can raise the error to stop.
+        By default None (log a warning).
+
+    Returns
+    -------
+    list[DuplicateGroup]
+        Duplicate groups, largest ``bytes_saved`` first.
+
+    Examples
+    --------
+    >>> groups = find_duplicates('exports')
+    >>> for group in groups:
+    ...     print(group.paths, group.bytes_saved)
+    >>> sum(group.bytes_saved for group in groups)
+    1048576
+
+    """
+    if isinstance(paths, str):
+        paths = iter_files(paths, onerror=onerror)
+    candidates = _same_size_files(paths, min_size, onerror)
+
+    by_edges: dict[tuple[int, str], list[str]] = {}
+    max_workers = max_workers or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        edges = executor.map(
+            lambda c: _edges_digest(c[1], c[0], block_size),
+            candidates,
+        )
+        for (size, path), digest in zip(candidates, edges, strict=True):
+            if isinstance(digest, OSError):
+                _skip_unreadable(digest, onerror)
+                continue
+            by_edges.setdefault((size, digest), []).append(path)
+
+    by_digest: dict[tuple[int, str], list[str]] = {}
+    to_hash = {}
+    for (size, digest), group in by_edges.items():
+        if len(group) < 2:  # noqa: PLR2004
+            continue
+        if size <= 2 * block_size:
+            # The edge blocks covered the whole file
+            by_digest[size, digest] = group
+        else:
+            to_hash.update(dict.fromkeys(group, size))
+
+    for path, digest in iter_checksums(
+        to_hash,
+        'sha256',
+        max_workers,
+        onerror=onerror,
+    ):
+        by_digest.setdefault((to_hash[path], digest), []).append(path)
+
+    groups = [
+        DuplicateGroup(size, digest, sorted(group))
+        for (size, digest), group in by_digest.items()
+        if len(group) > 1
+    ]
+    groups.sort(key=lambda g: g.bytes_saved, reverse=True)
+    return groups
+
+
 def extract_digits(value: str | Series) -> str | Series:
     """Extracts digits from `value`.
 
+    Arrow-backed string Series, including the default ``str`` dtype
+    of pandas 3, are handled with Arrow compute kernels and keep
+    their dtype.
+
     Parameters
     ----------
     value : str | Series
@@ -182,6 +1412,10 @@ def extract_digits(value: str | Series) -> str | Series:
     ''
     """
     if isinstance(value, Series):
+        if _is_arrow_string(value):
+            digits = pc.replace_substring_regex(pa.array(value), r'\P{Nd}', '')
+            return _from_arrow(value, pc.utf8_ltrim(digits, characters='0'))
+
         return value.astype(str).replace(r'\D', '', regex=True).str.lstrip('0')
 
     return re.sub(r'\D', '', value).lstrip('0')
@@ -238,11 +1472,44 @@ def strtobool(val: str) -> bool:
     raise InvalidTruthValueError(val)
 
 
+class EnforcedDataclassMixin:
+    def __post_init__(self) -> None:
+        """Enforces types at runtime."""
+        for field in dataclasses.fields(self):  # type: ignore
+            value = getattr(self, field.name)
+            if value is None:
+                setattr(self, field.name, value)
+                continue
+
+            if field.type is bool and isinstance(value, str):
+                value = strtobool(value)
+            if field.type is list and isinstance(value, str):
+                value = [v.strip() for v in value.split(',')]
+            if self._is_union(field.type):
+                field.type = self._get_actual_type(field.type, value)
+
+            setattr(self, field.name, field.type(value))  # type: ignore
+
+    def _is_union(self, t: object) -> bool:
+        origin = get_origin(t)
+        return origin is Union or origin is UnionType
+
+    def _get_actual_type(self, t: object, value: object) -> type | None:
+        for type_ in get_args(t):
+            if isinstance(value, type_):
+                return type_
+        return None
+
+
 def normalize_string(text: str) -> str:
     """Normalizes a string by converting non-word characters
     to underscores, converting accented characters to ASCII,
     and transforming to uppercase.
 
+    Results are memoized in a bounded LRU cache. See
+    ``set_normalize_cache_size``, ``normalize_cache_info``
+    and ``normalize_cache_clear``.
+
     Parameters
     ----------
     text : str
@@ -262,30 +1529,116 @@ def normalize_string(text: str) -> str:
     >>> normalize_string('user@example.com')
     'USER_EXAMPLE_COM'
     """
-    text = text.replace(' ', '')
-    text = unicodedata.normalize('NFKD', text)
-    text = ''.join([c for c in text if not unicodedata.combining(c)])
-    text = re.sub(r'\W', '_', text)
-    return text.upper()
+    return _cached_normalize_string(text)
 
 
-@overload
-def normalize_series(array: Series) -> Series: ...
+def set_normalize_cache_size(maxsize: int | None) -> None:
+    """Set the size of the ``normalize_string`` cache.
+
+    The cache is emptied.
+
+    Parameters
+    ----------
+    maxsize : int | None
+        Maximum number of cached strings. If 0, caching is disabled;
+        if None, the cache is unbounded.
+
+    """
+    global _cached_normalize_string  # noqa: PLW0603
+    _cached_normalize_string = lru_cache(maxsize=maxsize)(_normalize_string)
+
+
+class NormalizeCacheInfo(NamedTuple):
+    """Statistics of the ``normalize_string`` cache.
+
+    Same fields as the ``cache_info`` of ``functools.lru_cache``.
+    """
+
+    hits: int
+    misses: int
+    maxsize: int | None
+    currsize: int
+
+
+def normalize_cache_info() -> NormalizeCacheInfo:
+    """Return the statistics of the ``normalize_string`` cache.
+
+    Returns
+    -------
+    NormalizeCacheInfo
+        Cache hits, misses, maximum size and current size.
+
+    Examples
+    --------
+    >>> normalize_cache_info()
+    NormalizeCacheInfo(hits=120, misses=4, maxsize=4096, currsize=4)
+
+    """
+    return NormalizeCacheInfo(*_cached_normalize_string.cache_info())
+
+
+def normalize_cache_clear() -> None:
+    """Clear the ``normalize_string`` cache and its statistics."""
+    _cached_normalize_string.cache_clear()
+
+
+def _normalize_string(text: str) -> str:
+    text = unicodedata.normalize('NFKD', text.replace(' ', ''))
+    text = text.translate(_COMBINING_TABLE)
+    if not text.isascii():
+        text = ''.join([c for c in text if not unicodedata.combining(c)])
+    return _NON_WORD_RE.sub('_', text).upper()
+
+
+_cached_normalize_string = lru_cache(maxsize=NORMALIZE_CACHE_SIZE)(
+    _normalize_string,
+)
 
 
 @overload
-def normalize_series(array: Index) -> Index: ...
+def normalize_series(
+    array: Series,
+    unique: bool = False,
+    categorical: bool = False,
+) -> Series: ...
 
 
-def normalize_series(array: Series | Index) -> Series | Index:
+@overload
+def normalize_series(
+    array: Index,
+    unique: bool = False,
+    categorical: bool = False,
+) -> Index: ...
+
+
+def normalize_series(
+    array: Series | Index,
+    unique: bool = False,
+    categorical: bool = False,
+) -> Series | Index:
     """Normalizes a pandas ``Series`` by converting non-word characters
     to underscores, converting accented characters to ASCII,
     and transforming all strings to uppercase.
 
+    If ``unique`` is True, the array is factorized and only its unique
+    values are normalized, which is much faster for repetitive arrays
+    (cities, departments, statuses...).
+
+    If pyarrow is installed, Arrow-backed string arrays are normalized
+    with Arrow compute kernels instead of ``astype(str)`` and the result
+    keeps their dtype. Since pandas 3 this includes the default ``str``
+    dtype, so it is the usual path for string columns. Both paths give
+    the same values, and missing values stay missing.
+
     Parameters
     ----------
     array : Series | Index
         Array to be normalized.
+    unique : bool, optional
+        Normalize only the unique values, by default False.
+    categorical : bool, optional
+        Return a categorical array, by default False.
+        Implies ``unique``.
 
     Returns
     -------
@@ -301,7 +1654,44 @@ def normalize_series(array: Series | Index) -> Series | Index:
     1              WORLD_
     2    USER_EXAMPLE_COM
     dtype: object
+    >>> series = pd.Series(['Bogotá', 'Bogota', 'Cali', 'Bogotá'])
+    >>> normalize_series(series, categorical=True)
+    0    BOGOTA
+    1    BOGOTA
+    2      CALI
+    3    BOGOTA
+    dtype: category
+    Categories (2, object): ['BOGOTA', 'CALI']
     """
+    if not unique and not categorical:
+        return _normalize_values(array)
+
+    codes, uniques = pd.factorize(array, use_na_sentinel=False)
+    normalized = _normalize_values(Index(uniques))
+    if categorical:
+        # Different values may be equal once normalized
+        category_codes, categories = pd.factorize(normalized)
+        values = pd.Categorical.from_codes(
+            category_codes[codes],
+            categories=categories,
+        )
+    else:
+        values = normalized.take(codes)
+
+    if isinstance(array, Index):
+        return Index(values, name=array.name)
+
+    return Series(values, index=array.index, name=array.name)
+
+
+def _normalize_values(array: Series | Index) -> Series | Index:
+    if _is_arrow_string(array):
+        values = pc.replace_substring(pa.array(array), ' ', '')
+        values = pc.utf8_normalize(values, 'NFKD')
+        values = pc.replace_substring_regex(values, r'[^\x00-\x7f]', '')
+        values = pc.replace_substring_regex(values, r'\W', '_')
+        return _from_arrow(array, pc.ascii_upper(values))
+
     return (
         array.astype(str)
         .str.replace(' ', '')
@@ -345,7 +1735,7 @@ def series_equal_to(
         return array == (
             normalize_string(value)
             if isinstance(value, str)
-            else normalize_series(value)
+            else normalize_series(value, unique=True)
         )
 
     return array == value
@@ -383,7 +1773,7 @@ def series_not_equal_to(
         return array != (
             normalize_string(value)
             if isinstance(value, str)
-            else normalize_series(value)
+            else normalize_series(value, unique=True)
         )
 
     return array != value
@@ -422,7 +1812,7 @@ def series_isin(
     """
     if normalize_value:
         if isinstance(values, Series):
-            values = normalize_series(values)
+            values = normalize_series(values, unique=True)
         else:
             values = [normalize_string(v) for v in values]
 
@@ -437,6 +1827,11 @@ def series_contains(
 ) -> Series:
     """Compares a pandas ``Series`` with a value.
 
+    If ``value`` is a sequence and ``regex`` is False, its values are
+    searched as literals. From ``AHO_CORASICK_MIN_VALUES`` values on,
+    a cached Aho-Corasick automaton is used, which scans each string
+    once no matter how many values there are.
+
     Parameters
     ----------
     array : Series
@@ -461,22 +1856,90 @@ def series_contains(
     0     True
     1    False
     dtype: bool
+    >>> series_contains(series, ['foo', 'orl'], normalize_value=False)
+    0    False
+    1     True
+    dtype: bool
+
     """
-    if not isinstance(value, str):
-        value = '|'.join(
-            [normalize_string(v) if normalize_value else v for v in value]
+    if isinstance(value, str):
+        return array.astype(str).str.contains(
+            value if regex or not normalize_value else normalize_string(value),
+            regex=regex,
         )
 
-    return array.astype(str).str.contains(
-        value if regex or not normalize_value else normalize_string(value),
-        regex=regex,
-    )
+    values = [normalize_string(v) if normalize_value else v for v in value]
+    if regex:
+        return array.astype(str).str.contains('|'.join(values), regex=True)
+
+    if len(values) < AHO_CORASICK_MIN_VALUES:
+        # The regex engine is faster for a few alternatives
+        return array.astype(str).str.contains(
+            '|'.join(map(re.escape, values)),
+            regex=True,
+        )
+
+    return series_find_value(array, values, normalize_value=False).notna()
+
+
+def series_find_value(
+    array: Series,
+    values: Sequence[str],
+    normalize_value: bool = True,
+) -> Series:
+    """Find which of the values is contained in each ``Series`` element.
+
+    Values are searched as literals with a cached Aho-Corasick
+    automaton. Only the unique elements of the array are scanned.
+
+    Parameters
+    ----------
+    array : Series
+        Array to be searched.
+    values : Sequence[str]
+        Values to look for.
+    normalize_value : bool, optional
+        Normalize values, by default True.
+
+    Returns
+    -------
+    Series
+        The first value found in each element, or a missing value.
+
+    Examples
+    --------
+    >>> import pandas as pd
+    >>> series = pd.Series(['hello', 'world', 'foo'])
+    >>> series_find_value(series, ['ell', 'orl', 'o'], normalize_value=False)
+    0    ell
+    1      o
+    2      o
+    dtype: object
+
+    """
+    if normalize_value:
+        values = [normalize_string(v) for v in values]
+
+    automaton = _aho_corasick(tuple(values))
+    codes, uniques = pd.factorize(array.astype(str))
+    found = np.array([*map(automaton.search, uniques), None], dtype=object)
+    return Series(found[codes], index=array.index, name=array.name)
+
+
+_aho_corasick = lru_cache(maxsize=128)(AhoCorasick)
 
 
 def upper_strip_series(array: Series) -> Series:
     """Transforms a pandas ``Series`` to uppercase
     removing leading and trailing whitespaces.
 
+    Arrow-backed string Series, including the default ``str`` dtype
+    of pandas 3, are transformed with Arrow compute kernels and keep
+    their dtype. Other Series are converted with ``astype(str)`` first,
+    which also makes them Arrow-backed on pandas 3. Either way the
+    result matches ``str.strip().upper()`` on each value; missing
+    values stay missing.
+
     Parameters
     ----------
     array : Series
@@ -496,7 +1959,27 @@ def upper_strip_series(array: Series) -> Series:
     1    WORLD
     dtype: object
     """
-    return array.astype(str).str.strip().str.upper()
+    if not _is_arrow_string(array):
+        array = array.astype(str)
+        if not _is_arrow_string(array):
+            return array.str.strip().str.upper()
+
+    values = pc.utf8_trim_whitespace(pa.array(array))
+    upper = pc.utf8_upper(values)
+    # utf8_upper only applies the simple case mapping, so values such
+    # as 'straße' or 'ﬁ' are uppercased with Python, like the object path
+    special = pc.fill_null(
+        pc.match_substring_regex(values, _MULTI_UPPER_RE),
+        fill_value=False,
+    )
+    if pc.any(special).as_py():
+        values = pc.filter(values, special).to_pylist()
+        upper = pc.replace_with_mask(
+            upper,
+            special,
+            pa.array([value.upper() for value in values], upper.type),
+        )
+    return _from_arrow(array, upper)
 
 
 def strip_columns(df: DataFrame) -> DataFrame:
@@ -521,7 +2004,13 @@ def strip_columns(df: DataFrame) -> DataFrame:
     >>> strip_columns(df).columns
     Index(['col1', 'col2'], dtype='object')
     """
-    df.columns = df.columns.astype(str).str.strip()
+    if _is_arrow_string(df.columns):
+        df.columns = _from_arrow(
+            df.columns,
+            pc.utf8_trim_whitespace(pa.array(df.columns)),
+        )
+    else:
+        df.columns = df.columns.astype(str).str.strip()
     return df
 
 
@@ -551,13 +2040,34 @@ def normalize_columns(df: DataFrame) -> DataFrame:
     return df
 
 
-def normalize_dataframe(df: DataFrame) -> DataFrame:
+def normalize_dataframe(
+    df: DataFrame,
+    unique: bool = False,
+    categorical: bool = False,
+    max_workers: int | None = 1,
+) -> DataFrame:
     """Normalizes column names and values.
 
+    If ``max_workers`` is not 1, the DataFrame is split by columns
+    (or by row ranges if it has fewer columns than workers) and the
+    shards are normalized on a process pool. DataFrames with less than
+    ``PARALLEL_MIN_CELLS`` cells are always normalized serially. With
+    ``unique``, repetitive columns are normalized so fast that pickling
+    them to the pool usually costs more than it saves.
+
     Parameters
     ----------
     df : DataFrame
         DataFrame to be transformed.
+    unique : bool, optional
+        Normalize only the unique values of each column,
+        by default False. See ``normalize_series``.
+    categorical : bool, optional
+        Return categorical columns, by default False.
+        Implies ``unique``.
+    max_workers : int | None, optional
+        Number of processes, by default 1 (serial).
+        If None, ``os.cpu_count()`` is used.
 
     Returns
     -------
@@ -577,7 +2087,80 @@ def normalize_dataframe(df: DataFrame) -> DataFrame:
     0  HELLO  FOO_
     1 WORLD_  BAR_
     """
-    return normalize_columns(df).apply(normalize_series)
+    df = normalize_columns(df)
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers <= 1 or df.size < PARALLEL_MIN_CELLS:
+        return _normalize_values_frame(df, unique, categorical)
+
+    by_columns = df.shape[1] >= max_workers
+    bounds = np.linspace(
+        0,
+        df.shape[1] if by_columns else len(df),
+        max_workers + 1,
+        dtype=int,
+    )
+    shards = [
+        df.iloc[:, start:end] if by_columns else df.iloc[start:end]
+        for start, end in itertools.pairwise(bounds)
+        if end > start
+    ]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = list(
+            executor.map(
+                _normalize_values_frame,
+                shards,
+                itertools.repeat(unique),
+                itertools.repeat(categorical),
+            ),
+        )
+
+    if by_columns:
+        return pd.concat(results, axis=1)
+
+    result = pd.concat(results)
+    if categorical:
+        # Each row shard has its own categories. Their union keeps the
+        # order of first appearance, like the serial result.
+        for i in range(result.shape[1]):
+            result.isetitem(
+                i,
+                union_categoricals([r.iloc[:, i] for r in results]),
+            )
+    return result
+
+
+def _normalize_values_frame(
+    df: DataFrame,
+    unique: bool,
+    categorical: bool,
+) -> DataFrame:
+    return df.apply(normalize_series, unique=unique, categorical=categorical)
+
+
+def _is_arrow_string(array: Series | Index) -> bool:
+    if pa is None:
+        return False
+    if isinstance(array.dtype, pd.StringDtype):
+        return array.dtype.storage.startswith('pyarrow')
+    if isinstance(array.dtype, pd.ArrowDtype):
+        pa_type = array.dtype.pyarrow_dtype
+        return pa.types.is_string(pa_type) or pa.types.is_large_string(pa_type)
+    return False
+
+
+@overload
+def _from_arrow(array: Series, values: 'pa.Array') -> Series: ...
+
+
+@overload
+def _from_arrow(array: Index, values: 'pa.Array') -> Index: ...
+
+
+def _from_arrow(array: Series | Index, values: 'pa.Array') -> Series | Index:
+    values = pd.array(values, dtype=array.dtype)
+    if isinstance(array, Index):
+        return Index(values, name=array.name)
+    return Series(values, index=array.index, name=array.name)
 
 
 def usecols(columns: Sequence[str]) -> Callable[[str], bool]: